@@ -0,0 +1,162 @@
+"""
+Emergency-stop latency while the GUI thread is busy.
+
+Opens the real main window (offscreen) on the simulated controller and
+keeps its GUI thread busy with what an operator does: lock/unlock clicks
+and continuous-jog presses and releases. A separate thread "presses" the
+Emergency Stop at random moments (the press is queued to the GUI thread
+like a real click) and measures the time from the press until job_stop
+returned on the e-stop thread. Every DLL call takes --latency-ms, so any
+slot that still blocks on the DLL shows up directly in the latency.
+
+    python benchmarks/bench_estop_latency.py --stops 50 --latency-ms 20
+    python benchmarks/bench_estop_latency.py --busy-ms 30   # plus a slow repaint-like slot
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stops", type=int, default=30, help="e-stops to measure")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated time per DLL call")
+    parser.add_argument("--load-ms", type=int, default=5, help="interval of the GUI load clicks")
+    parser.add_argument("--busy-ms", type=float, default=0.0,
+                        help="extra GUI-thread work per load tick that never calls the DLL")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+ARGS = parse_args() if __name__ == "__main__" else None
+os.environ.setdefault("COBOT_BACKEND", "sim")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["COBOT_TELEMETRY_DIR"] = ""
+if ARGS is not None:
+    os.environ["COBOT_SIM_LATENCY_MS"] = str(ARGS.latency_ms)
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from main import MainApp  # noqa: E402
+
+# -------------------------
+# GUI load
+# -------------------------
+class Load:
+    """Operator clicks on the GUI thread: lock toggles and hold-jogs."""
+
+    def __init__(self, window, busy_ms: float):
+        self.window = window
+        self.busy = busy_ms / 1000.0
+        self.tick = 0
+        self.window.ui.continuous_jog.setChecked(True)
+
+    def step(self):
+        ui = self.window.ui
+        self.tick += 1
+        phase = self.tick % 4
+        if phase == 0:
+            self.window.toggle_servo_lock()
+        elif phase == 1:
+            ui.j1_p_btn.pressed.emit()
+        elif phase == 2:
+            ui.j1_p_btn.released.emit()
+        if self.busy:
+            end = time.perf_counter() + self.busy
+            while time.perf_counter() < end:
+                pass
+
+# -------------------------
+# E-stop presser (its own thread, clicks are queued to the GUI)
+# -------------------------
+class Presser(QObject):
+    press = pyqtSignal()
+    release = pyqtSignal()
+
+    def __init__(self, window, stops: int):
+        super().__init__()
+        self.window = window
+        self.stops = stops
+        self.latencies = []
+        self.done = threading.Event()
+        self.press.connect(self.on_press)
+        self.release.connect(self.on_release)
+
+    def on_press(self):
+        self.window.on_estop_pressed()
+        self.window.on_estop_click()  # release of the press that engaged it
+
+    def on_release(self):
+        self.window.on_estop_click()
+
+    def run(self):
+        session = self.window.session
+        for _ in range(self.stops):
+            time.sleep(random.uniform(0.05, 0.15))
+            seen = len(session.estop.results)
+            pressed = time.perf_counter()
+            self.press.emit()
+            while len(session.estop.results) == seen:
+                time.sleep(0.0005)
+            result = session.estop.results[-1]
+            self.latencies.append(result.triggered + result.dispatch - pressed)
+            time.sleep(0.02)
+            self.release.emit()
+            deadline = time.perf_counter() + 5.0
+            while session.estop_engaged and time.perf_counter() < deadline:
+                time.sleep(0.001)
+        self.done.set()
+
+# -------------------------
+# Main
+# -------------------------
+def summarize(values):
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+    return {"stops": len(ordered), "p50": pick(0.5), "p90": pick(0.9), "max": ordered[-1],
+            "mean": sum(ordered) / len(ordered)}
+
+def main():
+    app = QApplication(sys.argv)
+    window = MainApp()
+    window.toggle_connection()
+    deadline = time.perf_counter() + 10.0
+    while (window.connect_pending or not window.connected) and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    if not window.connected:
+        window.close()
+        sys.exit("connect failed")
+
+    load = Load(window, ARGS.busy_ms)
+    timer = QTimer()
+    timer.timeout.connect(load.step)
+    timer.start(ARGS.load_ms)
+    presser = Presser(window, ARGS.stops)
+    thread = threading.Thread(target=presser.run, daemon=True)
+    thread.start()
+    while not presser.done.is_set():
+        app.processEvents()
+        time.sleep(0.0005)
+    timer.stop()
+    window.close()  # also restores stdout
+
+    stats = summarize(presser.latencies)
+    print(f"e-stop press -> job_stop returned, {ARGS.latency_ms:.0f} ms per DLL call, "
+          f"GUI load every {ARGS.load_ms} ms (+{ARGS.busy_ms:.0f} ms busy):")
+    print(f"  {stats['stops']} stops  p50 {stats['p50'] * 1000:7.1f} ms  "
+          f"p90 {stats['p90'] * 1000:7.1f} ms  max {stats['max'] * 1000:7.1f} ms")
+    if ARGS.json:
+        with open(ARGS.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(ARGS), "estop": stats}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
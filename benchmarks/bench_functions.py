@@ -0,0 +1,193 @@
+"""
+Benchmark the functions.py binding layer against the simulated backend.
+
+    python benchmarks/bench_functions.py                      # print results
+    python benchmarks/bench_functions.py --json out.json      # save results
+    python benchmarks/bench_functions.py --compare base.json  # exit 1 on regression
+
+Each wrapper is called in a tight loop and timed per call. Reported per
+function: calls/sec, mean/p50/p99 latency, peak transient allocation
+(tracemalloc) and net memory blocks left behind per call.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("COBOT_BACKEND", "sim")
+
+import functions  # noqa: E402  (backend is chosen at import)
+
+ROBOT = "BenchRobot"
+
+# -------------------------
+# Operations under test
+# -------------------------
+def make_operations():
+    """name -> zero-argument callable; each call is one wrapper invocation."""
+    handle = functions.get_handle(ROBOT)
+    out = array("d", [0.0] * 7)
+    snapshot = functions.PoseSnapshot((0, 1))
+    home = functions.get_current_position(ROBOT, coord=0)
+    cart = functions.get_current_position(ROBOT, coord=1)
+    flip = [1.0]
+
+    def movej():
+        flip[0] = -flip[0]
+        target = list(home)
+        target[0] += 0.1 * flip[0]
+        return functions.robot_movej(target, vel=30, coord=0, acc=30, dec=30, robot_name=ROBOT)
+
+    def movel():
+        flip[0] = -flip[0]
+        target = list(cart)
+        target[2] += 0.1 * flip[0]
+        return functions.robot_movel(target, vel=100, coord=1, acc=30, dec=30, robot_name=ROBOT)
+
+    def joint_relative():
+        flip[0] = -flip[0]
+        return functions.move_joint_relative(0, 0.1 * flip[0], vel=30, acc=30, dec=30, robot_name=ROBOT)
+
+    def jog():
+        flip[0] = -flip[0]
+        return functions.linear_jog(2, 0.1 * flip[0], vel=100, acc=30, dec=30, robot_name=ROBOT)
+
+    return {
+        "get_current_position": lambda: functions.get_current_position(ROBOT, coord=0),
+        "read_position_into": lambda: handle.read_position_into(out, coord=0),
+        "get_pose_snapshot": lambda: functions.get_pose_snapshot(ROBOT, out=snapshot),
+        "get_robot_running_state": lambda: functions.get_robot_running_state(ROBOT),
+        "robot_movej": movej,
+        "robot_movel": movel,
+        "move_joint_relative": joint_relative,
+        "linear_jog": jog,
+    }
+
+# -------------------------
+# Measurement
+# -------------------------
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+def measure(fn, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+
+    clock = time.perf_counter_ns
+    samples = [0] * iterations
+    start = clock()
+    for i in range(iterations):
+        t0 = clock()
+        fn()
+        samples[i] = clock() - t0
+    total = (clock() - start) / 1e9
+    samples.sort()
+
+    # Allocation pass, separate so tracemalloc does not skew timings
+    alloc_iters = max(1, iterations // 10)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    blocks = sys.getallocatedblocks()
+    for _ in range(alloc_iters):
+        fn()
+    blocks = (sys.getallocatedblocks() - blocks) / alloc_iters
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls_per_sec": iterations / total,
+        "mean_us": sum(samples) / iterations / 1e3,
+        "p50_us": percentile(samples, 0.50) / 1e3,
+        "p99_us": percentile(samples, 0.99) / 1e3,
+        "alloc_peak_bytes": max(0, peak - base),
+        "blocks_per_call": blocks,
+    }
+
+def setup_robot():
+    status = functions.connect_robot("127.0.0.1", "6001", ROBOT)
+    if status != 0:
+        raise SystemExit(f"connect_robot failed with code {status}")
+    functions.set_servo_state(1, ROBOT)
+    functions.set_servo_poweron(ROBOT)
+
+def run(iterations: int, warmup: int, only=None) -> dict:
+    setup_robot()
+    results = {}
+    for name, fn in make_operations().items():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, iterations, warmup)
+    return {
+        "meta": {
+            "backend": functions.BACKEND,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare(current: dict, baseline: dict, tolerance: float):
+    """
+    Returns a list of regression messages: a function regresses if its p50
+    latency grew, or its calls/sec dropped, by more than tolerance.
+    """
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if now["p50_us"] > before["p50_us"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_us']:.2f} -> {now['p50_us']:.2f} us")
+        if now["calls_per_sec"] < before["calls_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: calls/sec {before['calls_per_sec']:.0f} -> {now['calls_per_sec']:.0f}")
+    return regressions
+
+def print_table(report: dict):
+    print(f"{'function':<26}{'calls/s':>12}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'peak B':>9}{'blocks':>8}")
+    for name, r in report["results"].items():
+        print(f"{name:<26}{r['calls_per_sec']:>12.0f}{r['mean_us']:>10.2f}{r['p50_us']:>10.2f}"
+              f"{r['p99_us']:>10.2f}{r['alloc_peak_bytes']:>9}{r['blocks_per_call']:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--only", nargs="*", help="benchmark only these functions")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.warmup, args.only)
+    print_table(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
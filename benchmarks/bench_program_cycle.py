@@ -0,0 +1,198 @@
+"""
+End-to-end program-cycle benchmark for the Actions tab executor.
+
+Builds programs of 10/100/10k steps and runs each the way run_program does
+(pre-flight check, then ProgramExecutor) against the simulated controller.
+Reports cycle time, per-step dispatch latency and the idle gap between a
+step finishing and the next one being sent.
+
+    python benchmarks/bench_program_cycle.py --json cycle.json
+    python benchmarks/bench_program_cycle.py --compare cycle.json
+
+The simulator runs --time-scale times faster than real time so the long
+program finishes quickly; "motion" is the stop-to-stop motion time from the
+pre-flight estimate converted to wall-clock time, and "overhead" is what
+the host adds on top (negative with --pl > 0, as blending skips the stops).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 10000])
+    parser.add_argument("--vel", type=int, default=100, help="program speed (%%)")
+    parser.add_argument("--pl", type=int, default=0, help="blend level for every step")
+    parser.add_argument("--amplitude", type=float, default=1.0, help="joint move per step (deg)")
+    parser.add_argument("--lookahead", type=int, default=3)
+    parser.add_argument("--poll-ms", type=float, default=2.0, help="executor poll interval")
+    parser.add_argument("--time-scale", type=float, default=50.0, help="simulated seconds per second")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    return parser.parse_args()
+
+ARGS = parse_args() if __name__ == "__main__" else None
+os.environ.setdefault("COBOT_BACKEND", "sim")
+if ARGS is not None:
+    os.environ["COBOT_SIM_TIME_SCALE"] = str(ARGS.time_scale)
+
+import numpy as np  # noqa: E402
+
+import functions  # noqa: E402  (backend is chosen at import)
+from executor import ProgramExecutor  # noqa: E402
+from preflight import check_program  # noqa: E402
+from program import Program  # noqa: E402
+from sim_backend import RESET_POSITION  # noqa: E402
+
+ROBOT = "BenchRobot"
+
+# -------------------------
+# Test programs
+# -------------------------
+def build_program(count: int, amplitude: float, pl: int) -> Program:
+    """Zig-zag on J1-J3 around the reset position, every step a real move."""
+    k = np.arange(1, count + 1)
+    sign = np.where(k % 2 == 1, 1.0, -1.0)
+    pos = np.tile(np.asarray(RESET_POSITION, dtype=np.float64), (count, 1))
+    pos[:, 0] += amplitude * sign
+    pos[:, 1] += 0.5 * amplitude * sign
+    pos[:, 2] -= 0.5 * amplitude * sign
+    data = np.zeros((count, 8))
+    data[:, :7] = pos
+    data[:, 7] = pl
+    return Program.from_array(data)
+
+# -------------------------
+# Measurement
+# -------------------------
+def percentiles(values, qs=(0.5, 0.9, 0.99)):
+    if not values:
+        return {f"p{int(q * 100)}": 0.0 for q in qs} | {"max": 0.0}
+    ordered = sorted(values)
+    out = {f"p{int(q * 100)}": ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+           for q in qs}
+    out["max"] = ordered[-1]
+    return out
+
+def histogram(values, edges_ms=(0.1, 0.5, 1, 2, 5, 10, 50)):
+    """Counts of values (seconds) per bucket, bucket upper edges in ms."""
+    counts = np.histogram(np.asarray(values) * 1e3, bins=[0.0, *edges_ms, np.inf])[0]
+    labels = [f"<{e}ms" for e in edges_ms] + [f">={edges_ms[-1]}ms"]
+    return dict(zip(labels, counts.tolist()))
+
+def reset_robot():
+    functions.robot_movej(RESET_POSITION, vel=100, coord=0, acc=100, dec=100, robot_name=ROBOT)
+    while functions.get_robot_running_state(ROBOT) != 0:
+        time.sleep(0.001)
+
+def run_case(count: int, args) -> dict:
+    program = build_program(count, args.amplitude, args.pl)
+    reset_robot()
+
+    # Same sequence as MainApp.run_program
+    t0 = time.perf_counter()
+    steps = program.positions().copy()
+    pl = program.pl().astype(int).tolist()
+    start = functions.get_current_position(ROBOT, coord=0)
+    report = check_program(steps, vel=args.vel, acc=30, dec=30, pl=pl, start=start)
+    preflight_s = time.perf_counter() - t0
+    if not report.ok:
+        raise SystemExit("\n".join(report.lines()))
+
+    executor = ProgramExecutor(ROBOT, steps, vel=args.vel, acc=30, dec=30, pl=pl,
+                               lookahead=args.lookahead, poll_interval=args.poll_ms / 1000.0)
+    executor.start()
+    executor.join()
+    stats = executor.stats
+    if stats.steps_done != count:
+        raise SystemExit(f"executor stopped after {stats.steps_done}/{count} steps")
+
+    motion = report.estimated_cycle_time / args.time_scale
+    dispatch = percentiles(stats.dispatch)
+    gaps = percentiles(stats.idle_gaps)
+    return {
+        "steps": count,
+        "preflight_s": preflight_s,
+        "cycle_time_s": stats.cycle_time,
+        "motion_s": motion,
+        "overhead_s": stats.cycle_time - motion,
+        "overhead_per_step_ms": (stats.cycle_time - motion) / count * 1e3,
+        "steps_per_sec": count / stats.cycle_time,
+        "dispatch_us": {k: v * 1e6 for k, v in dispatch.items()},
+        "idle_gap_ms": {k: v * 1e3 for k, v in gaps.items()},
+        "idle_gap_hist": histogram(stats.idle_gaps),
+    }
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.05):
+    """
+    Regression messages for cases whose overhead per step or idle gap p50
+    grew by more than tolerance; changes under min_delta_ms are noise.
+    """
+    before = {case["steps"]: case for case in baseline.get("results", [])}
+    regressions = []
+    for case in current["results"]:
+        old = before.get(case["steps"])
+        if old is None:
+            continue
+        for key, now, was in (("overhead/step ms", case["overhead_per_step_ms"], old["overhead_per_step_ms"]),
+                              ("idle gap p50 ms", case["idle_gap_ms"]["p50"], old["idle_gap_ms"]["p50"])):
+            if now > was * (1 + tolerance) and now - was > min_delta_ms:
+                regressions.append(f"{case['steps']} steps: {key} {was:.3f} -> {now:.3f}")
+    return regressions
+
+def main():
+    args = ARGS
+    status = functions.connect_robot("127.0.0.1", "6001", ROBOT)
+    if status != 0:
+        raise SystemExit(f"connect_robot failed with code {status}")
+    functions.set_servo_state(1, ROBOT)
+    functions.set_servo_poweron(ROBOT)
+
+    results = []
+    print(f"{'steps':>7}{'cycle s':>10}{'motion s':>10}{'ovh/step ms':>13}"
+          f"{'disp p50 us':>13}{'disp p99 us':>13}{'gap p50 ms':>12}{'gap p99 ms':>12}")
+    for count in args.sizes:
+        r = run_case(count, args)
+        results.append(r)
+        print(f"{count:>7}{r['cycle_time_s']:>10.3f}{r['motion_s']:>10.3f}{r['overhead_per_step_ms']:>13.3f}"
+              f"{r['dispatch_us']['p50']:>13.1f}{r['dispatch_us']['p99']:>13.1f}"
+              f"{r['idle_gap_ms']['p50']:>12.3f}{r['idle_gap_ms']['p99']:>12.3f}")
+
+    report = {
+        "meta": {
+            "backend": functions.BACKEND,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time_scale": args.time_scale,
+            "vel": args.vel,
+            "pl": args.pl,
+            "lookahead": args.lookahead,
+            "poll_ms": args.poll_ms,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+
+# -------------------------
+# Priorities (lower runs first)
+# -------------------------
+PRIORITY_STOP = 0     # e-stop, job stop, servo off: jump the queue, cancel queued motion
+PRIORITY_MOTION = 1   # moves, jogs, servo on, connect/disconnect
+PRIORITY_QUERY = 2    # position / state reads (telemetry, polling)
+
+PRIORITY_NAMES = {PRIORITY_STOP: "stop", PRIORITY_MOTION: "motion", PRIORITY_QUERY: "query"}
+
+class CommandCancelled(Exception):
+    """A queued motion command was dropped because a stop command arrived."""
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "enqueued", "cancelled")
+
+    def __init__(self, priority, seq, enqueued):
+        self.priority = priority
+        self.seq = seq
+        self.enqueued = enqueued
+        self.cancelled = False
+
+# -------------------------
+# Channel statistics
+# -------------------------
+class ChannelStats:
+    """
+    Counters for one channel. Wait times (seconds spent queued before the
+    call started) are kept per priority for the last history calls.
+    """
+
+    def __init__(self, history: int = 1000):
+        self.calls = 0
+        self.cancelled = 0
+        self.max_depth = 0
+        self.waits = {p: deque(maxlen=history) for p in PRIORITY_NAMES}
+
+    def summary(self) -> dict:
+        out = {"calls": self.calls, "cancelled": self.cancelled, "max_depth": self.max_depth}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self.waits[priority])
+            out[f"{name}_wait_mean"] = sum(waits) / len(waits) if waits else 0.0
+            out[f"{name}_wait_p99"] = waits[min(len(waits) - 1, int(0.99 * len(waits)))] if waits else 0.0
+        return out
+
+# -------------------------
+# Command channel
+# -------------------------
+class CommandChannel:
+    """
+    Serialises the foreign calls made for one robot, whatever thread they
+    come from. A call runs on the caller's thread once it gets its turn;
+    waiting callers are served by priority, then in arrival order, so a
+    stop never waits behind queued motion or telemetry reads (it can only
+    wait for the single call already inside the DLL). When a stop arrives,
+    motion commands still queued are cancelled with CommandCancelled
+    instead of running after it.
+    concurrency: calls allowed inside the DLL at once (1 = fully
+                 serialised; raise it only if the library is thread-safe)
+    """
+
+    def __init__(self, robot_name: str, concurrency: int = 1):
+        self.robot_name = robot_name
+        self.concurrency = max(1, concurrency)
+        self.stats = ChannelStats()
+        self._cond = threading.Condition(threading.Lock())
+        self._active = 0
+        self._waiting = []
+        self._seq = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of callers currently queued for a turn."""
+        return len(self._waiting)
+
+    def acquire(self, priority: int = PRIORITY_QUERY) -> float:
+        """
+        Block until it is this caller's turn; returns the time waited.
+        Raises CommandCancelled if a stop cancels a queued motion command.
+        """
+        with self._cond:
+            self.stats.calls += 1
+            if self._active < self.concurrency and not self._waiting:
+                self._active += 1  # fast path: nobody ahead of us
+                self.stats.waits[priority].append(0.0)
+                return 0.0
+
+            self._seq += 1
+            ticket = _Ticket(priority, self._seq, time.perf_counter())
+            if priority == PRIORITY_STOP:
+                for other in self._waiting:
+                    if other.priority == PRIORITY_MOTION:
+                        other.cancelled = True
+                self._cond.notify_all()
+            self._waiting.append(ticket)
+            self.stats.max_depth = max(self.stats.max_depth, len(self._waiting))
+            try:
+                while True:
+                    if ticket.cancelled:
+                        self.stats.cancelled += 1
+                        raise CommandCancelled(f"{self.robot_name}: motion command cancelled by stop")
+                    if self._active < self.concurrency and ticket is self._next():
+                        break
+                    self._cond.wait()
+            finally:
+                self._waiting.remove(ticket)
+            self._active += 1
+            waited = time.perf_counter() - ticket.enqueued
+            self.stats.waits[priority].append(waited)
+            return waited
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            if self._waiting:
+                self._cond.notify_all()
+
+    def _next(self):
+        best = None
+        for ticket in self._waiting:
+            if not ticket.cancelled and (best is None or (ticket.priority, ticket.seq) < (best.priority, best.seq)):
+                best = ticket
+        return best
+
+    def call(self, fn, *args, priority: int = PRIORITY_QUERY):
+        """Run fn(*args) when it is this caller's turn and return its result."""
+        self.acquire(priority)
+        try:
+            return fn(*args)
+        finally:
+            self.release()
+
+    def turn(self, priority: int = PRIORITY_QUERY):
+        """Context manager holding one turn, e.g. for several reads in a row."""
+        return _Turn(self, priority)
+
+class _Turn:
+    __slots__ = ("channel", "priority")
+
+    def __init__(self, channel, priority):
+        self.channel = channel
+        self.priority = priority
+
+    def __enter__(self):
+        self.channel.acquire(self.priority)
+        return self.channel
+
+    def __exit__(self, *exc):
+        self.channel.release()
+        return False
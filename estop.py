@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+
+import functions  # Ctypes functions
+import metrics
+
+# -------------------------
+# Emergency stop worker
+# -------------------------
+class EStopResult:
+    """
+    Outcome of one emergency stop (times in seconds, from trigger()).
+    dispatch: until job_stop returned (motion halted)
+    total: until the servos were switched off
+    errors: exceptions raised by the stop calls (the sequence continues)
+    """
+
+    __slots__ = ("triggered", "dispatch", "total", "errors")
+
+    def __init__(self, triggered):
+        self.triggered = triggered
+        self.dispatch = 0.0
+        self.total = 0.0
+        self.errors = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+class EStopWorker(threading.Thread):
+    """
+    Dedicated stop path for one robot. trigger() only records the time and
+    sets an event, so it is safe to call from any thread (a button slot, a
+    watchdog) and returns at once; this thread is parked on that event and
+    immediately sends job_stop, servo state 0 and power off. The calls go
+    through the command channel as stop commands, so they never wait behind
+    queued motion or telemetry, and cancel motion still queued. Nothing
+    that could block (locks, other threads) runs before them.
+    after_stop: optional callable run on this thread once the stop calls
+                were sent (e.g. stop the program executor, forget targets)
+    jog: the robot's JogController; a continuous jog in progress is ended
+         with robot_stop_jogging before job_stop (JogController.cancel()
+         never blocks)
+    on_done(result): called from this thread after each stop
+    """
+
+    def __init__(self, robot_name: str, after_stop=None, jog=None, on_done=None,
+                 history: int = 100):
+        super().__init__(name=f"estop-{robot_name}", daemon=True)
+        self.robot_name = robot_name
+        self.after_stop = after_stop
+        self.jog = jog
+        self.on_done = on_done
+        self.results = deque(maxlen=history)
+        self._triggered = 0.0
+        self._pending = threading.Event()
+        self._closing = False
+
+    def trigger(self):
+        """Request an emergency stop; returns immediately."""
+        if not self._pending.is_set():
+            self._triggered = time.perf_counter()
+            self._pending.set()
+
+    def close(self, timeout: float = 1.0):
+        self._closing = True
+        self._pending.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while True:
+            self._pending.wait()
+            if self._closing:
+                return
+            result = EStopResult(self._triggered)
+            self._send_stop(result)
+            self._pending.clear()
+            self.results.append(result)
+            metrics.ESTOPS.inc(self.robot_name)
+            metrics.ESTOP_DISPATCH.observe(result.dispatch, self.robot_name)
+            metrics.ESTOP_TOTAL.observe(result.total, self.robot_name)
+            if self.on_done:
+                self.on_done(result)
+
+    def _send_stop(self, result):
+        name = self.robot_name
+        calls = [functions.job_stop.checked, lambda n: functions.set_servo_state.checked(0, n),
+                 functions.set_servo_poweroff.checked]
+        axis = self.jog.cancel() if self.jog is not None else None
+        if axis is not None:
+            calls.insert(0, lambda n: functions.robot_stop_jogging.checked(axis, n))
+        for call in calls:
+            try:
+                call(name)
+            except Exception as e:
+                result.errors.append(e)
+            if not result.dispatch:
+                result.dispatch = time.perf_counter() - result.triggered
+        result.total = time.perf_counter() - result.triggered
+        if self.after_stop:
+            try:
+                self.after_stop()
+            except Exception as e:
+                result.errors.append(e)
+
+    def latency_summary(self) -> dict:
+        """Dispatch/total latency (seconds) over the kept results."""
+        dispatch = sorted(r.dispatch for r in self.results)
+        total = sorted(r.total for r in self.results)
+        if not total:
+            return {"stops": 0, "dispatch_max": 0.0, "total_mean": 0.0, "total_max": 0.0}
+        return {
+            "stops": len(total),
+            "dispatch_max": dispatch[-1],
+            "total_mean": sum(total) / len(total),
+            "total_max": total[-1],
+        }
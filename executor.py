@@ -0,0 +1,285 @@
+import threading
+import time
+from collections import deque
+
+import functions  # Ctypes functions
+import metrics
+
+# Errors meaning the link to the controller is gone rather than a bad step
+# (depends on the backend, see functions.LINK_ERRORS)
+LINK_ERRORS = functions.LINK_ERRORS
+
+# -------------------------
+# Execution statistics
+# -------------------------
+class ExecutorStats:
+    """
+    Timing collected while a program runs (all values in seconds).
+    dispatch: duration of each robot_movej call
+    idle_gaps: time from observing the previous step finished
+               to the next step being sent (one per step after the first)
+    """
+
+    def __init__(self):
+        self.dispatch = []
+        self.idle_gaps = []
+        self.cycle_time = 0.0
+        self.steps_done = 0
+
+    def summary(self) -> dict:
+        gaps = sorted(self.idle_gaps)
+        return {
+            "steps": self.steps_done,
+            "cycle_time": self.cycle_time,
+            "dispatch_mean": sum(self.dispatch) / len(self.dispatch) if self.dispatch else 0.0,
+            "gap_mean": sum(gaps) / len(gaps) if gaps else 0.0,
+            "gap_p50": gaps[len(gaps) // 2] if gaps else 0.0,
+            "gap_max": gaps[-1] if gaps else 0.0,
+        }
+
+# -------------------------
+# Program executor
+# -------------------------
+class ProgramExecutor(threading.Thread):
+    """
+    Runs a list of joint-space steps on a worker thread.
+    Motion state is polled every poll_interval and the next step is sent
+    as soon as the previous one is seen to finish.
+    steps: sequence of 7-float positions
+    vel, acc, dec: motion parameters (vel may be changed while running)
+    pl: blend level, one int for all steps or one per step.
+        0 = full stop at the waypoint; >0 = once the move has started, the
+        next step is sent when every joint is within pl * zone_per_pl
+        degrees of the target (at most half the shorter adjacent move, as
+        in preflight), so the arm flows through the waypoint instead of
+        decelerating to zero.
+    lookahead: number of upcoming steps kept prepared as MoveCmd structs.
+        This is Python-side only: nrc_lib has no motion queue, so steps
+        cannot be submitted to the controller ahead of time and each one
+        is sent when the previous one finishes or enters its blend zone.
+    start: index of the first step to run (to resume a paused program)
+    can_move: callable returning False while no step may be sent (e.g. the
+              e-stop is engaged); checked right before every dispatch, and
+              a False ends the run like stop()
+    link_alive: callable returning False if the controller link is down;
+                asked after an NrcError that LINK_ERRORS does not classify
+                (any error on the DLL backend), so a dropped link pauses
+                the run instead of failing it
+    Callbacks are invoked from the worker thread:
+        on_step(index), on_finished(stats), on_error(exception),
+        on_paused(index): the run was paused (pause() or a lost connection);
+                          index is the step to resume from
+    """
+
+    def __init__(self, robot_name: str, steps, vel: int = 30, acc: int = 30, dec: int = 30,
+                 pl=0, lookahead: int = 1, zone_per_pl: float = 2.0,
+                 poll_interval: float = 0.002, start_timeout: float = 0.5, start: int = 0,
+                 can_move=None, link_alive=None, on_step=None, on_finished=None, on_error=None, on_paused=None):
+        super().__init__(name=f"executor-{robot_name}", daemon=True)
+        self.robot_name = robot_name
+        self.steps = steps
+        self.vel = vel
+        self.acc = acc
+        self.dec = dec
+        self.pl = pl
+        self.lookahead = max(1, lookahead)
+        self.zone_per_pl = zone_per_pl
+        self.poll_interval = poll_interval
+        self.start_timeout = start_timeout
+        self.can_move = can_move
+        self.link_alive = link_alive
+        self.on_step = on_step
+        self.on_finished = on_finished
+        self.on_error = on_error
+        self.on_paused = on_paused
+        self.start_index = start
+        self.stats = ExecutorStats()
+        self.current_step = -1
+        self.paused = False
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Stop after the current step; no further steps are sent."""
+        self._stop_event.set()
+
+    def pause(self):
+        """
+        Like stop(), but the run ends with on_paused(resume index) and
+        errors from the interrupted step are not reported.
+        """
+        self.paused = True
+        self._stop_event.set()
+
+    @property
+    def resume_index(self) -> int:
+        """Step to resume from: the one in progress (moves are absolute, so resending it is safe)."""
+        return self.current_step if self.current_step >= 0 else self.start_index
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def run(self):
+        try:
+            self._run_program()
+        except Exception as e:
+            if self._link_error(e):
+                self.paused = True  # the connection dropped under us: pause, not fail
+            if not self.paused:
+                if self.on_error:
+                    self.on_error(e)
+                return
+        if self.paused:
+            if self.on_paused:
+                self.on_paused(self.resume_index)
+            return
+        if self.on_finished:
+            self.on_finished(self.stats)
+
+    def _link_error(self, e) -> bool:
+        if isinstance(e, LINK_ERRORS):
+            return True
+        return (isinstance(e, functions.NrcError) and self.link_alive is not None
+                and not self.link_alive())
+
+    def _step_pl(self, index: int) -> int:
+        if isinstance(self.pl, int):
+            return self.pl
+        return self.pl[index]
+
+    def _prepare(self, cmd, index: int):
+        """Fill a reusable MoveCmd for step index."""
+        cmd.pos[:] = self.steps[index]
+        cmd.coord = 0
+        cmd.velocity = self.vel
+        cmd.acc = self.acc
+        cmd.dec = self.dec
+        cmd.pl = self._step_pl(index)
+        return cmd
+
+    def _run_program(self):
+        handle = functions.get_handle(self.robot_name)
+        stats = self.stats
+        count = len(self.steps)
+        start = time.perf_counter()
+        done_at = None
+
+        # Look-ahead queue: the next steps are converted ahead of time, so a
+        # dispatch only passes an already-filled struct to the DLL (the DLL
+        # itself takes one move at a time, there is nothing to pre-submit).
+        pool = [functions.MoveCmd() for _ in range(self.lookahead + 1)]
+        queue = deque()
+        next_index = self.start_index
+
+        for index in range(self.start_index, count):
+            if self._stop_event.is_set():
+                break
+            while next_index < count and len(queue) < self.lookahead:
+                queue.append(self._prepare(pool[next_index % len(pool)], next_index))
+                next_index += 1
+            cmd = queue.popleft()
+            cmd.velocity = self.vel  # follow live speed changes
+            if self.can_move is not None and not self.can_move():
+                self._stop_event.set()
+                break
+
+            # --- Dispatch ---
+            self.current_step = index
+            t0 = time.perf_counter()
+            status = handle.send_cmd(cmd)
+            if status != 0 and done_at is not None and self._step_pl(index - 1) > 0:
+                # Controller refused a command while still moving:
+                # fall back to a full stop for this waypoint and retry once.
+                self._wait_motion_done()
+                t0 = time.perf_counter()
+                status = handle.send_cmd(cmd)
+            t1 = time.perf_counter()
+            functions.raise_for_status("robot_movej", status, f"at step {index + 1}")
+            stats.dispatch.append(t1 - t0)
+            if done_at is not None:
+                stats.idle_gaps.append(t0 - done_at)
+            if self.on_step:
+                self.on_step(index)
+
+            # --- Wait for motion (or for the blend zone) ---
+            zone = self._blend_zone(index, cmd.pl) if index + 1 < count else 0.0
+            if zone > 0:
+                done_at = self._wait_in_zone(handle, cmd.pos, zone, self._segment_start(index))
+            else:
+                done_at = self._wait_motion_done()
+            stats.steps_done += 1
+            metrics.PROGRAM_STEPS.inc(self.robot_name)
+
+        stats.cycle_time = time.perf_counter() - start
+        if not self.stopped:
+            metrics.PROGRAM_CYCLE.observe(stats.cycle_time, self.robot_name)
+            if stats.cycle_time > 0:
+                metrics.PROGRAM_RATE.set(stats.steps_done / stats.cycle_time, self.robot_name)
+
+    def _segment_start(self, index: int):
+        """Where move index starts: the previous step, None for the first one."""
+        return self.steps[index - 1] if index > 0 else None
+
+    @staticmethod
+    def _distance(a, b) -> float:
+        return max(abs(a[i] - b[i]) for i in range(6))
+
+    def _blend_zone(self, index: int, pl: int) -> float:
+        """
+        Blend zone of step index in degrees, clamped to half the shorter of
+        the moves into and out of it, so a short move is never skipped.
+        """
+        if pl <= 0:
+            return 0.0
+        target = self.steps[index]
+        limit = self._distance(target, self.steps[index + 1])
+        if index > 0:
+            limit = min(limit, self._distance(self.steps[index - 1], target))
+        return min(pl * self.zone_per_pl, 0.5 * limit)
+
+    def _wait_in_zone(self, handle, target, zone: float, segment_start=None) -> float:
+        """
+        Block until the move has started and every joint is within zone of
+        target, or the arm stops. The move counts as started once the
+        controller reports running, or once the arm is more than half way
+        from segment_start (which the zone clamp guarantees before the zone
+        can be reached). Returns the perf_counter time at which that was
+        observed.
+        """
+        wait = self._stop_event.wait
+        pos = handle.position
+        started = False
+        half = 0.5 * self._distance(segment_start, target) if segment_start is not None else None
+        deadline = time.perf_counter() + self.start_timeout
+        while True:
+            handle.read_position_into(pos, coord=0)
+            running = functions.get_robot_running_state(self.robot_name) != 0
+            now = time.perf_counter()
+            if running or (half is not None and self._distance(pos, segment_start) > half):
+                started = True
+            if started and self._distance(pos, target) <= zone:
+                return now
+            if not running and (started or now >= deadline):
+                return now
+            if wait(self.poll_interval):
+                return now
+
+    def _wait_motion_done(self) -> float:
+        """
+        Block until the running state returns to idle (0).
+        The controller may still report idle right after the command, so we
+        first wait (up to start_timeout) for it to leave idle.
+        Returns the perf_counter time at which idle was observed.
+        """
+        wait = self._stop_event.wait
+        started = False
+        deadline = time.perf_counter() + self.start_timeout
+        while True:
+            state = functions.get_robot_running_state(self.robot_name)
+            now = time.perf_counter()
+            if state != 0:
+                started = True
+            elif started or now >= deadline:
+                return now
+            if wait(self.poll_interval):
+                return now
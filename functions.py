@@ -1,73 +1,465 @@
 import ctypes
 import os
+import threading
+import time
+from array import array
 
-# Load the DLL
-lib_path = os.path.abspath("libnrc_host.dll")
-nrc_lib = ctypes.CDLL(lib_path)
+from channel import CommandChannel, PRIORITY_MOTION, PRIORITY_QUERY, PRIORITY_STOP
+import metrics
+import profiling
 
-# --- connect_robot ---
-nrc_lib.connect_robot.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p]
-nrc_lib.connect_robot.restype = ctypes.c_int
+# -------------------------
+# Backend selection
+# -------------------------
+# COBOT_BACKEND=dll (default) loads the controller DLL,
+# COBOT_BACKEND=sim uses the pure-Python simulator (no hardware, any OS).
+# COBOT_SIM_LATENCY_MS adds a fixed delay to every simulated call and
+# COBOT_SIM_TIME_SCALE runs simulated motions faster than real time.
+# COBOT_BACKEND=tcp talks to a stand-in controller (sim_server.py) over TCP.
+BACKEND = os.environ.get("COBOT_BACKEND", "dll").lower()
 
-def connect_robot(ip: str, port: str, robot_name: str) -> int:
-    return nrc_lib.connect_robot(ip.encode("utf-8"),
-                                 port.encode("utf-8"),
-                                 robot_name.encode("utf-8"))
+def load_backend(name: str):
+    """
+    Returns an object exposing the nrc_lib.h functions for backend name.
+    """
+    if name == "sim":
+        from sim_backend import SimulatedNrcLib
+        latency = float(os.environ.get("COBOT_SIM_LATENCY_MS", "0")) / 1000.0
+        time_scale = float(os.environ.get("COBOT_SIM_TIME_SCALE", "1"))
+        return SimulatedNrcLib(call_latency=latency, time_scale=time_scale)
+    if name == "tcp":
+        from tcp_backend import RemoteNrcLib
+        timeout = float(os.environ.get("COBOT_TCP_TIMEOUT_MS", "500")) / 1000.0
+        return RemoteNrcLib(timeout=timeout)
+    if name == "dll":
+        lib_path = os.path.abspath("libnrc_host.dll")
+        return ctypes.CDLL(lib_path)
+    raise ValueError(f"Unknown backend '{name}' (expected 'dll', 'sim' or 'tcp')")
 
-# --- disconnect_robot ---
-nrc_lib.disconnect_robot.argtypes = [ctypes.c_char_p]
-nrc_lib.disconnect_robot.restype = ctypes.c_int
+nrc_lib = load_backend(BACKEND)  # symbols are looked up on first use, see _symbol()
 
-def disconnect_robot(robot_name: str) -> int:
-    return nrc_lib.disconnect_robot(robot_name.encode("utf-8"))
+# -------------------------
+# Per-robot command channels
+# -------------------------
+# Every foreign call below goes through its robot's CommandChannel, so
+# calls from the GUI, telemetry, executor and recorder threads never
+# overlap inside the DLL and stop commands are served first.
+# COBOT_CHANNEL_CONCURRENCY > 1 lets that many calls per robot run at once
+# (only if the library is known to be thread-safe).
+CHANNEL_CONCURRENCY = int(os.environ.get("COBOT_CHANNEL_CONCURRENCY", "1"))
+_channels = {}
+_channels_lock = threading.Lock()
 
-# --- set_servo_state ---
-nrc_lib.set_servo_state.argtypes = [ctypes.c_int, ctypes.c_char_p]
-nrc_lib.set_servo_state.restype = ctypes.c_int
+def get_channel(robot_name: str) -> CommandChannel:
+    """Returns the CommandChannel of robot_name (created on first use)."""
+    channel = _channels.get(robot_name)
+    if channel is None:
+        with _channels_lock:
+            channel = _channels.get(robot_name)
+            if channel is None:
+                channel = _channels[robot_name] = CommandChannel(robot_name, CHANNEL_CONCURRENCY)
+    return channel
 
-def set_servo_state(state: int, robot_name: str) -> int:
+# -------------------------
+# Error codes
+# -------------------------
+class NrcError(Exception):
     """
-    state = 1 -> ON, 0 -> OFF
+    A nrc_lib call returned a non-zero status.
+    function: name of the exported function
+    code: the status it returned
     """
-    return nrc_lib.set_servo_state(state, robot_name.encode("utf-8"))
 
-# --- set_servo_poweron ---
-nrc_lib.set_servo_poweron.argtypes = [ctypes.c_char_p]
-nrc_lib.set_servo_poweron.restype = ctypes.c_int
+    def __init__(self, function: str, code: int, detail: str = ""):
+        self.function = function
+        self.code = code
+        message = f"{function} failed with code {code}"
+        if code in ERROR_TEXT:
+            message += f" ({ERROR_TEXT[code]})"
+        if detail:
+            message += f" {detail}"
+        super().__init__(message)
+
+class NotConnectedError(NrcError):
+    pass
 
-def set_servo_poweron(robot_name: str) -> int:
-    return nrc_lib.set_servo_poweron(robot_name.encode("utf-8"))
+class ServoNotReadyError(NrcError):
+    pass
 
-# --- set_servo_poweroff ---
-nrc_lib.set_servo_poweroff.argtypes = [ctypes.c_char_p]
-nrc_lib.set_servo_poweroff.restype = ctypes.c_int
+class BadArgumentError(NrcError):
+    pass
 
-def set_servo_poweroff(robot_name: str) -> int:
-    return nrc_lib.set_servo_poweroff(robot_name.encode("utf-8"))
+class ControllerFaultError(NrcError):
+    pass
+
+class ControllerTimeoutError(NrcError):
+    pass
+
+# kind used in a backend's STATUS_CODES -> exception class
+ERROR_KINDS = {
+    "not_connected": NotConnectedError,
+    "servo_not_ready": ServoNotReadyError,
+    "bad_argument": BadArgumentError,
+    "controller_fault": ControllerFaultError,
+    "timeout": ControllerTimeoutError,
+}
+
+def _error_codes(backend: str, lib) -> dict:
+    """
+    status -> (exception class, description) of the loaded backend.
+    The sim and tcp backends declare their own codes (STATUS_CODES);
+    nrc_lib.h documents none for the DLL, so there every non-zero status
+    raises plain NrcError with the number.
+    """
+    codes = {} if backend == "dll" else getattr(lib, "STATUS_CODES", {})
+    return {code: (ERROR_KINDS[kind], text) for code, (kind, text) in codes.items()}
+
+# other non-zero codes raise NrcError
+ERROR_CODES = _error_codes(BACKEND, nrc_lib)
+ERROR_TEXT = {code: text for code, (_, text) in ERROR_CODES.items()}
+
+# Link conventions of the backend. CONNECTED_STATUS: the
+# get_connection_status value meaning connected; None (the DLL, whose
+# values are undocumented) = take the value it returns right after a
+# successful connect_robot (see RobotSession.connect). LINK_ERRORS: the
+# errors known to mean the link is gone rather than a bad call (empty
+# for the DLL; there a failed call counts as a link error if the
+# connection status no longer reads connected, see ProgramExecutor).
+CONNECTED_STATUS = None if BACKEND == "dll" else getattr(nrc_lib, "CONNECTED_STATUS", None)
+LINK_ERRORS = tuple(cls for cls in (NotConnectedError, ControllerTimeoutError)
+                    if any(mapped is cls for mapped, _ in ERROR_CODES.values()))
+
+def raise_for_status(function: str, status: int, detail: str = ""):
+    """
+    Raise the exception mapped to status unless it is 0.
+    detail: appended to the message, e.g. which program step failed
+    """
+    if status != 0:
+        error = ERROR_CODES.get(status, (NrcError, ""))[0]
+        raise error(function, status, detail)
 
 # -------------------------
-# get_current_position
+# Binding table (nrc_lib.h)
+# -------------------------
+# name: (restype, argtypes, priority, returns, doc)
+#   priority: command channel priority, or a function of the call
+#             arguments returning one
+#   returns: "status" (0 = success, see raise_for_status) or "value"
+# Every export takes the robot name (const char*) last. Symbols are looked
+# up and typed on first use only, so importing this module costs nothing
+# per function and a DLL missing a newer export still loads.
+_int, _bool, _str = ctypes.c_int, ctypes.c_bool, ctypes.c_char_p
+_pose = ctypes.POINTER(ctypes.c_double)
+
+def _servo_priority(state, robot_name):
+    return PRIORITY_STOP if state == 0 else PRIORITY_MOTION
+
+BINDINGS = {
+    # --- connection ---
+    "connect_robot": (_int, [_str, _str, _str], PRIORITY_MOTION, "status",
+                      "connect_robot(ip, port, robot_name)"),
+    "disconnect_robot": (_int, [_str], PRIORITY_MOTION, "status",
+                         "disconnect_robot(robot_name)"),
+    "get_connection_status": (_int, [_str], PRIORITY_QUERY, "value",
+                              "get_connection_status(robot_name): connection state (the values are not "
+                              "documented for the DLL; the sim and tcp backends return 0 while "
+                              "connected)."),
+    "clear_error": (_int, [_str], PRIORITY_MOTION, "status",
+                    "clear_error(robot_name): clear any active robot errors."),
+    # --- servo ---
+    "set_servo_state": (_int, [_int, _str], _servo_priority, "status",
+                        "set_servo_state(state, robot_name): 1 -> ON, 0 -> OFF "
+                        "(OFF is sent as a stop command)."),
+    "get_servo_state": (_int, [_str], PRIORITY_QUERY, "value",
+                        "get_servo_state(robot_name): 0 = stop, 1 = ready, 2 = error, 3 = running."),
+    "set_servo_poweron": (_int, [_str], PRIORITY_MOTION, "status",
+                          "set_servo_poweron(robot_name)"),
+    "set_servo_poweroff": (_int, [_str], PRIORITY_STOP, "status",
+                           "set_servo_poweroff(robot_name) (sent as a stop command)."),
+    # --- state ---
+    "get_current_position": (_int, [_pose, _int, _str], PRIORITY_QUERY, "status",
+                             "get_current_position(pos, coord, robot_name): fill 7 doubles."),
+    "get_robot_running_state": (_int, [_str], PRIORITY_QUERY, "value",
+                                "get_robot_running_state(robot_name): 0 = idle, non-zero = moving."),
+    "set_speed": (_int, [_int, _str], PRIORITY_MOTION, "status",
+                  "set_speed(speed, robot_name): speed override 1..100 %, used by jogging."),
+    "get_speed": (_int, [_str], PRIORITY_QUERY, "value",
+                  "get_speed(robot_name): speed override in %."),
+    "set_current_coord": (_int, [_int, _str], PRIORITY_MOTION, "status",
+                          "set_current_coord(coord, robot_name): 0 = joint, 1 = Cartesian (base), "
+                          "2 = tool, 3 = user."),
+    "get_current_coord": (_int, [_str], PRIORITY_QUERY, "value",
+                          "get_current_coord(robot_name)"),
+    "set_current_mode": (_int, [_int, _str], PRIORITY_MOTION, "status",
+                         "set_current_mode(mode, robot_name): 0 = teach, 1 = remote, 2 = run."),
+    "get_current_mode": (_int, [_str], PRIORITY_QUERY, "value",
+                         "get_current_mode(robot_name)"),
+    # --- jogging ---
+    "robot_start_jogging": (_int, [_int, _bool, _str], PRIORITY_MOTION, "status",
+                            "robot_start_jogging(axis, direction, robot_name): move axis 1..7 "
+                            "(a joint, or X, Y, Z, Rx, Ry, Rz of the current coordinate system) "
+                            "until robot_stop_jogging; direction True = positive."),
+    "robot_stop_jogging": (_int, [_int, _str], PRIORITY_STOP, "status",
+                           "robot_stop_jogging(axis, robot_name) (sent as a stop command)."),
+    # --- motion ---
+    "robot_go_to_reset_position": (_int, [_str], PRIORITY_MOTION, "status",
+                                   "robot_go_to_reset_position(robot_name)"),
+    "robot_go_home": (_int, [_str], PRIORITY_MOTION, "status",
+                      "robot_go_home(robot_name): move to the controller's home position."),
+    "robot_movej": (_int, [_pose, _int, _int, _int, _int, _str], PRIORITY_MOTION, "status",
+                    "robot_movej(pos, vel, coord, acc, dec, robot_name)"),
+    "robot_movel": (_int, [_pose, _int, _int, _int, _int, _str], PRIORITY_MOTION, "status",
+                    "robot_movel(pos, vel, coord, acc, dec, robot_name)"),
+    "job_stop": (_int, [_str], PRIORITY_STOP, "status",
+                 "job_stop(robot_name): stop the current motion/job immediately (sent as a "
+                 "stop command, so it jumps the queue and cancels queued motion)."),
+}
+
+# Wrapped by hand below (list-based pose arguments, reusable buffers)
+_HAND_WRAPPED = ("get_current_position", "robot_movej", "robot_movel")
+
+_symbols = {}
+_symbols_lock = threading.Lock()
+
+def _symbol(name: str):
+    """
+    Returns the foreign function name with argtypes/restype set, looking
+    it up in the backend on first use only. With metrics enabled the
+    returned function also counts and times every call, and while
+    profiling is on it records a span per call.
+    """
+    fn = _symbols.get(name)
+    if fn is None:
+        with _symbols_lock:
+            fn = _symbols.get(name)
+            if fn is None:
+                restype, argtypes, _, returns = BINDINGS[name][:4]
+                fn = getattr(nrc_lib, name)
+                fn.argtypes = argtypes
+                fn.restype = restype
+                if metrics.ENABLED:
+                    fn = metrics.instrument(name, fn, status_result=returns == "status")
+                if profiling.TRACER.enabled:
+                    fn = profiling.trace_call(name, fn)
+                _symbols[name] = fn
+    return fn
+
+def _rebind(tracing: bool):
+    """Drop the bound symbols so the next calls pick up (or shed) tracing."""
+    with _symbols_lock:
+        _symbols.clear()
+
+profiling.TRACER.listeners.append(_rebind)
+
+def _make_wrapper(name: str):
+    """
+    Builds name(*args, robot_name) -> int from its BINDINGS entry: str
+    arguments are encoded to UTF-8 and the call goes through the robot's
+    command channel. name.checked(...) makes the same call but raises the
+    mapped NrcError on a non-zero status.
+    """
+    _, argtypes, priority, returns, doc = BINDINGS[name]
+    text_args = [i for i, t in enumerate(argtypes) if t is _str]
+
+    def wrapper(*args):
+        robot_name = args[-1]
+        if text_args:
+            args = list(args)
+            for i in text_args:
+                args[i] = args[i].encode("utf-8")
+        p = priority(*args) if callable(priority) else priority
+        return get_channel(robot_name).call(_symbol(name), *args, priority=p)
+
+    def checked(*args):
+        result = wrapper(*args)
+        if returns == "status":
+            raise_for_status(name, result)
+        return result
+
+    wrapper.__name__ = checked.__name__ = name
+    wrapper.__doc__ = checked.__doc__ = doc
+    wrapper.checked = checked
+    return wrapper
+
+for _name in BINDINGS:
+    if _name not in _HAND_WRAPPED:
+        globals()[_name] = _make_wrapper(_name)
+del _name
+
+# -------------------------
+# Per-robot handle with reusable buffers
 # -------------------------
-nrc_lib.get_current_position.argtypes = [ctypes.POINTER(ctypes.c_double), ctypes.c_int, ctypes.c_char_p]
-nrc_lib.get_current_position.restype = ctypes.c_int
+PoseArray = ctypes.c_double * 7
+
+def pose_view(out, offset: int = 0):
+    """
+    Bind a 7-double ctypes view onto caller memory without copying.
+    out: writable float64 buffer (array('d'), NumPy array, memoryview, ctypes array)
+    offset: index of the first element inside out
+    Keep the view around and pass it to read_position_into to skip rebinding.
+    """
+    return PoseArray.from_buffer(out, offset * ctypes.sizeof(ctypes.c_double))
+
+class MoveCmd(ctypes.Structure):
+    """
+    Mirrors struct MoveCmd in nrc_lib.h.
+    pl: blend level, 0 = stop exactly at pos, higher = larger blend zone
+    """
+    _fields_ = [
+        ("pos", ctypes.c_double * 7),
+        ("coord", ctypes.c_int),
+        ("velocity", ctypes.c_double),
+        ("acc", ctypes.c_double),
+        ("dec", ctypes.c_double),
+        ("pl", ctypes.c_int),
+        ("toolNum", ctypes.c_int),
+        ("userNum", ctypes.c_int),
+    ]
 
+class RobotHandle:
+    """
+    Caches the UTF-8 encoded robot name and owns the 7-double input/output
+    buffers used by the position and motion calls, so hot loops do not
+    allocate per call.
+    The owned buffers are not shared between threads: use get_handle(),
+    which keeps one handle per robot per thread.
+    """
+
+    def __init__(self, robot_name: str):
+        self.robot_name = robot_name
+        self.name = robot_name.encode("utf-8")
+        self.channel = get_channel(robot_name)
+        self.position = PoseArray()  # last read pose (output buffer)
+        self.target = PoseArray()    # last commanded pose (input buffer)
+
+    def read_position_into(self, out, coord: int = 0, offset: int = 0):
+        """
+        Fill out[offset:offset+7] with the current position, zero-copy.
+        out: writable float64 buffer, or a view from pose_view()
+        coord: 0 = joint, 1 = Cartesian
+        """
+        if isinstance(out, PoseArray) and offset == 0:
+            dest = out
+        else:
+            dest = pose_view(out, offset)
+        status = self.channel.call(_symbol("get_current_position"), dest, coord, self.name)
+        raise_for_status("get_current_position", status)
+        return out
+
+    def read_position(self, coord: int = 0):
+        """
+        Read the current position into the handle's own buffer and return it.
+        The returned ctypes array is overwritten by the next read.
+        """
+        return self.read_position_into(self.position, coord)
+
+    def read_snapshot(self, snapshot):
+        """
+        Read every frame listed in snapshot.coords back-to-back into its
+        contiguous buffer and stamp it. Returns the same snapshot.
+        """
+        read = _symbol("get_current_position")
+        with self.channel.turn():  # one turn, so no command lands between frames
+            start = time.perf_counter()
+            for coord, view in zip(snapshot.coords, snapshot.views):
+                raise_for_status("get_current_position", read(view, coord, self.name))
+        snapshot.latency = time.perf_counter() - start
+        snapshot.stamp = time.time()
+        return snapshot
+
+    def _load_target(self, pos):
+        if len(pos) != 7:
+            raise ValueError("pos must be a list of 7 floats")
+        self.target[:] = pos
+        return self.target
+
+    def movej(self, pos, vel: int, coord: int, acc: int, dec: int) -> int:
+        """Joint move to pos (7 floats) through the reusable input buffer."""
+        return self.channel.call(_symbol("robot_movej"), self._load_target(pos), vel, coord, acc, dec,
+                                 self.name, priority=PRIORITY_MOTION)
+
+    def movel(self, pos, vel: int, coord: int, acc: int, dec: int) -> int:
+        """Linear move to pos (7 floats) through the reusable input buffer."""
+        return self.channel.call(_symbol("robot_movel"), self._load_target(pos), vel, coord, acc, dec,
+                                 self.name, priority=PRIORITY_MOTION)
+
+    def send_cmd(self, cmd: MoveCmd, linear: bool = False) -> int:
+        """
+        Send a prepared MoveCmd; cmd.pos is passed to the DLL without copying.
+        The exported move calls take no pl/tool/user arguments, so those
+        fields are only used on the Python side (see executor blending).
+        """
+        move = _symbol("robot_movel" if linear else "robot_movej")
+        return self.channel.call(move, cmd.pos, int(cmd.velocity), cmd.coord, int(cmd.acc), int(cmd.dec),
+                                 self.name, priority=PRIORITY_MOTION)
+
+class PoseSnapshot:
+    """
+    Timestamped pose record for several coordinate frames, stored as one
+    contiguous float64 array (7 values per frame, in coords order).
+    coords: e.g. (0, 1) = joint + Cartesian
+    stamp: time.time() when the last frame was read
+    latency: seconds between the first and last frame read
+    """
+
+    __slots__ = ("coords", "stamp", "latency", "data", "views")
+
+    def __init__(self, coords=(0, 1)):
+        self.coords = tuple(coords)
+        self.stamp = 0.0
+        self.latency = 0.0
+        self.data = array("d", [0.0] * (7 * len(self.coords)))
+        self.views = [pose_view(self.data, 7 * i) for i in range(len(self.coords))]
+
+    def frame(self, coord: int):
+        """Returns the 7 values of one frame as a list."""
+        i = self.coords.index(coord)
+        return self.data[7 * i:7 * i + 7].tolist()
+
+_handles = threading.local()
+
+def get_handle(robot_name: str) -> RobotHandle:
+    """
+    Returns the calling thread's cached RobotHandle for robot_name.
+    """
+    cache = getattr(_handles, "cache", None)
+    if cache is None:
+        cache = _handles.cache = {}
+    handle = cache.get(robot_name)
+    if handle is None:
+        handle = cache[robot_name] = RobotHandle(robot_name)
+    return handle
+
+# -------------------------
+# get_current_position
+# -------------------------
 def get_current_position(robot_name: str, coord: int = 0):
     """
     Returns the current robot position as a list of 7 floats
     coord: 0 = joint, 1 = Cartesian (based on your robot)
     """
-    arr = (ctypes.c_double * 7)()
-    status = nrc_lib.get_current_position(arr, coord, robot_name.encode("utf-8"))
-    if status != 0:
-        raise Exception(f"get_current_position failed with code {status}")
-    return list(arr)
+    return list(get_handle(robot_name).read_position(coord))
 
 # -------------------------
-# robot_movej
+# get_pose_snapshot
 # -------------------------
-nrc_lib.robot_movej.argtypes = [ctypes.POINTER(ctypes.c_double), ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_char_p]
-nrc_lib.robot_movej.restype = ctypes.c_int
+def get_pose_snapshot(robot_name: str, coords=(0, 1), out: PoseSnapshot = None) -> PoseSnapshot:
+    """
+    Returns all requested frames in one timestamped PoseSnapshot.
+    coords: frames to read, e.g. (0, 1) for a consistent joint + Cartesian pair
+    out: snapshot to refill (must have the same coords); a new one is made if None
+    The DLL has no multi-frame entry point, so frames are still read one
+    foreign call each, but back-to-back into a single preallocated buffer.
+    """
+    if out is None:
+        out = PoseSnapshot(coords)
+    elif out.coords != tuple(coords):
+        raise ValueError("out.coords does not match coords")
+    return get_handle(robot_name).read_snapshot(out)
 
+# -------------------------
+# robot_movej
+# -------------------------
 def robot_movej(pos: list, vel: int, coord: int, acc: int, dec: int, robot_name: str) -> int:
     """
     Move robot to target position
@@ -75,10 +467,7 @@ def robot_movej(pos: list, vel: int, coord: int, acc: int, dec: int, robot_name:
     vel, acc, dec: motion parameters
     coord: 0 = joint, 1 = Cartesian
     """
-    if len(pos) != 7:
-        raise ValueError("pos must be a list of 7 floats")
-    arr = (ctypes.c_double * 7)(*pos)
-    return nrc_lib.robot_movej(arr, vel, coord, acc, dec, robot_name.encode("utf-8"))
+    return get_handle(robot_name).movej(pos, vel, coord, acc, dec)
 
 # -------------------------
 # Move single joint relative
@@ -100,16 +489,12 @@ def move_joint_relative(joint_index: int, delta: float, vel: int, acc: int, dec:
 
     # 3. Send full array back to DLL
     status = robot_movej(pos, vel, coord=0, acc=acc, dec=dec, robot_name=robot_name)
-    if status != 0:
-        raise Exception(f"robot_movej failed with code {status}")
+    raise_for_status("robot_movej", status)
     return status
 
 # -------------------------
 # robot_movel
 # -------------------------
-nrc_lib.robot_movel.argtypes = [ctypes.POINTER(ctypes.c_double), ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_char_p]
-nrc_lib.robot_movel.restype = ctypes.c_int
-
 def robot_movel(pos: list, vel: int, coord: int, acc: int, dec: int, robot_name: str) -> int:
     """
     Move robot linearly to a target position.
@@ -117,11 +502,7 @@ def robot_movel(pos: list, vel: int, coord: int, acc: int, dec: int, robot_name:
     vel, acc, dec: motion parameters
     coord: 0=joint, 1=Cartesian
     """
-    if len(pos) != 7:
-        raise ValueError("pos must be a list of 7 floats")
-    arr = (ctypes.c_double * 7)(*pos)
-    return nrc_lib.robot_movel(arr, vel, coord, acc, dec, robot_name.encode("utf-8"))
-
+    return get_handle(robot_name).movel(pos, vel, coord, acc, dec)
 
 # -------------------------
 # Linear jog function
@@ -129,12 +510,12 @@ def robot_movel(pos: list, vel: int, coord: int, acc: int, dec: int, robot_name:
 def linear_jog(axis_index: int, delta: float, vel: int, acc: int, dec: int, robot_name: str):
     """
     Incrementally move the robot linearly along one Cartesian axis.
-    axis_index: 0=X, 1=Y, 2=Z
-    delta: amount to move (+/- in mm)
+    axis_index: 0=X, 1=Y, 2=Z, 3=Rx, 4=Ry, 5=Rz
+    delta: amount to move (+/- in mm, or degrees for Rx/Ry/Rz)
     vel, acc, dec: motion parameters
     """
-    if not (0 <= axis_index <= 2):
-        raise ValueError("Invalid axis index, must be 0=X,1=Y,2=Z")
+    if not (0 <= axis_index <= 5):
+        raise ValueError("Invalid axis index, must be 0=X,1=Y,2=Z,3=Rx,4=Ry,5=Rz")
 
     # 1. Get current position in Cartesian coordinates
     pos = get_current_position(robot_name, coord=1)  # coord=1 for Cartesian
@@ -144,34 +525,5 @@ def linear_jog(axis_index: int, delta: float, vel: int, acc: int, dec: int, robo
 
     # 3. Move linearly
     status = robot_movel(pos, vel=vel, coord=1, acc=acc, dec=dec, robot_name=robot_name)
-    if status != 0:
-        raise Exception(f"robot_movel failed with code {status}")
+    raise_for_status("robot_movel", status)
     return status
-
-#-------------------------
-# clear_error
-#-------------------------
-# --- clear_error ---
-nrc_lib.clear_error.argtypes = [ctypes.c_char_p]
-nrc_lib.clear_error.restype = ctypes.c_int
-
-def clear_error(robot_name: str) -> int:
-    """
-    Clear any active robot errors.
-    Returns 0 on success, non-zero error code on failure.
-    """
-    return nrc_lib.clear_error(robot_name.encode("utf-8"))
-
-
-# -------------------------
-# get_robot_running_state
-# -------------------------
-nrc_lib.get_robot_running_state.argtypes = [ctypes.c_char_p]
-nrc_lib.get_robot_running_state.restype = ctypes.c_int
-
-def get_robot_running_state(robot_name: str) -> int:
-    """
-    Get the running state of the robot.
-    Returns an integer status code.
-    """
-    return nrc_lib.get_robot_running_state(robot_name.encode("utf-8"))
\ No newline at end of file
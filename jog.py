@@ -0,0 +1,290 @@
+import threading
+import time
+
+import functions  # Ctypes functions
+import metrics
+
+# -------------------------
+# Continuous jog controller
+# -------------------------
+class JogController(threading.Thread):
+    """
+    Press-and-hold jogging for one robot with robot_start_jogging /
+    robot_stop_jogging. The holder must call keepalive() at least every
+    timeout seconds while the jog button is down (a GUI timer checking
+    isDown() does this); if that stops because the release event was lost
+    or the GUI froze, the watchdog thread stops the jog on its own.
+    timeout: seconds without keepalive before the watchdog stops the jog
+    max_duration: hard limit on one continuous jog (seconds)
+    on_watchdog(axis): called from the watchdog thread after it stopped a jog
+    """
+
+    def __init__(self, robot_name: str, timeout: float = 0.3, max_duration: float = 30.0,
+                 on_watchdog=None):
+        super().__init__(name=f"jog-watchdog-{robot_name}", daemon=True)
+        self.robot_name = robot_name
+        self.timeout = timeout
+        self.max_duration = max_duration
+        self.on_watchdog = on_watchdog
+        self.axis = None          # 1-based axis being jogged, None when idle
+        self.coord = None         # coordinate system last selected for jogging
+        self.speed = None         # speed override last sent for jogging
+        self.jogs = 0
+        self.watchdog_stops = 0
+        self.last_error = None
+        self._jog_started = 0.0
+        self._deadline = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = False
+
+    @property
+    def jogging(self) -> bool:
+        return self.axis is not None
+
+    def start_jog(self, axis: int, direction: int, coord: int, speed: int) -> int:
+        """
+        Start jogging axis (1..6) in coord (0 = joint, 1 = Cartesian) at
+        speed %, stopping any other jog first. Returns the DLL status.
+        """
+        with self._lock:
+            if self.axis is not None:
+                self._stop_locked()
+            if coord != self.coord:
+                status = functions.set_current_coord(coord, self.robot_name)
+                if status != 0:
+                    return status
+                self.coord = coord
+            if speed != self.speed:
+                status = functions.set_speed(speed, self.robot_name)
+                if status != 0:
+                    return status
+                self.speed = speed
+            status = functions.robot_start_jogging(axis, direction > 0, self.robot_name)
+            if status == 0:
+                self.axis = axis
+                self.jogs += 1
+                metrics.JOGS.inc(self.robot_name, "continuous")
+                self._jog_started = time.perf_counter()
+                self._deadline = self._jog_started + self.timeout
+                self._wake.set()
+            return status
+
+    def keepalive(self):
+        """Extend the current jog by another timeout."""
+        if self.axis is not None:
+            self._deadline = time.perf_counter() + self.timeout
+
+    def stop_jog(self) -> int:
+        """Stop the current jog, if any. Returns the DLL status (0 if idle)."""
+        with self._lock:
+            return self._stop_locked()
+
+    def cancel(self):
+        """
+        Forget the current jog without taking the lock or calling the DLL.
+        Returns the axis that was jogging (or None); the caller must stop
+        it with robot_stop_jogging, e.g. on the e-stop thread.
+        """
+        axis, self.axis = self.axis, None
+        return axis
+
+    def _stop_locked(self) -> int:
+        axis, self.axis = self.axis, None
+        if axis is None:
+            return 0
+        return functions.robot_stop_jogging(axis, self.robot_name)
+
+    def close(self, timeout: float = 1.0):
+        self.stop_jog()
+        self._closing = True
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while not self._closing:
+            if self.axis is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            now = time.perf_counter()
+            expired = now >= self._deadline or now - self._jog_started >= self.max_duration
+            if not expired:
+                time.sleep(min(self.timeout / 4, self._deadline - now))
+                continue
+            with self._lock:
+                # re-check under the lock: the jog may have been released or renewed
+                now = time.perf_counter()
+                axis = self.axis
+                if axis is None or (now < self._deadline and now - self._jog_started < self.max_duration):
+                    continue
+                try:
+                    self._stop_locked()
+                except Exception as e:
+                    self.last_error = e
+                self.watchdog_stops += 1
+                metrics.JOG_WATCHDOG_STOPS.inc(self.robot_name)
+            if self.on_watchdog:
+                self.on_watchdog(axis)
+
+# -------------------------
+# Step jogger (fixed step per click)
+# -------------------------
+class StepJogger:
+    """
+    Relative jogs that track the commanded target instead of reading the
+    controller before every move. Each click adds its delta to the last
+    target (so repeated clicks accumulate even while the arm is still
+    moving) and sends a single move. The starting pose comes from the
+    telemetry cache only: jog() never calls the DLL and refuses the step
+    if there is no fresh sample. Clicks that arrive while a move is
+    being sent are coalesced: only the newest target is sent next. The
+    target is trusted for as long as the move runs, i.e. until a
+    running-state read issued after the move was sent reports the
+    controller idle; after that it is reused only if the arm settled on
+    it (a move cut short starts from the actual pose).
+    latest: callable returning the newest telemetry sample
+            (seq, stamp, joints, cart) or None
+    running: callable returning the newest running state as
+             (state, perf_counter() of the read) or None
+    submit: callable running a function on the robot's I/O worker
+            (None = send on the calling thread)
+    can_move: callable returning False while no move may be sent (e.g.
+              the e-stop is engaged); checked on every click and again
+              right before each send
+    on_error(exception): called from the sending thread if a move fails
+    settle_tol: once idle, the target is reused only if the arm rests
+                within this distance of it (degrees or mm)
+    max_sample_age: telemetry samples older than this are not used (seconds)
+    """
+
+    def __init__(self, robot_name: str, latest=None, running=None, submit=None, can_move=None,
+                 on_error=None, settle_tol: float = 0.05, max_sample_age: float = 0.1):
+        self.robot_name = robot_name
+        self.latest = latest
+        self.running = running
+        self.submit = submit
+        self.can_move = can_move
+        self.on_error = on_error
+        self.settle_tol = settle_tol
+        self.max_sample_age = max_sample_age
+        self.target = None       # last target (7 floats) in self.coord
+        self.coord = None
+        self.requests = 0        # jog clicks
+        self.sends = 0           # moves sent to the DLL
+        self.refused = 0         # clicks refused (no fresh sample, moves not allowed)
+        self._params = (30, 30, 30)
+        self._sent_at = 0.0
+        self._generation = 0     # bumped by invalidate(); a target from an older one is stale
+        self._target_generation = 0
+        self._busy = False
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """
+        Forget the tracked target, e.g. after anything else moved the arm.
+        Lock-free, so the e-stop thread never waits on a click or a send.
+        """
+        self._generation += 1
+
+    def _allowed(self) -> bool:
+        return self.can_move is None or self.can_move()
+
+    def _pose(self, coord: int):
+        """Newest telemetry pose in coord, or None if there is no fresh sample."""
+        sample = self.latest() if self.latest is not None else None
+        if sample is None or time.time() - sample[1] > self.max_sample_age:
+            return None
+        return list(sample[2] if coord == 0 else sample[3])
+
+    def _moving(self) -> bool:
+        """True while the last move has not been seen finished by the controller."""
+        state = self.running() if self.running is not None else None
+        if state is None or state[1] < self._sent_at:
+            return True  # no read since the move was sent yet
+        return state[0] != 0
+
+    def _base(self, coord: int):
+        """Pose the next step starts from: the tracked target if still valid."""
+        pose = self._pose(coord)
+        if pose is None:
+            raise RuntimeError(f"{self.robot_name}: no recent telemetry sample, step jog refused")
+        if (self.target is None or self.coord != coord
+                or self._target_generation != self._generation):
+            return pose
+        if self._busy or self._moving():
+            return self.target
+        if max(abs(pose[i] - self.target[i]) for i in range(6)) <= self.settle_tol:
+            return self.target
+        return pose
+
+    def jog(self, coord: int, axis_index: int, delta: float, vel: int, acc: int, dec: int):
+        """
+        Step one axis by delta: coord 0 = joint (movej), 1 = Cartesian (movel).
+        Returns the new target (7 floats).
+        """
+        if not (0 <= axis_index <= 5):
+            raise ValueError("Invalid axis index")
+        if not self._allowed():
+            self.refused += 1
+            raise RuntimeError(f"{self.robot_name}: motion not allowed (emergency stop engaged)")
+        with self._lock:  # held for bookkeeping only, never across a DLL call
+            generation = self._generation
+            try:
+                base = self._base(coord)
+            except RuntimeError:
+                self.refused += 1
+                raise
+            target = list(base)
+            target[axis_index] += delta
+            self.target, self.coord = target, coord
+            self._target_generation = generation
+            self._params = (vel, acc, dec)
+            self.requests += 1
+            metrics.JOGS.inc(self.robot_name, "step")
+            if self._busy:
+                self._pending = True  # the running sender picks up the new target
+                return target
+            self._busy = True
+        if self.submit is not None:
+            self.submit(self._send_loop)
+        else:
+            self._send_loop()
+        return target
+
+    def _send_loop(self):
+        while True:
+            with self._lock:
+                self._pending = False
+                if (self.target is None or self._target_generation != self._generation
+                        or not self._allowed()):
+                    self._busy = False
+                    return
+                target, coord = list(self.target), self.coord
+                vel, acc, dec = self._params
+            try:
+                if coord == 0:
+                    status = functions.robot_movej(target, vel, coord=0, acc=acc, dec=dec,
+                                                   robot_name=self.robot_name)
+                else:
+                    status = functions.robot_movel(target, vel, coord=coord, acc=acc, dec=dec,
+                                                   robot_name=self.robot_name)
+                functions.raise_for_status("robot_movej" if coord == 0 else "robot_movel", status)
+            except Exception as e:
+                with self._lock:
+                    self.target = None
+                    self._busy = False
+                if self.on_error:
+                    self.on_error(e)
+                return
+            if not self._allowed():
+                # e-stop pressed while the move went out: make sure it does not run
+                functions.job_stop(self.robot_name)
+            with self._lock:
+                self.sends += 1
+                self._sent_at = time.perf_counter()
+                if not self._pending:
+                    self._busy = False
+                    return
@@ -0,0 +1,230 @@
+import numpy as np
+
+# -------------------------
+# Arm geometry
+# -------------------------
+# Standard DH table (lengths in mm, angles in degrees), one row per joint.
+# These are placeholder values for a generic 6-DOF cobot of this size class;
+# replace them with the calibrated table of the actual arm.
+DEFAULT_DH = {
+    "a":      [0.0, -425.0, -392.0, 0.0, 0.0, 0.0],
+    "alpha":  [90.0, 0.0, 0.0, 90.0, -90.0, 0.0],
+    "d":      [162.5, 0.0, 0.0, 133.3, 99.7, 99.6],
+    "offset": [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+}
+
+# Joint limits in degrees (J1..J6)
+DEFAULT_LIMITS = {
+    "lower": [-360.0, -360.0, -180.0, -360.0, -360.0, -360.0],
+    "upper": [360.0, 360.0, 180.0, 360.0, 360.0, 360.0],
+}
+
+# -------------------------
+# Rotation helpers (vectorised)
+# -------------------------
+def rpy_to_matrix(rpy):
+    """
+    (N, 3) roll/pitch/yaw in radians (fixed X, then Y, then Z axes,
+    i.e. R = Rz @ Ry @ Rx) -> (N, 3, 3) rotation matrices.
+    """
+    rpy = np.atleast_2d(rpy)
+    cr, sr = np.cos(rpy[:, 0]), np.sin(rpy[:, 0])
+    cp, sp = np.cos(rpy[:, 1]), np.sin(rpy[:, 1])
+    cy, sy = np.cos(rpy[:, 2]), np.sin(rpy[:, 2])
+    R = np.empty((len(rpy), 3, 3))
+    R[:, 0, 0] = cy * cp
+    R[:, 0, 1] = cy * sp * sr - sy * cr
+    R[:, 0, 2] = cy * sp * cr + sy * sr
+    R[:, 1, 0] = sy * cp
+    R[:, 1, 1] = sy * sp * sr + cy * cr
+    R[:, 1, 2] = sy * sp * cr - cy * sr
+    R[:, 2, 0] = -sp
+    R[:, 2, 1] = cp * sr
+    R[:, 2, 2] = cp * cr
+    return R
+
+def matrix_to_rpy(R):
+    """(N, 3, 3) rotation matrices -> (N, 3) roll/pitch/yaw in radians."""
+    R = np.asarray(R)
+    if R.ndim == 2:
+        R = R[None]
+    pitch = np.arctan2(-R[:, 2, 0], np.hypot(R[:, 0, 0], R[:, 1, 0]))
+    roll = np.arctan2(R[:, 2, 1], R[:, 2, 2])
+    yaw = np.arctan2(R[:, 1, 0], R[:, 0, 0])
+    return np.stack((roll, pitch, yaw), axis=1)
+
+# -------------------------
+# Arm model
+# -------------------------
+class ArmModel:
+    """
+    Forward/inverse kinematics for a 6-joint serial arm from a standard DH
+    table. Joint values are in degrees and positions in mm, like the
+    controller; Cartesian poses are [X, Y, Z, Rx, Ry, Rz] with RPY angles
+    in degrees. Every method works on batches: pass (N, 6) joints (extra
+    columns such as the 7th axis are ignored) or a single (6,) vector.
+    """
+
+    def __init__(self, a=None, alpha=None, d=None, offset=None, lower=None, upper=None,
+                 tool=None):
+        self.a = np.asarray(a if a is not None else DEFAULT_DH["a"], dtype=np.float64)
+        self.alpha = np.radians(alpha if alpha is not None else DEFAULT_DH["alpha"])
+        self.d = np.asarray(d if d is not None else DEFAULT_DH["d"], dtype=np.float64)
+        self.offset = np.radians(offset if offset is not None else DEFAULT_DH["offset"])
+        self.lower = np.asarray(lower if lower is not None else DEFAULT_LIMITS["lower"], dtype=np.float64)
+        self.upper = np.asarray(upper if upper is not None else DEFAULT_LIMITS["upper"], dtype=np.float64)
+        # Flange -> TCP transform (4x4), identity if no tool
+        self.tool = np.eye(4) if tool is None else np.asarray(tool, dtype=np.float64)
+        if not (len(self.a) == len(self.alpha) == len(self.d) == len(self.offset) == 6):
+            raise ValueError("DH table must have 6 rows")
+        self._ca, self._sa = np.cos(self.alpha), np.sin(self.alpha)
+        # reach used for workspace checks: sum of link lengths
+        self.reach = float(np.sum(np.abs(self.a)) + np.sum(np.abs(self.d[1:])))
+
+    @staticmethod
+    def _joints(joints):
+        q = np.asarray(joints, dtype=np.float64)
+        single = q.ndim == 1
+        q = np.atleast_2d(q)[:, :6]
+        return q, single
+
+    def _chain(self, joints, store: bool):
+        """
+        Walk the DH chain for (N, 6) joints. Frame axes x, y, z and origin p
+        are kept as (3, N) arrays and each DH step is applied column-wise,
+        which is far faster than stacked 4x4 matmuls for large N.
+        Returns (N, 7, 4, 4) frames if store, else the flange (x, y, z, p).
+        """
+        q, _ = self._joints(joints)
+        theta = (np.radians(q) + self.offset).T
+        ct, st = np.cos(theta), np.sin(theta)
+        n = len(q)
+        x = np.zeros((3, n)); x[0] = 1.0
+        y = np.zeros((3, n)); y[1] = 1.0
+        z = np.zeros((3, n)); z[2] = 1.0
+        p = np.zeros((3, n))
+        if store:
+            T = np.zeros((n, 7, 4, 4))
+            T[:, :, 3, 3] = 1.0
+            T[:, 0, :3, :3] = np.eye(3)
+        for i in range(6):
+            ca, sa = self._ca[i], self._sa[i]
+            c, s = ct[i], st[i]
+            xn = c * x + s * y
+            yn = c * y - s * x
+            x, y, z, p = (xn,
+                          ca * yn + sa * z,
+                          ca * z - sa * yn,
+                          p + self.a[i] * xn + self.d[i] * z)
+            if store:
+                T[:, i + 1, :3, 0] = x.T
+                T[:, i + 1, :3, 1] = y.T
+                T[:, i + 1, :3, 2] = z.T
+                T[:, i + 1, :3, 3] = p.T
+        return T if store else (x, y, z, p)
+
+    def frames(self, joints):
+        """
+        (N, 6) joints in degrees -> (N, 7, 4, 4) base-to-frame transforms
+        (index 0 = base, 6 = flange; tool not applied).
+        """
+        return self._chain(joints, store=True)
+
+    def fk_position(self, joints):
+        """Joints (degrees) -> (N, 3) TCP positions in mm, without building matrices."""
+        x, y, z, p = self._chain(joints, store=False)
+        t = self.tool[:3, 3]
+        return (p + x * t[0] + y * t[1] + z * t[2]).T
+
+    def fk(self, joints):
+        """Joints (degrees) -> (N, 4, 4) TCP transforms (or (4, 4) for one)."""
+        _, single = self._joints(joints)
+        T = self.frames(joints)[:, 6] @ self.tool
+        return T[0] if single else T
+
+    def fk_pose(self, joints):
+        """Joints (degrees) -> (N, 6) poses [X, Y, Z, Rx, Ry, Rz] (or (6,))."""
+        _, single = self._joints(joints)
+        T = np.atleast_3d(self.fk(joints)).reshape(-1, 4, 4)
+        pose = np.concatenate((T[:, :3, 3], np.degrees(matrix_to_rpy(T[:, :3, :3]))), axis=1)
+        return pose[0] if single else pose
+
+    def jacobian(self, joints):
+        """
+        (N, 6) joints -> (N, 6, 6) geometric Jacobians of the TCP
+        (rows: vx, vy, vz in mm/rad, wx, wy, wz), columns per joint radian.
+        """
+        T = self.frames(joints)
+        tcp = (T[:, 6] @ self.tool)[:, :3, 3]
+        z = T[:, :6, :3, 2]        # joint axes
+        p = T[:, :6, :3, 3]        # joint origins
+        J = np.empty((len(T), 6, 6))
+        J[:, :3, :] = np.cross(z, tcp[:, None, :] - p).transpose(0, 2, 1)
+        J[:, 3:, :] = z.transpose(0, 2, 1)
+        return J
+
+    def within_limits(self, joints):
+        """(N, 6) joints -> (N, 6) bool mask of joints inside their limits."""
+        q, _ = self._joints(joints)
+        return (q >= self.lower) & (q <= self.upper)
+
+    def ik(self, poses, seed, tol_mm: float = 0.01, tol_deg: float = 0.01,
+           max_iter: int = 100, damping: float = 1.0):
+        """
+        Damped least-squares inverse kinematics, solved for all targets at once.
+        poses: (N, 6) [X, Y, Z, Rx, Ry, Rz] targets (or (6,))
+        seed: (N, 6) or (6,) starting joints in degrees, e.g. the previous
+              waypoint, so the solution stays on the same arm configuration
+        Returns (joints (N, 6) degrees, converged (N,) bool);
+        a single pose returns ((6,), bool).
+        """
+        poses = np.asarray(poses, dtype=np.float64)
+        single = poses.ndim == 1
+        poses = np.atleast_2d(poses)[:, :6]
+        n = len(poses)
+        seed = np.broadcast_to(np.atleast_2d(np.asarray(seed, dtype=np.float64))[:, :6], (n, 6))
+        q = np.radians(seed)
+
+        target_p = poses[:, :3]
+        target_R = rpy_to_matrix(np.radians(poses[:, 3:6]))
+        tol_rad = np.radians(tol_deg)
+        # Orientation error is scaled to mm so both halves weigh similarly
+        scale = max(self.reach, 1.0)
+        lam2 = damping * damping
+        eye = np.eye(6)
+        done = np.zeros(n, dtype=bool)
+
+        for _ in range(max_iter):
+            active = ~done
+            if not active.any():
+                break
+            qa = np.degrees(q[active])
+            T = self.fk(qa).reshape(-1, 4, 4)
+            err_p = target_p[active] - T[:, :3, 3]
+            R = T[:, :3, :3]
+            tR = target_R[active]
+            err_w = 0.5 * (np.cross(R[:, :, 0], tR[:, :, 0])
+                           + np.cross(R[:, :, 1], tR[:, :, 1])
+                           + np.cross(R[:, :, 2], tR[:, :, 2]))
+
+            ok = (np.linalg.norm(err_p, axis=1) <= tol_mm) & (np.linalg.norm(err_w, axis=1) <= tol_rad)
+            idx = np.flatnonzero(active)
+            done[idx[ok]] = True
+            if ok.all():
+                break
+
+            keep = ~ok
+            J = self.jacobian(qa[keep])
+            J[:, 3:, :] *= scale
+            e = np.concatenate((err_p[keep], err_w[keep] * scale), axis=1)
+            # dq = J^T (J J^T + lambda^2 I)^-1 e
+            JJt = J @ J.transpose(0, 2, 1) + lam2 * eye
+            dq = (J.transpose(0, 2, 1) @ np.linalg.solve(JJt, e[:, :, None]))[:, :, 0]
+            q[idx[keep]] += dq
+
+        joints = np.degrees(q)
+        # wrap back into (-180, 180] around the seed to avoid 360 deg jumps
+        joints = seed + (joints - seed + 180.0) % 360.0 - 180.0
+        if single:
+            return joints[0], bool(done[0])
+        return joints, done
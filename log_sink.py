@@ -0,0 +1,153 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from collections import deque
+
+LOGGER_NAME = "cobot"
+TERMINAL_FORMAT = "%(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s"
+
+# -------------------------
+# Ring-buffered handler
+# -------------------------
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the last capacity formatted lines in memory for a consumer that
+    drains them in batches (the GUI terminal, once per frame). emit() only
+    formats and appends under a lock, so it is cheap and safe from any
+    thread; when lines arrive faster than they are drained the oldest are
+    dropped and counted instead of piling up.
+    """
+
+    def __init__(self, capacity: int = 2000, level=logging.NOTSET):
+        super().__init__(level)
+        self.lines = deque(maxlen=capacity)
+        self.dropped = 0
+        self.setFormatter(logging.Formatter(TERMINAL_FORMAT))
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lock:
+            if len(self.lines) == self.lines.maxlen:
+                self.dropped += 1
+            self.lines.append(line)
+
+    def drain(self):
+        """Returns (lines, dropped) collected since the last drain and clears them."""
+        with self.lock:
+            if not self.lines and not self.dropped:
+                return [], 0
+            lines = list(self.lines)
+            dropped = self.dropped
+            self.lines.clear()
+            self.dropped = 0
+        return lines, dropped
+
+# -------------------------
+# Async file sink
+# -------------------------
+class AsyncFileSink:
+    """
+    Writes log records to a rotating file on a background thread: the
+    logging call only puts the record on a queue.
+    path: log file; max_bytes/backups: rotation (max_bytes=0 = never rotate)
+    """
+
+    def __init__(self, path: str, max_bytes: int = 5_000_000, backups: int = 3,
+                 level=logging.DEBUG):
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        self.queue = queue.SimpleQueue()
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.handler.setLevel(level)
+        self.listener = logging.handlers.QueueListener(self.queue, file_handler)
+        self._file_handler = file_handler
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        """Write out what is still queued and close the file."""
+        self.listener.stop()
+        self._file_handler.close()
+
+# -------------------------
+# print() redirect
+# -------------------------
+class LogStream:
+    """
+    File-like object for sys.stdout / sys.stderr that turns every complete
+    line written into a log record, so existing print() calls go through
+    the logging pipeline. Partial lines are buffered per thread, so
+    prints from different threads never interleave inside a line.
+    """
+
+    def __init__(self, logger: logging.Logger, level: int = logging.INFO):
+        self.logger = logger
+        self.level = level
+        self._partial = threading.local()
+
+    def write(self, text):
+        pending = getattr(self._partial, "text", "") + text
+        *lines, rest = pending.split("\n")
+        self._partial.text = rest
+        for line in lines:
+            if line.strip():
+                self.logger.log(self.level, line.rstrip())
+        return len(text)
+
+    def flush(self):
+        rest = getattr(self._partial, "text", "")
+        if rest.strip():
+            self._partial.text = ""
+            self.logger.log(self.level, rest.rstrip())
+
+    def isatty(self):
+        return False
+
+class LogPipeline:
+    """
+    Sets up the "cobot" logger with a RingBufferHandler and, optionally,
+    an AsyncFileSink, and redirects print() output into it.
+    capacity: lines kept between two drains
+    log_file: path of the async file sink, or None for no file
+    """
+
+    def __init__(self, capacity: int = 2000, log_file: str = None):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.ring = RingBufferHandler(capacity, level=logging.INFO)
+        self.logger.addHandler(self.ring)
+        self.file_sink = None
+        if log_file:
+            self.file_sink = AsyncFileSink(log_file)
+            self.logger.addHandler(self.file_sink.handler)
+            self.file_sink.start()
+        self._saved_streams = None
+
+    def redirect_std_streams(self):
+        """Send print() (stdout, INFO) and stderr (ERROR) into the logger."""
+        self._saved_streams = (sys.stdout, sys.stderr)
+        sys.stdout = LogStream(self.logger.getChild("stdout"), logging.INFO)
+        sys.stderr = LogStream(self.logger.getChild("stderr"), logging.ERROR)
+
+    def close(self):
+        """Restore sys.stdout / sys.stderr and flush the file sink."""
+        if self._saved_streams is not None:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.stdout, sys.stderr = self._saved_streams
+            self._saved_streams = None
+        self.logger.removeHandler(self.ring)
+        if self.file_sink is not None:
+            self.logger.removeHandler(self.file_sink.handler)
+            self.file_sink.stop()
+            self.file_sink = None
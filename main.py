@@ -1,41 +1,109 @@
+import os
 import sys
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QTimer
+import time
+from PyQt5.QtGui import QIcon, QKeySequence
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QApplication, QMainWindow
 from PyQt5 import QtWidgets
 from ui_main import Ui_MainWindow
 import functions #Ctypes functions
-
-# Global variables
-ROBOT_NAME = "MyRobot"
-ROBOT_IP = "192.168.3.15"
-ROBOT_PORT = "6001"
-wspeed = 30  # default speed
+from program_model import ProgramTableModel
+import program as program_io
+from recording import samples_to_program
+from preflight import check_program
+from session import SessionManager
+from supervisor import LINK_LOST, LINK_RECONNECTING, LINK_RESTORED
+from log_sink import LogPipeline
+import metrics
+import profiling
+
+# Defaults for the first robot session (changed with Save Config)
+DEFAULT_ROBOT_NAME = "MyRobot"
+DEFAULT_ROBOT_IP = "192.168.3.15"
+DEFAULT_ROBOT_PORT = "6001"
+DEFAULT_SPEED = 30
+
+# Telemetry
+TELEMETRY_RATE_HZ = 100  # background pose polling rate (50-250 Hz)
+DISPLAY_RATE_HZ = 30     # label refresh rate
+TELEMETRY_LOG_DIR = os.environ.get("COBOT_TELEMETRY_DIR", "telemetry_logs")  # "" = don't record to disk
+TEACH_SAMPLE_AGE = 0.2   # older samples are not taught; the position is read on the session thread
 
 # For Action Tab
-current_step_index = 0
-program_running = False
+PROGRAM_LOOKAHEAD = 3  # steps prepared ahead of the one being executed
+PROGRAM_FILE_FILTER = "Cobot program (*.cprg);;JSON (*.json);;CSV (*.csv)"
+JOG_KEEPALIVE_MS = 100   # continuous jog: button checked this often (watchdog 300 ms)
+RECORD_RATE_HZ = 250     # hand-guided path sample rate
+RECORD_TOLERANCE = 0.5   # RDP tolerance in joint space (degrees)
+PREFLIGHT_WORKSPACE = None  # TCP box {"min": [x,y,z], "max": [x,y,z]} in mm; None = skip
+
+# Terminal log
+LOG_FLUSH_HZ = 30        # terminal refresh rate (lines are appended in one batch per frame)
+LOG_MAX_LINES = 2000     # lines kept in the terminal (and buffered between frames)
+LOG_FILE = os.environ.get("COBOT_LOG_FILE")  # optional log file, written off the GUI thread
+
+# Profiling: Ctrl+Shift+P starts/stops span tracing of slots and DLL calls (COBOT_TRACE=1 = on at start)
+TRACE_SHORTCUT = "Ctrl+Shift+P"
+TRACE_DIR = os.environ.get("COBOT_TRACE_DIR", ".")  # where traces are saved when tracing stops
 
 #ICONS
 on_path = "E:/Ajaxx/Projects/cobot/Icons/on.svg"
 off_path = "E:/Ajaxx/Projects/cobot/Icons/off.svg"
 lock_path = "E:/Ajaxx/Projects/cobot/Icons/Lock.svg"
 unlock_path = "E:/Ajaxx/Projects/cobot/Icons/unlock.svg"
-# Class to redirect print statements to QPlainTextEdit
-class EmittingStream:
-    def __init__(self, text_edit):
+# Shows the log pipeline in the terminal QPlainTextEdit: print() from any
+# thread only appends to a ring buffer, and a GUI timer appends everything
+# buffered in one batch per frame
+class TerminalLog(QObject):
+    def __init__(self, text_edit, pipeline, rate_hz=LOG_FLUSH_HZ, max_lines=LOG_MAX_LINES):
+        super().__init__(text_edit)
         self.text_edit = text_edit  # QPlainTextEdit object
+        self.pipeline = pipeline
+        self.text_edit.setMaximumBlockCount(max_lines)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(int(1000 / rate_hz))
 
-    def write(self, text):
-        if text.strip() != "":
-            self.text_edit.appendPlainText(text.strip())
-            # Scroll to the bottom automatically
-            self.text_edit.verticalScrollBar().setValue(
-                self.text_edit.verticalScrollBar().maximum()
-            )
-
+    @profiling.slot
     def flush(self):
-        pass  # Needed for compatibility with sys.stdout
+        lines, dropped = self.pipeline.ring.drain()
+        if not lines:
+            return
+        if dropped:
+            lines.insert(0, f"⚠️ {dropped} log lines dropped")
+        scrollbar = self.text_edit.verticalScrollBar()
+        self.text_edit.appendPlainText("\n".join(lines))
+        # Scroll to the bottom automatically
+        scrollbar.setValue(scrollbar.maximum())
+
+    def stop(self):
+        self.timer.stop()
+        self.flush()
+
+# Signals to hand executor callbacks (worker thread) over to the GUI thread
+class ExecutorSignals(QObject):
+    step_started = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    paused = pyqtSignal(int)
+
+# Signal to hand e-stop results (e-stop thread) over to the GUI thread
+class EStopSignals(QObject):
+    done = pyqtSignal(object)
+
+# Signal for jogs stopped by the jog watchdog thread
+class JogSignals(QObject):
+    watchdog = pyqtSignal(int)
+    failed = pyqtSignal(object)
+
+# Signal for link state changes reported by the connection supervisor thread
+class LinkSignals(QObject):
+    changed = pyqtSignal(str, object)
+
+# Signal bringing the result of a call run on the session's I/O worker
+# back to the GUI thread: done(callback, future) runs callback(future) there
+class CallSignals(QObject):
+    done = pyqtSignal(object, object)
 
 class MainApp(QMainWindow):
     def __init__(self):
@@ -44,31 +112,54 @@ class MainApp(QMainWindow):
         self.ui.setupUi(self)
 
         
-        # Redirect stdout to the terminal QPlainTextEdit
-        sys.stdout = EmittingStream(self.ui.terminal)
-        sys.stderr = EmittingStream(self.ui.terminal)  # optional: capture errors too
+        # Redirect stdout/stderr into the log pipeline shown in the terminal
+        self.log = LogPipeline(capacity=LOG_MAX_LINES, log_file=LOG_FILE)
+        self.log.redirect_std_streams()
+        self.terminal_log = TerminalLog(self.ui.terminal, self.log)
+
+        # Optional Prometheus metrics endpoint (COBOT_METRICS_PORT), served off the GUI thread
+        self.metrics_server = None
+        if metrics.ENABLED:
+            try:
+                self.metrics_server = metrics.MetricsServer().start()
+                print(f"✅ Metrics on http://{metrics.METRICS_HOST}:{self.metrics_server.port}/metrics")
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint not started: {e}")
+
+        # Robot sessions: one per robot name, the GUI drives the active one.
+        # Blocking DLL calls run on the session's I/O worker (run_in_session),
+        # so the GUI thread stays free to take an Emergency Stop press.
+        self.sessions = SessionManager()
+        self.session = self.sessions.add(DEFAULT_ROBOT_NAME, DEFAULT_ROBOT_IP,
+                                         DEFAULT_ROBOT_PORT, DEFAULT_SPEED)
+        self.call_signals = CallSignals()
+        self.call_signals.done.connect(self.on_call_done)
+        self.connect_pending = False
 
         #============/Button Mappings\============#
         # Save config button
         self.ui.config_btn.clicked.connect(self.save_config) 
 
         #Connect/Disconnect button
-        self.connected = False  # Connection state
         self.ui.on_off.setIcon(QIcon("E:/Ajaxx/Projects/cobot/Icons/onOff.svg"))  # initial blue
         self.ui.on_off.clicked.connect(self.toggle_connection) # Connect/Disconnect button
 
         #Lock/Unlock button
         self.ui.lock.setIcon(QIcon(lock_path))  # initial red
-        self.servo_locked = True # Lock state
         self.ui.lock.setEnabled(False)  # no lock control until connected
         self.ui.lock.clicked.connect(self.toggle_servo_lock) # Connect/Disconnect button
 
-        # Emergency Stop button
+        # Emergency Stop button: engages on press (not on release) and the
+        # stop itself runs on the session's e-stop thread
+        self.estop_pressed = False
+        self.estop_signals = EStopSignals()
+        self.estop_signals.done.connect(self.on_estop_done)
+        self.ui.stop.pressed.connect(self.on_estop_pressed)
         self.ui.stop.clicked.connect(self.on_estop_click)
 
         # Speed Control
-        self.ui.current_speed.setText(str(wspeed))
-        self.ui.speed_slider.setValue(wspeed)
+        self.ui.current_speed.setText(str(self.session.speed))
+        self.ui.speed_slider.setValue(self.session.speed)
         self.ui.speed_slider.setMinimum(0)
         self.ui.speed_slider.setMaximum(100)
 
@@ -87,6 +178,19 @@ class MainApp(QMainWindow):
         self.ui.s_p25.clicked.connect(lambda: self.change_speed(25))
 
         # Control Buttons
+        self.add_jog_buttons()
+
+            # Continuous jog: buttons jog while held instead of stepping per click
+        self.ui.continuous_jog = QtWidgets.QCheckBox("Continuous jog", self.ui.Control_box)
+        self.ui.continuous_jog.setObjectName("continuous_jog")
+        self.ui.gridLayout_5.addWidget(self.ui.continuous_jog, 0, 1, 1, 1)
+        self.jog_button = None
+        self.jog_signals = JogSignals()
+        self.jog_signals.watchdog.connect(self.on_jog_watchdog)
+        self.jog_signals.failed.connect(self.on_jog_failed)
+        self.jog_timer = QTimer()
+        self.jog_timer.timeout.connect(self.jog_keepalive)
+
             # --------------------
             # Joint Jog Buttons
             # --------------------
@@ -99,14 +203,14 @@ class MainApp(QMainWindow):
         self.ui.j3_p_btn.clicked.connect(lambda: self.jog_joint(2, +1))
         self.ui.j3_n_btn.clicked.connect(lambda: self.jog_joint(2, -1))
 
-        # self.ui.joint4_pos.clicked.connect(lambda: self.jog_joint(3, +1))
-        # self.ui.joint4_neg.clicked.connect(lambda: self.jog_joint(3, -1))
+        self.ui.joint4_pos.clicked.connect(lambda: self.jog_joint(3, +1))
+        self.ui.joint4_neg.clicked.connect(lambda: self.jog_joint(3, -1))
 
-        # self.ui.joint5_pos.clicked.connect(lambda: self.jog_joint(4, +1))
-        # self.ui.joint5_neg.clicked.connect(lambda: self.jog_joint(4, -1))
+        self.ui.joint5_pos.clicked.connect(lambda: self.jog_joint(4, +1))
+        self.ui.joint5_neg.clicked.connect(lambda: self.jog_joint(4, -1))
 
-        # self.ui.joint6_pos.clicked.connect(lambda: self.jog_joint(5, +1))
-        # self.ui.joint6_neg.clicked.connect(lambda: self.jog_joint(5, -1))
+        self.ui.joint6_pos.clicked.connect(lambda: self.jog_joint(5, +1))
+        self.ui.joint6_neg.clicked.connect(lambda: self.jog_joint(5, -1))
 
             # --------------------
             # Linear Jog Buttons
@@ -120,14 +224,34 @@ class MainApp(QMainWindow):
         self.ui.z_pos.clicked.connect(lambda: self.jog_linear(2, +1))
         self.ui.z_neg.clicked.connect(lambda: self.jog_linear(2, -1))
 
-        # self.ui.rx_pos.clicked.connect(lambda: self.jog_linear(3, +1))
-        # self.ui.rx_neg.clicked.connect(lambda: self.jog_linear(3, -1))
+        self.ui.rx_pos.clicked.connect(lambda: self.jog_linear(3, +1))
+        self.ui.rx_neg.clicked.connect(lambda: self.jog_linear(3, -1))
+
+        self.ui.ry_pos.clicked.connect(lambda: self.jog_linear(4, +1))
+        self.ui.ry_neg.clicked.connect(lambda: self.jog_linear(4, -1))
 
-        # self.ui.ry_pos.clicked.connect(lambda: self.jog_linear(4, +1))
-        # self.ui.ry_neg.clicked.connect(lambda: self.jog_linear(4, -1))
+        self.ui.rz_pos.clicked.connect(lambda: self.jog_linear(5, +1))
+        self.ui.rz_neg.clicked.connect(lambda: self.jog_linear(5, -1))
 
-        # self.ui.rz_pos.clicked.connect(lambda: self.jog_linear(5, +1))
-        # self.ui.rz_neg.clicked.connect(lambda: self.jog_linear(5, -1))
+            # --------------------
+            # Press-and-hold (continuous) jogging, same buttons
+            # --------------------
+        joint_buttons = [
+            (self.ui.j1_n_btn, self.ui.j1_p_btn), (self.ui.j2_n_btn, self.ui.j2_p_btn),
+            (self.ui.j3_n_btn, self.ui.j3_p_btn), (self.ui.joint4_neg, self.ui.joint4_pos),
+            (self.ui.joint5_neg, self.ui.joint5_pos), (self.ui.joint6_neg, self.ui.joint6_pos),
+        ]
+        linear_buttons = [
+            (self.ui.x_neg, self.ui.x_pos), (self.ui.y_neg, self.ui.y_pos),
+            (self.ui.z_neg, self.ui.z_pos), (self.ui.rx_neg, self.ui.rx_pos),
+            (self.ui.ry_neg, self.ui.ry_pos), (self.ui.rz_neg, self.ui.rz_pos),
+        ]
+        for coord, buttons in ((0, joint_buttons), (1, linear_buttons)):
+            for axis, (neg, pos) in enumerate(buttons):
+                for button, direction in ((neg, -1), (pos, +1)):
+                    button.pressed.connect(
+                        lambda b=button, c=coord, a=axis, d=direction: self.start_hold_jog(b, c, a, d))
+                    button.released.connect(self.stop_hold_jog)
 
 
         # Go Home button
@@ -138,18 +262,56 @@ class MainApp(QMainWindow):
         self.ui.clear_error_btn.clicked.connect(self.on_clear_error_click)
 
         #======|Actions Tab|======#
+            # Program table: the Program array is the source of truth,
+            # the generated QTableWidget is swapped for a view onto it
+        self.program_model = ProgramTableModel()
+        self.ui.programTable = self.replace_program_table(self.ui.programTable)
+        self.ui.programTable.setModel(self.program_model)
+
             # Button connections
         self.ui.save_btn.clicked.connect(self.save_step)
         self.ui.edit_btn.clicked.connect(self.edit_step)
         self.ui.insert_btn.clicked.connect(self.insert_step)
         self.ui.delete_btn.clicked.connect(self.delete_step)
         self.ui.run_btn.clicked.connect(self.run_program)
+        self.ui.load_btn.clicked.connect(self.load_program)
+        self.ui.saveL_btn.clicked.connect(self.save_program)
+
+            # Record button (not in the generated UI)
+        self.ui.record_btn = QtWidgets.QPushButton("Record Path", self.ui.action_btns_box)
+        self.ui.record_btn.setObjectName("record_btn")
+        self.ui.record_btn.setCheckable(True)
+        self.ui.verticalLayout_15.addWidget(self.ui.record_btn)
+        self.ui.record_btn.clicked.connect(self.toggle_recording)
+
+            # Stop button (not in the generated UI), enabled while a program runs
+        self.ui.stop_program_btn = QtWidgets.QPushButton("Stop Program", self.ui.action_btns_box)
+        self.ui.stop_program_btn.setObjectName("stop_program_btn")
+        self.ui.stop_program_btn.setEnabled(False)
+        self.ui.verticalLayout_15.addWidget(self.ui.stop_program_btn)
+        self.ui.stop_program_btn.clicked.connect(self.stop_program)
+
+            # Program executor (runs on the session's thread)
+        self.executor_signals = ExecutorSignals()
+        self.executor_signals.step_started.connect(self.on_step_started)
+        self.executor_signals.finished.connect(self.on_program_finished)
+        self.executor_signals.failed.connect(self.on_program_failed)
+        self.executor_signals.paused.connect(self.on_program_paused)
+
+        # Connection supervisor: heartbeat, auto-reconnect with backoff
+        self.link_signals = LinkSignals()
+        self.link_signals.changed.connect(self.on_link_changed)
+
+        # Telemetry: background polling, labels refreshed at display rate
+        self.telemetry_seq = 0
+        self.telemetry_error = None
+        self.label_timer = QTimer()
+        self.label_timer.timeout.connect(self.update_robot_labels)
+
+        # Profiling toggle
+        self.trace_shortcut = QtWidgets.QShortcut(QKeySequence(TRACE_SHORTCUT), self)
+        self.trace_shortcut.activated.connect(self.toggle_tracing)
 
-            # Timer for polling robot state
-        self.run_timer = QTimer()
-        self.run_timer.timeout.connect(self.check_robot_state)
-
-        
 
         # Initialize labels with defaults
         #self.ui.status_label.setText("Not Connected")
@@ -157,357 +319,743 @@ class MainApp(QMainWindow):
         print("Application started...")  # Test print
 
     #============/Functions\============#
+    # --- Session I/O Worker ---
+    def run_in_session(self, fn, *args, then=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the session's I/O worker instead of the
+        GUI thread. then(future) is called back on the GUI thread when done.
+        """
+        future = self.session.submit(fn, *args, **kwargs)
+        if then is not None:
+            future.add_done_callback(lambda f: self.call_signals.done.emit(then, f))
+        return future
+
+    def on_call_done(self, then, future):
+        then(future)
+
+    # --- Session State ---
+    @property
+    def connected(self):
+        return self.session.connected
+
+    @property
+    def servo_locked(self):
+        return self.session.servo_locked
+
     # --- Save Configuration Button ---
+    @profiling.slot
     def save_config(self):
-        global ROBOT_NAME, ROBOT_IP, ROBOT_PORT
-
         # Replace only if the user entered something
-        name = self.ui.robot_name.text().strip()
+        name = self.ui.robot_name.text().strip() or self.session.name
         ip   = self.ui.ip_address.text().strip()
         port = self.ui.port_no.text().strip()
 
-        if name: ROBOT_NAME = name
-        if ip:   ROBOT_IP   = ip
-        if port: ROBOT_PORT = port
+        if name != self.session.name:
+            # Another robot: switch the GUI to its session (created on first use)
+            if self.session.connected:
+                print("⚠️ Disconnect before switching robots.")
+                return
+            if name not in self.sessions:
+                self.sessions.add(name, ip or self.session.ip, port or self.session.port,
+                                  self.session.speed)
+            self.session = self.sessions.get(name)
+        elif self.session.connected and (ip or port):
+            print("⚠️ Disconnect before changing the address.")
+            return
+        if ip:   self.session.ip   = ip
+        if port: self.session.port = port
 
         print(f"Configuration Saved:")
-        print(f"ROBOT_NAME = {ROBOT_NAME}")
-        print(f"ROBOT_IP   = {ROBOT_IP}")
-        print(f"ROBOT_PORT = {ROBOT_PORT}")
+        print(f"ROBOT_NAME = {self.session.name}")
+        print(f"ROBOT_IP   = {self.session.ip}")
+        print(f"ROBOT_PORT = {self.session.port}")
    
     # --- Connect/Disconnect Button ---
+    @profiling.slot
     def toggle_connection(self):
+        if self.connect_pending:
+            return
+        self.connect_pending = True
+        self.ui.on_off.setEnabled(False)  # until the worker is done
         if not self.connected:
             print("Connecting...")
-            status = functions.connect_robot(ROBOT_IP, ROBOT_PORT, ROBOT_NAME)
-            if status == 0:
-                print("✅ Robot connected")
-                self.connected = True
-                self.ui.on_off.setIcon(QIcon(on_path))   # green
-                # assume safe state after connect = locked (power OFF) until user unlocks
-                self.servo_locked = True
-                functions.set_servo_state(0, ROBOT_NAME)
-                functions.set_servo_poweroff(ROBOT_NAME)
-                self.ui.lock.setEnabled(True)
-                self.ui.lock.setIcon(QIcon(lock_path))
-            else:
-                print("❌ Connect failed")
-                self.connected = False
-                self.ui.on_off.setIcon(QIcon(off_path))  # red
-                self.servo_locked = True
-                self.ui.lock.setEnabled(False)
-                self.ui.lock.setIcon(QIcon(lock_path))
+            # safe state after connect = locked (power OFF) until user unlocks
+            self.run_in_session(self.session.connect, telemetry_rate=TELEMETRY_RATE_HZ,
+                                on_estop=self.estop_signals.done.emit,
+                                on_jog_watchdog=self.jog_signals.watchdog.emit,
+                                on_jog_error=self.jog_signals.failed.emit,
+                                log_dir=TELEMETRY_LOG_DIR,
+                                on_link=self.link_signals.changed.emit,
+                                then=self.on_connect_done)
         else:
             # on disconnect, force lock (power OFF), then disconnect
-            try:
-                functions.set_servo_state(0, ROBOT_NAME)
-                functions.set_servo_poweroff(ROBOT_NAME)
-            except Exception as e:
-                print(f"⚠️ Power-off during disconnect failed: {e}")
-
-            functions.disconnect_robot(ROBOT_NAME)
-            print("Robot disconnected")
-            self.connected = False
-            self.ui.on_off.setIcon(QIcon(off_path))      # red
-            self.servo_locked = True
+            self.stop_hold_jog()
+            self.stop_recording()
+            self.stop_telemetry()
+            self.run_in_session(self.session.disconnect, then=self.on_disconnect_done)
+
+    @profiling.slot
+    def on_connect_done(self, future):
+        self.connect_pending = False
+        self.ui.on_off.setEnabled(True)
+        try:
+            status = future.result()
+        except Exception as e:
+            status = e
+        if status == 0:
+            print("✅ Robot connected")
+            if self.session.telemetry_log_error is not None:
+                print(f"⚠️ Telemetry not recorded to disk: {self.session.telemetry_log_error}")
+            self.ui.on_off.setIcon(QIcon(on_path))   # green
+            self.ui.lock.setEnabled(True)
+            self.ui.lock.setIcon(QIcon(lock_path))
+            self.start_telemetry()
+        else:
+            print(f"❌ Connect failed ({status})")
+            self.ui.on_off.setIcon(QIcon(off_path))  # red
             self.ui.lock.setEnabled(False)
             self.ui.lock.setIcon(QIcon(lock_path))
 
+    @profiling.slot
+    def on_disconnect_done(self, future):
+        self.connect_pending = False
+        self.ui.on_off.setEnabled(True)
+        try:
+            error = future.result()
+        except Exception as e:
+            error = e
+        if error is not None:
+            print(f"⚠️ Power-off during disconnect failed: {error}")
+        print("Robot disconnected")
+        self.ui.stop.setStyleSheet("")
+        self.ui.on_off.setIcon(QIcon(off_path))      # red
+        self.ui.lock.setEnabled(False)
+        self.ui.lock.setIcon(QIcon(lock_path))
+
+    # --- Connection Supervisor (GUI thread) ---
+    @profiling.slot
+    def on_link_changed(self, state, detail):
+        if state == LINK_LOST:
+            self.stop_hold_jog()
+            print(f"⚠️ Connection lost ({detail}); reconnecting...")
+            self.ui.on_off.setIcon(QIcon(off_path))      # red
+            self.ui.lock.setEnabled(False)
+        elif state == LINK_RECONNECTING:
+            attempt, delay = detail
+            print(f"⚠️ Reconnect attempt {attempt} failed, retrying in {delay:.1f} s")
+        elif state == LINK_RESTORED:
+            print(f"✅ Connection restored after {detail:.1f} s "
+                  f"({'servo locked' if self.servo_locked else 'servo power restored'})")
+            self.ui.on_off.setIcon(QIcon(on_path))       # green
+            self.ui.lock.setEnabled(True)
+            self.ui.lock.setIcon(QIcon(lock_path if self.servo_locked else unlock_path))
+            self.start_telemetry()
+
     # --- Lock/Unlock Button ---
+    @profiling.slot
     def toggle_servo_lock(self):
         if not self.connected:
             print("⚠️ Cannot toggle lock: robot not connected.")
             return
+        if self.session.estop_engaged:
+            print("⚠️ Release the Emergency Stop first.")
+            return
+
+        # UNLOCK = allow motion, LOCK = stop motion
+        locked = not self.servo_locked
+        self.ui.lock.setEnabled(False)  # until the worker is done
+        self.run_in_session(self.session.set_servo_lock, locked,
+                            then=lambda future: self.on_servo_lock_done(locked, future))
 
+    @profiling.slot
+    def on_servo_lock_done(self, locked, future):
+        self.ui.lock.setEnabled(self.connected)
         try:
-            if self.servo_locked:
-                # UNLOCK = allow motion
-                functions.set_servo_state(1, ROBOT_NAME)
-                functions.set_servo_poweron(ROBOT_NAME)
-                print("🔓 Servo UNLOCKED (power ON)")
-                self.servo_locked = False
-                self.ui.lock.setIcon(QIcon(unlock_path))
-            else:
-                # LOCK = stop motion
-                functions.set_servo_state(0, ROBOT_NAME)
-                functions.set_servo_poweroff(ROBOT_NAME)
-                print("🔒 Servo LOCKED (power OFF)")
-                self.servo_locked = True
-                self.ui.lock.setIcon(QIcon(lock_path
-                ))
+            future.result()
         except Exception as e:
             print(f"⚠️ Servo lock toggle failed: {e}")
+            return
+        if locked:
+            print("🔒 Servo LOCKED (power OFF)")
+            self.ui.lock.setIcon(QIcon(lock_path))
+        else:
+            print("🔓 Servo UNLOCKED (power ON)")
+            self.ui.lock.setIcon(QIcon(unlock_path))
 
     # --- Emergency Stop Button ---
-    def on_estop_click(self):
+    @profiling.slot
+    def on_estop_pressed(self):
         if not self.connected:
             print("Cannot use Emergency Stop: Not connected")
             return
 
-        if not hasattr(self, "stop_engaged"):  # Initialize state if not set
-            self.stop_engaged = False
-
-        if not self.stop_engaged:
-            # Engage stop: Lock servos
-            functions.set_servo_state(0, ROBOT_NAME)
-            functions.set_servo_poweroff(ROBOT_NAME)
-            print("Emergency Stop ENGAGED: Servos Locked")
+        if not self.session.estop_engaged:
+            # Engage stop: hand off to the e-stop thread first, UI updates after
+            self.session.emergency_stop()
+            self.estop_pressed = True
 
             # Add red border
-            self.stop.setStyleSheet("border: 2px solid red;")
-            self.stop_engaged = True
-        else:
-            # Release stop: Unlock servos
-            functions.set_servo_poweron(ROBOT_NAME)
-            functions.set_servo_state(1, ROBOT_NAME)
-            print("Emergency Stop RELEASED: Servos Unlocked")
+            self.ui.stop.setStyleSheet("border: 2px solid red;")
+            self.ui.lock.setIcon(QIcon(lock_path))
+
+    @profiling.slot
+    def on_estop_click(self):
+        if self.estop_pressed:
+            self.estop_pressed = False  # this click engaged the stop
+            return
+        if not self.connected or not self.session.estop_engaged:
+            return
+
+        # Release stop: Unlock servos
+        self.run_in_session(self.session.release_estop, then=self.on_estop_released)
+
+    @profiling.slot
+    def on_estop_released(self, future):
+        try:
+            future.result()
+        except Exception as e:
+            print(f"❌ Emergency Stop release failed: {e}")
+            return
+        print("Emergency Stop RELEASED: Servos Unlocked")
+        self.ui.lock.setIcon(QIcon(unlock_path))
 
-            # Remove border (reset style so global stylesheet applies again)
-            self.stop.setStyleSheet("")
-            self.stop_engaged = False
+        # Remove border (reset style so global stylesheet applies again)
+        self.ui.stop.setStyleSheet("")
+
+    @profiling.slot
+    def on_estop_done(self, result):
+        for error in result.errors:
+            print(f"⚠️ Emergency Stop call failed: {error}")
+        print(f"Emergency Stop ENGAGED: Servos Locked "
+              f"(motion stopped in {result.dispatch * 1000:.1f} ms, "
+              f"servos off in {result.total * 1000:.1f} ms)")
 
     # --- Speed Control ---
+    @profiling.slot
     def slider_changed(self, value):
-        """Update wspeed when slider is moved"""
-        global wspeed
-        wspeed = value
-        self.ui.current_speed.setText(str(wspeed))
+        """Update the session speed when slider is moved"""
+        speed = self.session.set_speed(value)
+        self.ui.current_speed.setText(str(speed))
 
+    @profiling.slot
     def change_speed(self, delta):
-        """Increment/decrement wspeed from buttons"""
-        global wspeed
-        wspeed += delta
-        # Clamp value between 0 and 100
-        if wspeed < 0:
-            wspeed = 0
-        elif wspeed > 100:
-            wspeed = 100
+        """Increment/decrement the session speed from buttons (clamped to 0..100)"""
+        speed = self.session.set_speed(self.session.speed + delta)
         # Update UI
-        self.ui.current_speed.setText(str(wspeed))
-        self.ui.speed_slider.setValue(wspeed)
+        self.ui.current_speed.setText(str(speed))
+        self.ui.speed_slider.setValue(speed)
 
     # --- Control Buttons ---
+        # --- J4-J6 / Rx-Rz buttons (not in the generated UI) ---
+    def add_jog_buttons(self):
+        for i in (4, 5, 6):
+            for name, text, col in ((f"joint{i}_neg", f"J{i}-", 0), (f"joint{i}_pos", f"J{i}+", 2)):
+                button = QtWidgets.QPushButton(text, self.ui.frame_24)
+                button.setObjectName(name)
+                self.ui.gridLayout_3.addWidget(button, i - 1, col, 1, 1)
+                setattr(self.ui, name, button)
+        for row, axis in enumerate(("rx", "ry", "rz"), start=3):
+            label = "R" + axis[1]
+            for name, text, col in ((f"{axis}_neg", f"{label}-", 0), (f"{axis}_pos", f"{label}+", 2)):
+                button = QtWidgets.QPushButton(text, self.ui.frame_23)
+                button.setObjectName(name)
+                self.ui.gridLayout_2.addWidget(button, row, col, 1, 1)
+                setattr(self.ui, name, button)
+
         # --- generic joint jog ---
+    @profiling.slot
     def jog_joint(self, joint_index: int, direction: int):
         """
-        Jog a single joint by +/-10 units
+        Jog a single joint by +/-10 units from the last jog target
+        (rapid clicks accumulate; the move is sent on the session's worker)
         """
+        if self.ui.continuous_jog.isChecked():
+            return  # handled by press/release
+        if self.session.stepper is None:
+            print("⚠️ Cannot jog: robot not connected.")
+            return
         try:
-            status = functions.move_joint_relative(
-                joint_index=joint_index,
-                delta=10.0 * direction,
-                vel=wspeed,        # use global speed
-                acc=30,
-                dec=30,
-                robot_name=ROBOT_NAME
-            )
-            if status == 0:
-                print(f"✅ Joint {joint_index+1} moved {10*direction}")
-            else:
-                print(f"❌ robot_movej failed with code {status}")
+            target = self.session.stepper.jog(0, joint_index, 10.0 * direction,
+                                              vel=self.session.speed, acc=30, dec=30)
+            print(f"✅ Joint {joint_index+1} moved {10*direction} (target {target[joint_index]:.2f})")
         except Exception as e:
             print(f"Error moving Joint {joint_index}:", e)
-        
-        # Update labels after jog
-        self.update_robot_labels()
 
         # --- generic linear jog ---
     
+    @profiling.slot
     def jog_linear(self, axis_index: int, direction: int):
         """
-        Jog linearly along X/Y/Z axis by +/-50 units
+        Jog linearly along X/Y/Z by +/-50 mm, or rotate about Rx/Ry/Rz by +/-5 degrees
         """
+        if self.ui.continuous_jog.isChecked():
+            return  # handled by press/release
+        if self.session.stepper is None:
+            print("⚠️ Cannot jog: robot not connected.")
+            return
+        step = 50 if axis_index < 3 else 5
         try:
-            functions.linear_jog(
-                axis_index=axis_index,
-                delta=50.0 * direction,
-                vel=wspeed * 5,   # linear jog is usually faster, scale it
-                acc=30,
-                dec=30,
-                robot_name=ROBOT_NAME
-            )
-            axis_name = ["X", "Y", "Z"][axis_index]
-            print(f"✅ {axis_name} {50*direction} units")
+            self.session.stepper.jog(1, axis_index, float(step * direction),
+                                     vel=self.session.speed * 5,   # linear jog is usually faster, scale it
+                                     acc=30, dec=30)
+            axis_name = ["X", "Y", "Z", "Rx", "Ry", "Rz"][axis_index]
+            print(f"✅ {axis_name} {step*direction} units")
         except Exception as e:
             print(f"Error moving axis {axis_index}:", e)
 
-        # Update labels after jog
-        self.update_robot_labels()
+        # --- continuous jog (press and hold) ---
+    @profiling.slot
+    def start_hold_jog(self, button, coord: int, axis_index: int, direction: int):
+        """
+        Start robot_start_jogging on press; coord 0 = joint, 1 = Cartesian.
+        """
+        if not self.ui.continuous_jog.isChecked():
+            return
+        if not self.connected or self.session.jog is None:
+            print("⚠️ Cannot jog: robot not connected.")
+            return
+        if self.session.speed <= 0:
+            print("⚠️ Cannot jog: speed is 0.")
+            return
+        # start and stop run in order on the session worker; the button is
+        # tracked right away so an early release still stops the jog
+        self.jog_button = button
+        self.jog_timer.start(JOG_KEEPALIVE_MS)
+        self.run_in_session(self.session.start_jog, axis_index + 1, direction, coord,
+                            then=lambda future: self.on_hold_jog_started(button, future))
+
+    @profiling.slot
+    def on_hold_jog_started(self, button, future):
+        try:
+            status = future.result()
+        except Exception as e:
+            status = e
+            print(f"❌ Jog failed: {e}")
+        else:
+            if status != 0:
+                print(f"❌ robot_start_jogging failed with code {status}")
+        if status != 0 and self.jog_button is button:
+            self.jog_timer.stop()
+            self.jog_button = None
+
+    @profiling.slot
+    def stop_hold_jog(self):
+        self.jog_timer.stop()
+        if self.jog_button is None:
+            return
+        self.jog_button = None
+        self.run_in_session(self.session.stop_jog, then=self.on_hold_jog_stopped)
+
+    @profiling.slot
+    def on_hold_jog_stopped(self, future):
+        try:
+            status = future.result()
+        except Exception as e:
+            print(f"❌ Jog stop failed: {e}")
+            return
+        if status != 0:
+            print(f"❌ robot_stop_jogging failed with code {status}")
+
+    @profiling.slot
+    def jog_keepalive(self):
+        """While the button is held, keep the jog watchdog from firing."""
+        if self.jog_button is not None and self.jog_button.isDown() and self.session.jog is not None:
+            self.session.jog.keepalive()
+        else:
+            self.stop_hold_jog()  # release event lost
+
+    @profiling.slot
+    def on_jog_failed(self, error):
+        print(f"❌ Jog failed: {error}")
+
+    @profiling.slot
+    def on_jog_watchdog(self, axis):
+        self.jog_timer.stop()
+        self.jog_button = None
+        print(f"⚠️ Jog on axis {axis} stopped by watchdog (button release not seen)")
+
+    # --- Telemetry (polled by the session, shown at display rate) ---
+    def start_telemetry(self):
+        self.telemetry_seq = 0
+        self.telemetry_error = None
+        self.label_timer.start(int(1000 / DISPLAY_RATE_HZ))
+
+    def stop_telemetry(self):
+        self.label_timer.stop()
+
+    # --- Profiling ---
+    def toggle_tracing(self):
+        tracer = profiling.TRACER
+        if not tracer.enabled:
+            tracer.clear()
+            tracer.enable()
+            print(f"⏺ Tracing slots and DLL calls ({TRACE_SHORTCUT} to stop and save)")
+            return
+        tracer.disable()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(TRACE_DIR, f"trace-{stamp}")
+        try:
+            tracer.export(base + ".json")
+            tracer.export(base + ".speedscope.json")
+            print(f"✅ Trace saved: {base}.json (chrome://tracing) and {base}.speedscope.json "
+                  f"({len(tracer.spans)} spans)")
+        except OSError as e:
+            print(f"❌ Failed to save trace: {e}")
 
     # --- Update Robot Position Labels ---
+    @profiling.slot
     def update_robot_labels(self):
-            if not self.connected:
+            """
+            Repaint the pose labels from the newest telemetry sample.
+            Runs at display rate; never calls the DLL on the GUI thread.
+            """
+            telemetry = self.session.telemetry
+            if not self.connected or telemetry is None:
                 return  # don’t try if robot isn’t connected
 
-            try:
-                # --- Joint positions ---
-                joints = functions.get_current_position(ROBOT_NAME, coord=0)  # 0 = joint
-                self.ui.label_num_j1.setText(f"{joints[0]:.2f}")
-                self.ui.label_num_j2.setText(f"{joints[1]:.2f}")
-                self.ui.label_num_j3.setText(f"{joints[2]:.2f}")
-                self.ui.label_num_j4.setText(f"{joints[3]:.2f}")
-                self.ui.label_num_j5.setText(f"{joints[4]:.2f}")
-                self.ui.label_num_j6.setText(f"{joints[5]:.2f}")
-
-                # --- Cartesian coords ---
-                cart = functions.get_current_position(ROBOT_NAME, coord=1)  # 1 = Cartesian
-                self.ui.label_num_x.setText(f"{cart[0]:.2f}")
-                self.ui.label_num_y.setText(f"{cart[1]:.2f}")
-                self.ui.label_num_z.setText(f"{cart[2]:.2f}")
-                self.ui.label_num_rx.setText(f"{cart[3]:.2f}")
-                self.ui.label_num_ry.setText(f"{cart[4]:.2f}")
-                self.ui.label_num_rz.setText(f"{cart[5]:.2f}")
-
-            except Exception as e:
-                print(f"⚠️ Failed to update robot labels: {e}")
-            
+            error = telemetry.last_error
+            if error is not None and str(error) != str(self.telemetry_error):
+                print(f"⚠️ Failed to update robot labels: {error}")
+            self.telemetry_error = error
+
+            sample = telemetry.latest()
+            if sample is None or sample[0] == self.telemetry_seq:
+                return  # nothing new since last repaint
+            self.telemetry_seq, _, joints, cart = sample
+
+            # --- Joint positions ---
+            self.ui.label_num_J1.setText(f"{joints[0]:.2f}")
+            self.ui.label_num_J2.setText(f"{joints[1]:.2f}")
+            self.ui.label_num_J3.setText(f"{joints[2]:.2f}")
+            self.ui.label_num_J4.setText(f"{joints[3]:.2f}")
+            self.ui.label_num_J5.setText(f"{joints[4]:.2f}")
+            self.ui.label_num_J6.setText(f"{joints[5]:.2f}")
+
+            # --- Cartesian coords ---
+            self.ui.label_num_x.setText(f"{cart[0]:.2f}")
+            self.ui.label_num_y.setText(f"{cart[1]:.2f}")
+            self.ui.label_num_z.setText(f"{cart[2]:.2f}")
+            self.ui.label_num_rx.setText(f"{cart[3]:.2f}")
+            self.ui.label_num_ry.setText(f"{cart[4]:.2f}")
+            self.ui.label_num_rz.setText(f"{cart[5]:.2f}")
+
     # --- Go Home Button ---        
+    @profiling.slot
     def go_home(self, use_library_home=False):
         if not self.connected:
             print("Robot not connected")
             return
 
-        try:
-            if use_library_home:
-                functions.robot_go_home(ROBOT_NAME)
-                print("✅ Robot moved to home using library function")
-            else:
+        self.session.arm_moved()
+        name = self.session.name
+        if use_library_home:
+            self.run_in_session(functions.robot_go_home.checked, name,
+                                then=lambda future: self.on_home_done(
+                                    future, "✅ Robot moved to home using library function"))
+        else:
+            def move_home():
                 pos = [0.0]*7
-                functions.robot_movej(pos, vel=60, coord=0, acc=30, dec=30, robot_name=ROBOT_NAME)
-                print("✅ Robot moved to home (all-zero joints)")
-            
-            self.update_robot_labels()
+                status = functions.robot_movej(pos, vel=60, coord=0, acc=30, dec=30, robot_name=name)
+                functions.raise_for_status("robot_movej", status)
+            self.run_in_session(move_home, then=lambda future: self.on_home_done(
+                future, "✅ Robot moved to home (all-zero joints)"))
+
+    @profiling.slot
+    def on_home_done(self, future, message):
+        try:
+            future.result()
         except Exception as e:
             print(f"❌ Failed to move to home: {e}")
+            return
+        print(message)
 
     # --- Clear Error Button ---
+    @profiling.slot
     def on_clear_error_click(self):
         if not self.connected:
             print("❌ Robot not connected, cannot clear errors")
             return
 
+        self.run_in_session(functions.clear_error, self.session.name, then=self.on_clear_error_done)
+
+    @profiling.slot
+    def on_clear_error_done(self, future):
         try:
-            status = functions.clear_error(ROBOT_NAME)
-            if status == 0:
-                print("✅ Robot errors cleared successfully")
-            else:
-                print(f"❌ Failed to clear errors, code: {status}")
+            status = future.result()
         except Exception as e:
             print(f"⚠️ Exception while clearing errors: {e}")
+            return
+        if status == 0:
+            print("✅ Robot errors cleared successfully")
+        else:
+            print(f"❌ Failed to clear errors, code: {status}")
 
     #=======|Action Tab|=======#
+        # --- Swap QTableWidget For A Model-Backed QTableView ---
+    def replace_program_table(self, table):
+        view = QtWidgets.QTableView(table.parentWidget())
+        view.setObjectName(table.objectName())
+        view.setAlternatingRowColors(True)
+        view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        view.horizontalHeader().setStretchLastSection(False)
+        view.verticalHeader().setVisible(False)
+        self.ui.gridLayout_8.replaceWidget(table, view)
+        table.deleteLater()
+        return view
+
+        # --- Current Joint Position For Teaching ---
+    def with_current_joints(self, then, action):
+        """
+        Call then(joints) on the GUI thread with the current joint position.
+        A recent telemetry sample is used directly; otherwise the position is
+        read on the session's I/O worker so the GUI thread never waits on the DLL.
+        action: what the position is for, used in the error message
+        """
+        sample = self.session.latest()
+        if sample is not None and time.time() - sample[1] <= TEACH_SAMPLE_AGE:
+            then(sample[2])
+            return
+        self.run_in_session(functions.get_current_position, self.session.name, coord=0,
+                            then=lambda future: self.on_current_joints_done(future, then, action))
+
+    @profiling.slot
+    def on_current_joints_done(self, future, then, action):
+        try:
+            pos = future.result()
+        except Exception as e:
+            print(f"❌ Cannot {action}: failed to read the position: {e}")
+            return
+        then(pos)
+
+        # --- Selected Program Row ---
+    def selected_step(self):
+        return self.ui.programTable.currentIndex().row()
+
         # --- Save Current Position as New Step ---
+    @profiling.slot
     def save_step(self):
         if not self.connected:
             print("❌ Cannot save step: robot not connected.")
             return
         else:
-            row = self.ui.programTable.rowCount()
-            self.ui.programTable.insertRow(row)
-
-            step_no = row + 1
-            pos = functions.get_current_position()
-
-            self.ui.programTable.setItem(row, 0, QtWidgets.QTableWidgetItem(str(step_no)))
-            for i, val in enumerate(pos, start=1):
-                self.ui.programTable.setItem(row, i, QtWidgets.QTableWidgetItem(f"{val:.2f}"))
-            print(f"Step {step_no} saved.")
+            def save(pos):
+                row = self.program_model.append_step(pos)
+                print(f"Step {row + 1} saved.")
+            self.with_current_joints(save, "save step")
 
         # --- Edit Selected Row ---
+    @profiling.slot
     def edit_step(self):
         if not self.connected:
             print("❌ Cannot edit step: robot not connected.")
             return
         else:
-            row = self.ui.programTable.currentRow()
+            row = self.selected_step()
             if row < 0:
                 print(self, "No Selection", "Please select a row to edit.")
                 return
-            pos = functions.get_current_position()
-            for i, val in enumerate(pos, start=1):
-                self.ui.programTable.setItem(row, i, QtWidgets.QTableWidgetItem(f"{val:.2f}"))
+            def edit(pos):
+                if row >= len(self.program_model.program):
+                    print(f"⚠️ Step {row + 1} no longer exists, not edited.")
+                    return
+                self.program_model.update_step(row, pos)
+            self.with_current_joints(edit, "edit step")
 
         # --- Insert Below Selected Row ---
+    @profiling.slot
     def insert_step(self):
         if not self.connected:
             print("❌ Cannot insert step: robot not connected.")
             return
         else:
-            row = self.ui.programTable.currentRow()
-            if row < 0: row = self.ui.programTable.rowCount() - 1
-            self.ui.programTable.insertRow(row + 1)
+            row = self.selected_step()
+            if row < 0: row = len(self.program_model.program) - 1
 
-            pos = functions.get_current_position()
-            self.ui.programTable.setItem(row + 1, 0, QtWidgets.QTableWidgetItem(str(row + 2)))
-            for i, val in enumerate(pos, start=1):
-                self.ui.programTable.setItem(row + 1, i, QtWidgets.QTableWidgetItem(f"{val:.2f}"))
-
-            self.renumber_steps()
+            def insert(pos):
+                self.program_model.insert_step(min(row + 1, len(self.program_model.program)), pos)
+            self.with_current_joints(insert, "insert step")
 
         # --- Delete Selected Row ---
+    @profiling.slot
     def delete_step(self):
         if not self.connected:
             print("❌ Cannot delete step: robot not connected.")
             return
         else:
-            row = self.ui.programTable.currentRow()
+            row = self.selected_step()
             if row >= 0:
-                self.ui.programTable.removeRow(row)
-                self.renumber_steps()
+                self.program_model.remove_step(row)
+
+        # --- Record Hand-Guided Path ---
+    @profiling.slot
+    def toggle_recording(self):
+        if self.session.recorder is None:
+            if not self.connected:
+                print("❌ Cannot record: robot not connected.")
+                self.ui.record_btn.setChecked(False)
+                return
+            if self.session.program_running:
+                print("❌ Cannot record while a program is running.")
+                self.ui.record_btn.setChecked(False)
+                return
+            self.session.start_recording(rate_hz=RECORD_RATE_HZ)
+            self.ui.record_btn.setChecked(True)
+            print(f"⏺ Recording at {RECORD_RATE_HZ} Hz... move the arm, press again to stop")
+        else:
+            self.stop_recording()
+
+    def stop_recording(self):
+        recorder = self.session.stop_recording()
+        if recorder is None:
+            return
+        self.ui.record_btn.setChecked(False)
+        if recorder.last_error is not None:
+            print(f"⚠️ Recording stopped early: {recorder.last_error}")
+
+        samples = recorder.samples()
+        if len(samples) < 2:
+            print("❌ Recording too short, program unchanged.")
+            return
+        program = samples_to_program(samples, tolerance=RECORD_TOLERANCE)
+        self.program_model.set_program(program)
+        print(f"Recorded {len(samples)} samples over {samples[-1, 0]:.1f} s "
+              f"({recorder.missed} missed) -> {len(program)} steps")
+
+        # --- Save Program To File ---
+    @profiling.slot
+    def save_program(self):
+        if len(self.program_model.program) == 0:
+            print("❌ Cannot save program: no steps.")
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save Program", "", PROGRAM_FILE_FILTER)
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += program_io.PROGRAM_EXT
+        try:
+            program_io.save_program_file(self.program_model.program, path)
+            print(f"Program saved: {path} ({len(self.program_model.program)} steps)")
+        except Exception as e:
+            print(f"❌ Failed to save program: {e}")
 
-        # --- Renumber Steps ---
-    def renumber_steps(self):
-        for row in range(self.ui.programTable.rowCount()):
-            self.ui.programTable.setItem(row, 0, QtWidgets.QTableWidgetItem(str(row + 1)))
+        # --- Load Program From File ---
+    @profiling.slot
+    def load_program(self):
+        if self.session.program_running:
+            print("❌ Cannot load program while running.")
+            return
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Load Program", "", PROGRAM_FILE_FILTER)
+        if not path:
+            return
+        try:
+            program = program_io.load_program_file(path)
+        except Exception as e:
+            print(f"❌ Failed to load program: {e}")
+            return
+        self.program_model.set_program(program)
+        print(f"Program loaded: {path} ({len(program)} steps)")
 
         # --- Run Program ---
+    @profiling.slot
     def run_program(self):
         if not self.connected:
             print("❌ Cannot save step: robot not connected.")
             return
         else:
-            global current_step_index, program_running
-            if self.ui.programTable.rowCount() == 0:
+            program = self.program_model.program
+            if len(program) == 0:
                 print(self, "No Program", "No steps available.")
                 return
-        
-            program_running = True
-            current_step_index = 0
-            self.execute_step(current_step_index)
-            self.run_timer.start(200)  # poll every 200 ms
-
-        # --- Execute Step ---
-    def execute_step(self, index):
-        row = index
-        pos = []
-        for col in range(1, 8):  # J1..Gripper
-            val = float(self.ui.programTable.item(row, col).text())
-            pos.append(val)
-
-        # Send command to robot
-        functions.robot_movej(pos, vel=wspeed, coord=0, acc=30, dec=30, robot_name=ROBOT_NAME)
-
-        # --- Poll Robot State ---
-    def check_robot_state(self):
-        if not self.connected:
-            print("❌ Cannot check robot state: robot not connected.")
-            return
-        else:
-            global current_step_index, program_running
-            if not program_running:
-                self.run_timer.stop()
+            if self.session.program_running:
+                print("⚠️ Program already running.")
+                return
+
+            # Snapshot so edits during the run do not affect the executor
+            steps = program.positions().copy()
+
+            # A program paused by a lost connection continues where it stopped
+            if self.session.can_resume(steps):
+                if not self.session.link_up:
+                    print("⚠️ Connection not restored yet.")
+                    return
+                print(f"▶ Resuming program at step {self.session.paused_step + 1}")
+                self.session.resume_program()
+                self.ui.stop_program_btn.setEnabled(True)
+                return
+            self.session.clear_paused()
+            pl = program.pl().astype(int).tolist()
+
+            # Pre-flight: validate the whole program before sending anything
+            sample = self.session.latest()
+            report = check_program(steps, vel=self.session.speed, acc=30, dec=30, pl=pl,
+                                   start=sample[2] if sample is not None else None,
+                                   workspace=PREFLIGHT_WORKSPACE)
+            for line in report.lines():
+                print(line)
+            if not report.ok:
+                print(f"❌ Program not run: {len(report.errors)} pre-flight error(s).")
                 return
+            print(f"Pre-flight OK, estimated cycle time {report.estimated_cycle_time:.1f} s")
 
-            state = functions.get_robot_running_state(ROBOT_NAME)  # 0=idle,1=running (assumed)
-            if state == 0:  # finished current move
-                current_step_index += 1
-                if current_step_index < self.ui.programTable.rowCount():
-                    self.execute_step(current_step_index)
-                else:
-                    program_running = False
-                    self.run_timer.stop()
-                    print(self, "Program Done", "All steps executed!")
+            self.session.run_program(
+                steps,
+                pl=pl,
+                acc=30,
+                dec=30,
+                lookahead=PROGRAM_LOOKAHEAD,
+                on_step=self.executor_signals.step_started.emit,
+                on_finished=self.executor_signals.finished.emit,
+                on_error=self.executor_signals.failed.emit,
+                on_paused=self.executor_signals.paused.emit,
+            )
+            self.ui.stop_program_btn.setEnabled(True)
 
+        # --- Stop Program ---
+    @profiling.slot
+    def stop_program(self):
+        if not self.session.program_running:
+            return
+        self.session.stop_program()
+        self.ui.stop_program_btn.setEnabled(False)
+        print("⏹ Program stopping after the current step.")
+
+        # --- Executor Callbacks (GUI thread) ---
+    @profiling.slot
+    def on_step_started(self, index):
+        self.ui.programTable.selectRow(index)
+
+    @profiling.slot
+    def on_program_finished(self, stats):
+        self.ui.stop_program_btn.setEnabled(False)
+        summary = stats.summary()
+        print(f"Program Done: {summary['steps']} steps in {summary['cycle_time']:.3f} s")
+        print(f"Idle gap between steps: mean {summary['gap_mean'] * 1000:.1f} ms, "
+              f"max {summary['gap_max'] * 1000:.1f} ms")
+
+    @profiling.slot
+    def on_program_failed(self, error):
+        self.ui.stop_program_btn.setEnabled(False)
+        print(f"❌ Program stopped: {error}")
+
+    @profiling.slot
+    def on_program_paused(self, index):
+        self.ui.stop_program_btn.setEnabled(False)
+        print(f"⏸ Program paused at step {index + 1}; press Run to resume once connected.")
+
+    # --- Window Close ---
+    def closeEvent(self, event):
+        self.stop_hold_jog()
+        self.stop_recording()
+        self.stop_telemetry()
+        self.sessions.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.terminal_log.stop()
+        self.log.close()
+        super().closeEvent(event)
 
 
 # Run the application
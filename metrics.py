@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -------------------------
+# Configuration
+# -------------------------
+# COBOT_METRICS_PORT=9105 serves Prometheus text metrics on
+# http://COBOT_METRICS_HOST:9105/metrics (host defaults to 127.0.0.1).
+# Without it the foreign calls are not instrumented at all.
+METRICS_PORT = int(os.environ.get("COBOT_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("COBOT_METRICS_HOST", "127.0.0.1")
+ENABLED = METRICS_PORT > 0
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0)
+CYCLE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# -------------------------
+# Metric types
+# -------------------------
+class _Metric:
+    """
+    Base for the metric types. Updates go to a per-thread shard (a plain
+    dict only its own thread writes), so the hot paths never take a lock;
+    a scrape sums the shards.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:  # once per thread
+                self._shards.append(shard)
+        return shard
+
+    def _label_text(self, values, extra=""):
+        parts = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *values, amount: float = 1):
+        shard = self._shard()
+        shard[values] = shard.get(values, 0) + amount
+
+    def _samples(self):
+        totals = {}
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return [f"{self.name}{self._label_text(k)} {_number(v)}" for k, v in sorted(totals.items())]
+
+class Gauge(_Metric):
+    """Last value set wins (one slot per label set, no shards needed)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def set(self, value: float, *values):
+        self._values[values] = value
+
+    def _samples(self):
+        return [f"{self.name}{self._label_text(k)} {_number(v)}"
+                for k, v in sorted(list(self._values.items()))]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *values):
+        shard = self._shard()
+        entry = shard.get(values)
+        if entry is None:
+            entry = shard[values] = [0] * (len(self.buckets) + 1) + [0.0]
+        i = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            i += 1
+        entry[i] += 1        # per-bucket (non-cumulative) count, last = +Inf
+        entry[-1] += value   # sum
+
+    def _samples(self):
+        totals = {}
+        for shard in list(self._shards):
+            for key, entry in list(shard.items()):
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = list(entry)
+                else:
+                    for i, v in enumerate(entry):
+                        total[i] += v
+        lines = []
+        for key, entry in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{self._label_text(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_number(entry[-1])}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _number(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+REGISTRY = []
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# -------------------------
+# Metrics
+# -------------------------
+CALLS = Counter("cobot_calls_total", "nrc_lib calls.", ("robot", "function"))
+CALL_ERRORS = Counter("cobot_call_errors_total", "nrc_lib calls that returned a non-zero status.",
+                      ("robot", "function", "code"))
+CALL_LATENCY = Histogram("cobot_call_seconds", "Time spent inside nrc_lib calls.",
+                         ("robot", "function"))
+PROGRAM_STEPS = Counter("cobot_program_steps_total", "Program steps completed.", ("robot",))
+PROGRAM_CYCLE = Histogram("cobot_program_cycle_seconds", "Duration of finished program runs.",
+                          ("robot",), CYCLE_BUCKETS)
+PROGRAM_RATE = Gauge("cobot_program_steps_per_second", "Step rate of the last finished program.",
+                     ("robot",))
+JOGS = Counter("cobot_jogs_total", "Jog commands.", ("robot", "mode"))
+JOG_WATCHDOG_STOPS = Counter("cobot_jog_watchdog_stops_total", "Jogs stopped by the watchdog.",
+                             ("robot",))
+CONNECTS = Counter("cobot_connects_total", "connect_robot attempts.", ("robot", "result"))
+RECONNECTS = Counter("cobot_reconnects_total", "Successful connects after an earlier connection.",
+                     ("robot",))
+ESTOPS = Counter("cobot_estops_total", "Emergency stops.", ("robot",))
+ESTOP_DISPATCH = Histogram("cobot_estop_dispatch_seconds", "E-stop trigger until job_stop returned.",
+                           ("robot",))
+ESTOP_TOTAL = Histogram("cobot_estop_seconds", "E-stop trigger until the servos were off.",
+                        ("robot",))
+
+# -------------------------
+# Call instrumentation
+# -------------------------
+_robot_names = {}
+
+def instrument(name: str, fn, status_result: bool = True):
+    """
+    Wrap the foreign function fn (called with the encoded robot name
+    last) so each call is counted and timed. status_result: a non-zero
+    result is an error code (False for functions returning values).
+    """
+    clock = time.perf_counter
+
+    def call(*args):
+        robot = _robot_names.get(args[-1])
+        if robot is None:
+            robot = _robot_names[args[-1]] = args[-1].decode("utf-8", "replace")
+        start = clock()
+        result = fn(*args)
+        CALL_LATENCY.observe(clock() - start, robot, name)
+        CALLS.inc(robot, name)
+        if status_result and result != 0:
+            CALL_ERRORS.inc(robot, name, str(result))
+        return result
+
+    call.__name__ = name
+    return call
+
+# -------------------------
+# HTTP exporter
+# -------------------------
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the terminal
+
+class MetricsServer:
+    """
+    Serves /metrics from a background thread; scrapes never touch the GUI
+    loop, they only read the metric shards.
+    """
+
+    def __init__(self, port: int = METRICS_PORT, host: str = METRICS_HOST):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,179 @@
+import numpy as np
+
+from kinematics import ArmModel
+
+# -------------------------
+# Limits used by the checks
+# -------------------------
+# Maximum joint speed (deg/s) and acceleration (deg/s^2) at 100 % settings
+DEFAULT_JOINT_SPEED = [180.0, 180.0, 180.0, 225.0, 225.0, 225.0]
+DEFAULT_JOINT_ACC = [360.0, 360.0, 360.0, 450.0, 450.0, 450.0]
+
+# Example TCP workspace box in the base frame (mm). The workspace check
+# only runs when a box is passed, since it relies on the DH table in
+# kinematics matching the real arm.
+DEFAULT_WORKSPACE = {
+    "min": [-1000.0, -1000.0, -50.0],
+    "max": [1000.0, 1000.0, 1300.0],
+}
+
+ZONE_PER_PL = 2.0  # degrees of blend zone per pl level (same as ProgramExecutor)
+
+# -------------------------
+# Report
+# -------------------------
+class PreflightReport:
+    """
+    Result of check_program.
+    issues: list of (step, severity, check, detail); step is 0-based,
+            severity is "error" or "warning"
+    segment_times: (N,) estimated duration of each move in seconds
+    """
+
+    def __init__(self, issues, segment_times):
+        self.issues = issues
+        self.segment_times = segment_times
+
+    @property
+    def ok(self) -> bool:
+        return not any(severity == "error" for _, severity, _, _ in self.issues)
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue[1] == "error"]
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue[1] == "warning"]
+
+    @property
+    def estimated_cycle_time(self) -> float:
+        return float(np.sum(self.segment_times))
+
+    def lines(self, limit: int = 20):
+        """Human-readable issue lines, at most limit of them."""
+        out = [f"Step {step + 1}: {severity} [{check}] {detail}"
+               for step, severity, check, detail in self.issues[:limit]]
+        if len(self.issues) > limit:
+            out.append(f"... and {len(self.issues) - limit} more")
+        return out
+
+# -------------------------
+# Motion time estimate
+# -------------------------
+def segment_times(positions, vel, acc, dec, start=None,
+                  joint_speed=DEFAULT_JOINT_SPEED, joint_acc=DEFAULT_JOINT_ACC):
+    """
+    Estimated duration of each joint move, assuming synchronised
+    trapezoidal profiles where vel/acc/dec are percentages of the joint
+    maxima. Returns (durations (N,), deltas (N, 6)); the first move starts
+    from start if given, otherwise it is 0.
+    """
+    q = np.asarray(positions, dtype=np.float64)[:, :6]
+    prev = np.vstack((q[:1] if start is None else np.asarray(start, dtype=np.float64)[None, :6], q[:-1]))
+    delta = q - prev
+    dist = np.abs(delta)
+
+    v = np.asarray(joint_speed) * (vel / 100.0)
+    a = np.asarray(joint_acc) * (acc / 100.0)
+    d = np.asarray(joint_acc) * (dec / 100.0)
+    # distance needed to reach and leave cruise speed
+    ramp = v * v / (2 * a) + v * v / (2 * d)
+    cruise_t = dist / v + v / (2 * a) + v / (2 * d)
+    peak = np.sqrt(2 * dist * a * d / (a + d))
+    tri_t = peak / a + peak / d
+    t = np.where(dist >= ramp, cruise_t, tri_t)
+    return t.max(axis=1), delta
+
+# -------------------------
+# Pre-flight check
+# -------------------------
+def check_program(positions, vel: float, acc: float = 30, dec: float = 30, pl=None,
+                  model: ArmModel = None, start=None, workspace=None,
+                  joint_speed=DEFAULT_JOINT_SPEED, joint_acc=DEFAULT_JOINT_ACC,
+                  samples_per_segment: int = 4, min_move: float = 1e-3) -> PreflightReport:
+    """
+    Validate a whole program in one vectorised pass before it is run.
+    positions: (N, 7) or (N, 6) joint waypoints in degrees
+    vel, acc, dec: the speed settings the program will run with (%)
+    pl: (N,) blend levels, or None for full stops
+    start: current joint position, to check the move to the first step
+    workspace: {"min": [x, y, z], "max": [x, y, z]} TCP box in mm, or None to skip
+    Checks: speed settings, joint limits, TCP workspace (waypoints and
+    points interpolated along each joint move), zero-length moves, blend
+    zone size and the acceleration needed to turn through a blend.
+    """
+    model = model if model is not None else ArmModel()
+    q = np.asarray(positions, dtype=np.float64)[:, :6]
+    n = len(q)
+    issues = []
+
+    # --- Speed settings ---
+    for name, value in (("vel", vel), ("acc", acc), ("dec", dec)):
+        if not (0 < value <= 100):
+            issues.append((0, "error", "speed", f"{name}={value} outside 1..100 %"))
+    if n == 0 or any(issue[1] == "error" for issue in issues):
+        return PreflightReport(issues, np.zeros(n))
+
+    # --- Joint limits ---
+    inside = model.within_limits(q)
+    for step, joint in zip(*np.nonzero(~inside)):
+        issues.append((int(step), "error", "joint limit",
+                       f"J{joint + 1}={q[step, joint]:.2f} outside "
+                       f"[{model.lower[joint]:.0f}, {model.upper[joint]:.0f}]"))
+
+    # --- Workspace (waypoints + interpolated points along each move) ---
+    if workspace is not None:
+        prev = np.vstack((q[:1] if start is None else np.asarray(start, dtype=np.float64)[None, :6], q[:-1]))
+        s = np.linspace(0.0, 1.0, samples_per_segment + 1)[1:]
+        path = prev[:, None, :] + s[None, :, None] * (q - prev)[:, None, :]
+        tcp = model.fk_position(path.reshape(-1, 6)).reshape(n, len(s), 3)
+        lo, hi = np.asarray(workspace["min"]), np.asarray(workspace["max"])
+        outside = ((tcp < lo) | (tcp > hi)).any(axis=2)
+        for step in np.flatnonzero(outside.any(axis=1)):
+            k = int(np.argmax(outside[step]))
+            x, y, z = tcp[step, k]
+            where = "at waypoint" if k == len(s) - 1 else "during move"
+            issues.append((int(step), "error", "workspace",
+                           f"TCP ({x:.0f}, {y:.0f}, {z:.0f}) mm outside workspace {where}"))
+
+    # --- Timing, zero-length moves ---
+    times, delta = segment_times(q, vel, acc, dec, start, joint_speed, joint_acc)
+    moving = np.abs(delta).max(axis=1)
+    first = 0 if start is not None else 1
+    for step in np.flatnonzero(moving[first:] < min_move) + first:
+        issues.append((int(step), "warning", "zero move",
+                       "same position as the previous step"))
+
+    # --- Blends ---
+    if pl is not None and n > 2:
+        pl = np.asarray(pl, dtype=np.float64)[:n]
+        zone = pl * ZONE_PER_PL
+        # a blend at step i joins move i (into i) with move i+1 (out of i)
+        mid = np.arange(n - 1)
+        blended = mid[zone[mid] > 0]
+        if len(blended):
+            seg_in = moving[blended]
+            seg_out = moving[blended + 1]
+            too_big = zone[blended] > 0.5 * np.minimum(seg_in, seg_out)
+            for step in blended[too_big]:
+                issues.append((int(step), "warning", "blend",
+                               f"zone {zone[step]:.1f} deg is more than half the adjacent move"))
+
+            # joint velocity change through the blend vs allowed acceleration
+            safe_t = np.maximum(times, 1e-9)[:, None]
+            v_seg = delta / safe_t
+            v_in, v_out = v_seg[blended], v_seg[blended + 1]
+            speed_in = np.maximum(np.abs(v_in).max(axis=1), 1e-9)
+            t_blend = 2.0 * zone[blended] / speed_in
+            a_req = np.abs(v_out - v_in) / t_blend[:, None]
+            a_max = np.asarray(joint_acc) * (min(acc, dec) / 100.0)
+            over = a_req > a_max
+            for i, joint in zip(*np.nonzero(over)):
+                step = blended[i]
+                issues.append((int(step), "error", "blend accel",
+                               f"J{joint + 1} needs {a_req[i, joint]:.0f} deg/s^2 "
+                               f"(limit {a_max[joint]:.0f}) to turn through the blend"))
+
+    issues.sort(key=lambda issue: issue[0])
+    return PreflightReport(issues, times)
@@ -0,0 +1,183 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# -------------------------
+# Span tracer
+# -------------------------
+# COBOT_TRACE=1 starts with tracing on; it can be toggled at any time with
+# enable()/disable() (Ctrl+Shift+P in the GUI). While disabled a traced
+# slot costs one attribute check and foreign calls are not wrapped at all.
+class Tracer:
+    """
+    Records (name, category, thread id, start ns, duration ns) spans into
+    a ring buffer of the last capacity spans. deque.append is atomic, so
+    spans can be recorded from any thread without a lock.
+    """
+
+    def __init__(self, capacity: int = 200_000):
+        self.enabled = False
+        self.spans = deque(maxlen=capacity)
+        self.listeners = []  # called with the new state on enable()/disable()
+
+    def enable(self):
+        self._set(True)
+
+    def disable(self):
+        self._set(False)
+
+    def _set(self, enabled: bool):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        for listener in self.listeners:
+            listener(enabled)
+
+    def clear(self):
+        self.spans.clear()
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int):
+        self.spans.append((name, category, threading.get_ident(), start_ns, end_ns - start_ns))
+
+    def span(self, name: str, category: str = "code"):
+        """Context manager timing its block (a no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category)
+
+    # --- export ---
+    def _snapshot(self):
+        spans = list(self.spans)
+        names = {t.ident: t.name for t in threading.enumerate()}
+        return spans, names
+
+    def chrome_trace(self) -> dict:
+        """Spans as a Chrome trace (chrome://tracing, Perfetto)."""
+        spans, names = self._snapshot()
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                   "args": {"name": names.get(tid, str(tid))}}
+                  for tid in sorted({s[2] for s in spans})]
+        for name, category, tid, start, duration in spans:
+            events.append({"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                           "ts": start / 1000.0, "dur": duration / 1000.0})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def speedscope(self) -> dict:
+        """Spans as a speedscope file, one evented profile per thread."""
+        spans, names = self._snapshot()
+        frames = []
+        frame_index = {}
+        by_thread = {}
+        for name, category, tid, start, duration in spans:
+            key = (name, category)
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append({"name": name, "file": category})
+            by_thread.setdefault(tid, []).append((start, duration, frame_index[key]))
+        profiles = []
+        for tid, items in sorted(by_thread.items()):
+            events = []
+            for start, duration, frame in items:
+                # sort key: time, closes before opens, outer spans open first / close last
+                events.append((start, 1, -duration, "O", frame))
+                events.append((start + duration, 0, duration, "C", frame))
+            events.sort()
+            profiles.append({
+                "type": "evented", "name": names.get(tid, str(tid)), "unit": "microseconds",
+                "startValue": events[0][0] / 1000.0, "endValue": events[-1][0] / 1000.0,
+                "events": [{"type": kind, "frame": frame, "at": at / 1000.0}
+                           for at, _, _, kind, frame in events],
+            })
+        return {"$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": frames}, "profiles": profiles,
+                "name": "cobot trace", "exporter": "cobot profiling"}
+
+    def export(self, path: str, fmt: str = None) -> str:
+        """
+        Write the buffered spans to path. fmt: "chrome" or "speedscope"
+        (default: speedscope if the name ends in .speedscope.json).
+        """
+        if fmt is None:
+            fmt = "speedscope" if path.endswith(".speedscope.json") else "chrome"
+        data = self.speedscope() if fmt == "speedscope" else self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return path
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "start")
+
+    def __init__(self, tracer, name, category):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter_ns())
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+TRACER = Tracer()
+if os.environ.get("COBOT_TRACE", "") not in ("", "0"):
+    TRACER.enabled = True
+
+# -------------------------
+# Decorators / wrappers
+# -------------------------
+def slot(fn):
+    """
+    Trace a Qt slot (method). Like PyQt itself, extra signal arguments the
+    method does not accept (e.g. clicked's checked flag) are dropped.
+    """
+    code = fn.__code__
+    takes_varargs = bool(code.co_flags & 0x04)
+    max_args = code.co_argcount
+    name = fn.__qualname__
+    tracer = TRACER
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not takes_varargs and len(args) > max_args:
+            args = args[:max_args]
+        if not tracer.enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            tracer.record(name, "slot", start, time.perf_counter_ns())
+
+    return wrapper
+
+def trace_call(name: str, fn, category: str = "nrc_lib"):
+    """Wrap a foreign function so every call is recorded as a span."""
+    tracer = TRACER
+    clock = time.perf_counter_ns
+
+    def call(*args):
+        start = clock()
+        try:
+            return fn(*args)
+        finally:
+            tracer.record(name, category, start, clock())
+
+    call.__name__ = name
+    return call
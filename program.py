@@ -0,0 +1,238 @@
+import csv
+import json
+import os
+import struct
+
+import numpy as np
+
+# Step record layout: J1..J6, E (gripper/7th axis), PL (blend level)
+POS_WIDTH = 7
+PL_COL = 7
+STEP_WIDTH = 8
+
+# -------------------------
+# Program data
+# -------------------------
+class Program:
+    """
+    Taught program stored as one contiguous float64 array, one row per step.
+    Columns 0..6 are the 7 joint values sent to robot_movej, column 7 is
+    the step's blend level (pl). Rows are kept in a preallocated buffer
+    that grows by doubling, so appends are amortised O(1) and every read
+    is a plain array index (no text parsing, no rounding).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._buf = np.zeros((max(1, capacity), STEP_WIDTH), dtype=np.float64)
+        self._count = 0
+
+    @classmethod
+    def wrap(cls, buf):
+        """
+        Use an existing (N, 8) float64 array as the program buffer without
+        copying (e.g. a memmap from map_program). It is only copied if the
+        program has to grow.
+        """
+        if buf.ndim != 2 or buf.shape[1] != STEP_WIDTH or buf.dtype != np.float64:
+            raise ValueError("buffer must be an (N, 8) float64 array")
+        program = cls.__new__(cls)
+        program._buf = buf
+        program._count = len(buf)
+        return program
+
+    @classmethod
+    def from_array(cls, data):
+        """Build a program from an (N, 7) or (N, 8) array of steps."""
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[1] not in (POS_WIDTH, STEP_WIDTH):
+            raise ValueError("steps must be an (N, 7) or (N, 8) array")
+        program = cls(capacity=len(data))
+        program._buf[:len(data), :data.shape[1]] = data
+        program._count = len(data)
+        return program
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def data(self):
+        """(N, 8) view of all steps; writes go straight into the program."""
+        return self._buf[:self._count]
+
+    def positions(self):
+        """(N, 7) view of the step positions."""
+        return self._buf[:self._count, :POS_WIDTH]
+
+    def pl(self):
+        """(N,) view of the step blend levels."""
+        return self._buf[:self._count, PL_COL]
+
+    def step(self, row: int):
+        """(8,) view of one step."""
+        if not (0 <= row < self._count):
+            raise IndexError(f"step {row} out of range")
+        return self._buf[row]
+
+    def _reserve(self, count: int):
+        if count > len(self._buf):
+            grown = np.zeros((max(count, 2 * len(self._buf)), STEP_WIDTH), dtype=np.float64)
+            grown[:self._count] = self._buf[:self._count]
+            self._buf = grown
+
+    def insert(self, row: int, pos, pl: int = 0) -> int:
+        """Insert a step before row (row == len(self) appends). Returns row."""
+        if not (0 <= row <= self._count):
+            raise IndexError(f"step {row} out of range")
+        if len(pos) != POS_WIDTH:
+            raise ValueError("pos must be a list of 7 floats")
+        self._reserve(self._count + 1)
+        self._buf[row + 1:self._count + 1] = self._buf[row:self._count]
+        self._buf[row, :POS_WIDTH] = pos
+        self._buf[row, PL_COL] = pl
+        self._count += 1
+        return row
+
+    def append(self, pos, pl: int = 0) -> int:
+        return self.insert(self._count, pos, pl)
+
+    def set_step(self, row: int, pos=None, pl=None):
+        step = self.step(row)
+        if pos is not None:
+            if len(pos) != POS_WIDTH:
+                raise ValueError("pos must be a list of 7 floats")
+            step[:POS_WIDTH] = pos
+        if pl is not None:
+            step[PL_COL] = pl
+
+    def remove(self, row: int):
+        self.step(row)  # range check
+        self._buf[row:self._count - 1] = self._buf[row + 1:self._count]
+        self._count -= 1
+
+    def clear(self):
+        self._count = 0
+
+
+# -------------------------
+# Binary program file (.cprg)
+# -------------------------
+# Header: magic, version, step width, step count (little-endian), then
+# `count` records of STEP_WIDTH float64 values each.
+PROGRAM_MAGIC = b"COBOTPRG"
+PROGRAM_VERSION = 1
+PROGRAM_EXT = ".cprg"
+_HEADER = struct.Struct("<8sIIQ8x")  # 32 bytes, keeps records 8-byte aligned
+
+def save_program(program: Program, path: str):
+    """Write program to path in the binary .cprg format."""
+    data = np.ascontiguousarray(program.data, dtype="<f8")
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(PROGRAM_MAGIC, PROGRAM_VERSION, STEP_WIDTH, len(data)))
+            f.write(data.tobytes())
+        os.replace(tmp, path)  # never leave a half-written program behind
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def map_program(path: str, mode: str = "r"):
+    """
+    Memory-map the steps of a .cprg file as an (N, 8) float64 array.
+    mode: "r" read-only, "c" copy-on-write (edits stay in memory)
+    Nothing is read until rows are touched, so this is instant for any size
+    and rows can be streamed straight to the executor.
+    The map keeps the file open; on Windows the file cannot be replaced
+    (e.g. saved over) until the array is released. Use load_program for
+    a program that is edited and saved back.
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError(f"{path}: not a program file (truncated header)")
+    magic, version, width, count = _HEADER.unpack(header)
+    if magic != PROGRAM_MAGIC:
+        raise ValueError(f"{path}: not a program file")
+    if version != PROGRAM_VERSION or width != STEP_WIDTH:
+        raise ValueError(f"{path}: unsupported program version {version} (width {width})")
+    expected = _HEADER.size + count * STEP_WIDTH * 8
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path}: file is shorter than its {count} steps")
+    if count == 0:
+        return np.zeros((0, STEP_WIDTH), dtype=np.float64)
+    return np.memmap(path, dtype="<f8", mode=mode, offset=_HEADER.size, shape=(count, STEP_WIDTH))
+
+def load_program(path: str) -> Program:
+    """
+    Read a .cprg file into an editable Program that owns its data, so the
+    file is closed again and can be saved over (a map would lock it on
+    Windows).
+    """
+    mapped = map_program(path, mode="r")
+    data = np.array(mapped, dtype=np.float64)
+    del mapped  # last reference: the map and the file are released here
+    return Program.wrap(data)
+
+# -------------------------
+# JSON / CSV interchange
+# -------------------------
+CSV_HEADER = ["J1", "J2", "J3", "J4", "J5", "J6", "Gripper", "PL"]
+
+def export_json(program: Program, path: str):
+    steps = [{"pos": row[:POS_WIDTH].tolist(), "pl": int(row[PL_COL])} for row in program.data]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": PROGRAM_VERSION, "steps": steps}, f, indent=1)
+
+def import_json(path: str) -> Program:
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    steps = doc["steps"] if isinstance(doc, dict) else doc
+    program = Program(capacity=len(steps))
+    for step in steps:
+        if isinstance(step, dict):
+            program.append(step["pos"], step.get("pl", 0))
+        else:
+            program.append(step)
+    return program
+
+def export_csv(program: Program, path: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for row in program.data.tolist():
+            writer.writerow([repr(v) for v in row[:POS_WIDTH]] + [int(row[PL_COL])])
+
+def import_csv(path: str) -> Program:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row]
+    if rows and rows[0][0].strip().upper() == "J1":
+        rows = rows[1:]
+    data = np.zeros((len(rows), STEP_WIDTH), dtype=np.float64)
+    for i, row in enumerate(rows):
+        if len(row) not in (POS_WIDTH, STEP_WIDTH):
+            raise ValueError(f"{path}: line {i + 2} has {len(row)} columns, expected 7 or 8")
+        data[i, :len(row)] = [float(v) for v in row]
+    return Program.from_array(data)
+
+# -------------------------
+# Save/load by file extension
+# -------------------------
+def save_program_file(program: Program, path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        export_json(program, path)
+    elif ext == ".csv":
+        export_csv(program, path)
+    else:
+        save_program(program, path)
+
+def load_program_file(path: str) -> Program:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        return import_json(path)
+    if ext == ".csv":
+        return import_csv(path)
+    return load_program(path)
@@ -0,0 +1,96 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from program import Program, PL_COL
+
+# -------------------------
+# Program table model
+# -------------------------
+class ProgramTableModel(QAbstractTableModel):
+    """
+    Table view onto a Program: column 0 is the step number, then the
+    7 joint values and the blend level. Values are shown with two
+    decimals but edited and stored at full precision.
+    """
+
+    HEADERS = ["Step", "J1", "J2", "J3", "J4", "J5", "J6", "Gripper", "PL"]
+
+    def __init__(self, program: Program = None, parent=None):
+        super().__init__(parent)
+        self.program = program if program is not None else Program()
+
+    # --- QAbstractTableModel interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.program)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if col == 0:
+            return str(row + 1) if role == Qt.DisplayRole else None
+        value = self.program.data[row, col - 1]
+        if role == Qt.DisplayRole:
+            if col - 1 == PL_COL:
+                return str(int(value))
+            return f"{value:.2f}"
+        if role == Qt.EditRole:
+            return float(value)
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or index.column() == 0:
+            return False
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+        if index.column() - 1 == PL_COL:
+            value = max(0, int(value))
+        self.program.data[index.row(), index.column() - 1] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    # --- Program editing ---
+    def insert_step(self, row: int, pos, pl: int = 0) -> int:
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.program.insert(row, pos, pl)
+        self.endInsertRows()
+        # step numbers below the insert shift by one
+        self.dataChanged.emit(self.index(row, 0), self.index(len(self.program) - 1, 0))
+        return row
+
+    def append_step(self, pos, pl: int = 0) -> int:
+        return self.insert_step(len(self.program), pos, pl)
+
+    def update_step(self, row: int, pos=None, pl=None):
+        self.program.set_step(row, pos=pos, pl=pl)
+        self.dataChanged.emit(self.index(row, 1), self.index(row, self.columnCount() - 1))
+
+    def remove_step(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.program.remove(row)
+        self.endRemoveRows()
+        if row < len(self.program):
+            self.dataChanged.emit(self.index(row, 0), self.index(len(self.program) - 1, 0))
+
+    def set_program(self, program: Program):
+        self.beginResetModel()
+        self.program = program
+        self.endResetModel()
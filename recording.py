@@ -0,0 +1,136 @@
+import ctypes
+import threading
+import time
+
+import numpy as np
+
+import functions  # Ctypes functions
+from program import Program
+
+# -------------------------
+# Path recorder
+# -------------------------
+class PathRecorder(threading.Thread):
+    """
+    Samples the joint position at a fixed rate into a preallocated ring
+    buffer while the operator moves the arm by hand.
+    Each ring row is [t, J1..J7]; t is seconds since recording started.
+    The sample loop reuses the handle's pose buffer and copies it into the
+    ring with memmove, so nothing is allocated per sample on the NumPy or
+    ctypes side. When the ring is full the oldest samples are overwritten.
+    missed: ticks that started more than one period late
+    """
+
+    def __init__(self, robot_name: str, rate_hz: float = 250.0, max_seconds: float = 600.0):
+        super().__init__(name=f"recorder-{robot_name}", daemon=True)
+        self.robot_name = robot_name
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.capacity = int(rate_hz * max_seconds)
+        self.ring = np.zeros((self.capacity, 8), dtype=np.float64)
+        self.count = 0
+        self.missed = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        handle = functions.get_handle(self.robot_name)
+        src = handle.position
+        read = handle.read_position_into
+        memmove = ctypes.memmove
+        ring = self.ring
+        base = ring.ctypes.data
+        row_bytes = ring.strides[0]
+        pose_bytes = ctypes.sizeof(src)
+        capacity = self.capacity
+        period = self.period
+        wait = self._stop_event.wait
+        clock = time.perf_counter
+
+        start = clock()
+        next_tick = start
+        while not self._stop_event.is_set():
+            try:
+                read(src, coord=0)
+            except Exception as e:
+                self.last_error = e
+                break
+            slot = self.count % capacity
+            ring[slot, 0] = clock() - start
+            memmove(base + slot * row_bytes + 8, src, pose_bytes)
+            self.count += 1
+
+            next_tick += period
+            delay = next_tick - clock()
+            if delay > 0:
+                wait(delay)
+            elif delay < -period:
+                # fell behind by a full period: count it and resync
+                self.missed += int(-delay / period)
+                next_tick = clock()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def samples(self):
+        """(N, 8) copy of the recorded samples in time order."""
+        count = self.count
+        if count <= self.capacity:
+            return self.ring[:count].copy()
+        slot = count % self.capacity
+        return np.concatenate((self.ring[slot:], self.ring[:slot]))
+
+# -------------------------
+# Ramer-Douglas-Peucker decimation
+# -------------------------
+def decimate(points, tolerance: float):
+    """
+    Ramer-Douglas-Peucker simplification of an (N, D) path.
+    Returns the sorted indices of the points to keep; every dropped point
+    lies within tolerance (Euclidean, in the units of points) of the
+    polyline through the kept ones. Iterative, so long paths cannot hit
+    the recursion limit.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if n <= 2:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a = points[first]
+        seg = points[last] - a
+        rel = points[first + 1:last] - a
+        seg_len2 = float(seg @ seg)
+        if seg_len2 > 0.0:
+            t = np.clip(rel @ seg / seg_len2, 0.0, 1.0)
+            dist = np.linalg.norm(rel - t[:, None] * seg, axis=1)
+        else:
+            dist = np.linalg.norm(rel, axis=1)
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = first + 1 + i
+            keep[mid] = True
+            stack.append((first, mid))
+            stack.append((mid, last))
+    return np.flatnonzero(keep)
+
+def samples_to_program(samples, tolerance: float = 0.5, pl: int = 0) -> Program:
+    """
+    Turn recorded [t, J1..J7] samples into a waypoint Program.
+    tolerance: RDP tolerance in joint space (degrees)
+    pl: blend level given to every intermediate waypoint
+    """
+    joints = np.asarray(samples)[:, 1:8]
+    keep = decimate(joints, tolerance)
+    program = Program.from_array(joints[keep])
+    if len(program) > 2:
+        program.pl()[1:-1] = pl
+    return program
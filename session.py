@@ -0,0 +1,503 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import functions  # Ctypes functions
+import metrics
+from telemetry import TelemetryWorker
+from telemetry_log import TelemetryLogWriter
+from executor import ProgramExecutor
+from recording import PathRecorder
+from estop import EStopWorker
+from jog import JogController, StepJogger
+from supervisor import ConnectionSupervisor
+
+# -------------------------
+# Robot session
+# -------------------------
+class RobotSession:
+    """
+    Connection state and background workers of one robot.
+    The DLL API is keyed by robot name, so any number of sessions can be
+    open at once. Each session owns its telemetry poller, program executor
+    and path recorder, plus a single I/O worker thread (submit) for calls
+    that should not block the caller, so a slow controller only delays
+    its own session.
+    name, ip, port: controller address as passed to connect_robot
+    speed: program/jog speed in % (0..100)
+    """
+
+    def __init__(self, name: str, ip: str, port: str, speed: int = 30):
+        self.name = name
+        self.ip = ip
+        self.port = port
+        self.speed = speed
+        self.connected = False
+        self.servo_locked = True
+        self.telemetry = None
+        self.executor = None
+        self.recorder = None
+        self.estop = None
+        self.jog = None
+        self.stepper = None
+        self.supervisor = None
+        self.estop_engaged = False
+        self.link_up = False
+        self.connects = 0  # successful connects so far
+        self.connected_status = None  # get_connection_status value while connected
+        self.paused_step = None  # step a paused program resumes from
+        self.lost_jog = None     # axis that was jogging when the link dropped
+        self._program_args = None
+        self._telemetry_args = (100.0, None)
+        self.telemetry_log_error = None  # OSError that kept the telemetry log from opening
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"io-{name}")
+
+    def __repr__(self):
+        state = "connected" if self.connected else "disconnected"
+        return f"RobotSession({self.name!r}, {self.ip}:{self.port}, {state})"
+
+    @property
+    def channel(self):
+        """The robot's CommandChannel (queue depth and wait time in .stats)."""
+        return functions.get_channel(self.name)
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on this robot's I/O worker; returns a Future."""
+        return self._worker.submit(fn, *args, **kwargs)
+
+    # --- connection ---
+    def connect(self, telemetry_rate: float = 100.0, on_estop=None, on_jog_watchdog=None,
+                on_jog_error=None, log_dir: str = None, on_link=None, supervise: bool = True) -> int:
+        """
+        Connect, leave the servos locked (power off), start telemetry and
+        arm the e-stop and jog watchdog threads. on_estop(result),
+        on_jog_watchdog(axis) and on_jog_error(exception) are called from
+        worker threads. log_dir: record telemetry to disk there (see
+        start_telemetry). supervise: start a ConnectionSupervisor that
+        reconnects after a dropped link; on_link(state, detail) is its
+        callback. The "connected" get_connection_status value is the
+        backend's, or (DLL) the one read right after connect_robot.
+        If anything after connect_robot fails, what was started is torn
+        down again (disconnect()) and the exception is raised.
+        Returns the connect_robot status (0 = connected).
+        """
+        status = functions.connect_robot(self.ip, self.port, self.name)
+        if status != 0:
+            self.connected = False
+            metrics.CONNECTS.inc(self.name, "failed")
+            return status
+        self.connected = True
+        try:
+            self._start_workers(telemetry_rate, on_estop, on_jog_watchdog, on_jog_error,
+                                log_dir, on_link, supervise)
+        except Exception:
+            try:
+                self.disconnect()
+            except Exception:
+                self.connected = False
+            raise
+        return status
+
+    def _start_workers(self, telemetry_rate, on_estop, on_jog_watchdog, on_jog_error,
+                       log_dir, on_link, supervise):
+        """Everything connect() starts once connect_robot succeeded."""
+        self.connected_status = functions.CONNECTED_STATUS
+        if self.connected_status is None:
+            self.connected_status = functions.get_connection_status(self.name)
+        metrics.CONNECTS.inc(self.name, "ok")
+        if self.connects:
+            metrics.RECONNECTS.inc(self.name)
+        self.connects += 1
+        self.jog = JogController(self.name, on_watchdog=on_jog_watchdog)
+        self.jog.start()
+        self.estop = EStopWorker(self.name, after_stop=self._halt_workers, jog=self.jog,
+                                 on_done=on_estop)
+        self.estop.start()
+        self.stepper = StepJogger(self.name, latest=self.latest, running=self.running_state,
+                                  submit=self.submit, can_move=self.motion_allowed,
+                                  on_error=on_jog_error)
+        self.set_servo_lock(True)
+        self.start_telemetry(telemetry_rate, log_dir)
+        self.link_up = True
+        if supervise:
+            self.supervisor = ConnectionSupervisor(self, on_change=on_link)
+            self.supervisor.start()
+
+    def disconnect(self):
+        """
+        Stop all workers, power the servos off and disconnect.
+        Returns the exception raised while powering off, or None.
+        """
+        if self.supervisor is not None:
+            self.supervisor.close()
+            self.supervisor = None
+        self.clear_paused()
+        self.stop_recording()
+        self.stop_program()
+        self.stop_telemetry()
+        error = None
+        try:
+            if self.jog is not None:
+                self.jog.close()
+            self.set_servo_lock(True)
+        except Exception as e:
+            error = e
+        self.jog = None
+        self.stepper = None
+        if self.estop is not None:
+            self.estop.close()
+            self.estop = None
+        self.estop_engaged = False
+        self.lost_jog = None
+        functions.disconnect_robot(self.name)
+        self.connected = False
+        self.link_up = False
+        return error
+
+    # --- link supervision (called from the supervisor thread) ---
+    def _link_lost(self):
+        """
+        Pause the program and quiet the workers while the link is down:
+        the executor ends with on_paused, a jog in progress is cancelled
+        (its axis is kept for _relink to stop) and telemetry stops
+        polling a dead connection.
+        """
+        self.link_up = False
+        self.pause_program()
+        if self.jog is not None:
+            axis = self.jog.cancel()
+            if axis is not None:
+                self.lost_jog = axis
+        self.arm_moved()
+        self.stop_telemetry()
+
+    def _relink(self) -> int:
+        """
+        Reconnect, stop whatever the controller may still be doing (a jog
+        that was running when the link dropped, the last program move),
+        then restore the controller state the session had: jog coordinate
+        system and speed, and servo power (only if it was on and the
+        e-stop is not engaged). Returns the connect_robot status; raises
+        if stopping or restoring failed (the supervisor then retries).
+        """
+        status = functions.connect_robot(self.ip, self.port, self.name)
+        if status != 0:
+            metrics.CONNECTS.inc(self.name, "failed")
+            return status
+        metrics.CONNECTS.inc(self.name, "ok")
+        metrics.RECONNECTS.inc(self.name)
+        self.connects += 1
+        if self.lost_jog is not None:
+            functions.robot_stop_jogging.checked(self.lost_jog, self.name)
+            self.lost_jog = None
+        functions.job_stop.checked(self.name)
+        if self.jog is not None:
+            if self.jog.coord is not None:
+                functions.set_current_coord.checked(self.jog.coord, self.name)
+            if self.jog.speed is not None:
+                functions.set_speed.checked(self.jog.speed, self.name)
+        if self.servo_locked or self.estop_engaged:
+            self.set_servo_lock(True)
+        else:
+            functions.set_servo_state.checked(1, self.name)
+            functions.set_servo_poweron.checked(self.name)
+            if self.estop_engaged:  # pressed meanwhile: its power-off may have gone first
+                self.set_servo_lock(True)
+        self.start_telemetry(*self._telemetry_args)
+        self.link_up = True
+        return status
+
+    def link_alive(self) -> bool:
+        """One heartbeat: True if get_connection_status still reads connected."""
+        try:
+            return functions.get_connection_status(self.name) == self.connected_status
+        except Exception:
+            return False
+
+    def set_servo_lock(self, locked: bool):
+        """
+        Lock = servo state 0 + power off; unlock = servo state 1 + power on.
+        Unlocking is refused while the e-stop is engaged, including an
+        e-stop pressed while the power-on calls were being sent.
+        """
+        if locked:
+            functions.set_servo_state(0, self.name)
+            functions.set_servo_poweroff(self.name)
+            self.servo_locked = True
+            return
+        if self.estop_engaged:
+            raise RuntimeError(f"{self.name}: emergency stop engaged")
+        functions.set_servo_state(1, self.name)
+        functions.set_servo_poweron(self.name)
+        if self.estop_engaged:
+            # the e-stop's power-off may have gone out before our power-on
+            self.set_servo_lock(True)
+            raise RuntimeError(f"{self.name}: emergency stop engaged")
+        self.servo_locked = False
+
+    # --- emergency stop ---
+    def emergency_stop(self):
+        """
+        Stop motion and lock the servos. Returns at once: the stop calls run
+        on the e-stop thread (synchronously if the session is not connected).
+        """
+        self.estop_engaged = True
+        self.servo_locked = True
+        if self.estop is not None:
+            self.estop.trigger()
+        else:
+            functions.job_stop(self.name)
+            self.set_servo_lock(True)
+            self._halt_workers()
+
+    def _halt_workers(self):
+        """
+        Runs on the e-stop thread after the stop calls. Nothing can move in
+        between: the executor and step jogger check motion_allowed() before
+        every send, and estop_engaged is set before the trigger.
+        """
+        self.stop_program()
+        self.arm_moved()
+
+    def motion_allowed(self) -> bool:
+        """False while the e-stop is engaged (no jog or move may be sent)."""
+        return not self.estop_engaged
+
+    def arm_moved(self):
+        """Forget the step-jog target after the arm was moved by anything else."""
+        if self.stepper is not None:
+            self.stepper.invalidate()
+
+    def release_estop(self):
+        """Clear the e-stop and switch the servos back on."""
+        self.estop_engaged = False
+        try:
+            self.set_servo_lock(False)
+        except Exception:
+            self.estop_engaged = True
+            raise
+
+    # --- continuous jog ---
+    def start_jog(self, axis: int, direction: int, coord: int) -> int:
+        """
+        Start a continuous jog at the session speed (see
+        JogController.start_jog). Refused while the e-stop is engaged; a
+        jog started while an e-stop came in is stopped again at once.
+        """
+        if self.jog is None:
+            raise RuntimeError(f"{self.name}: not connected")
+        if self.estop_engaged:
+            raise RuntimeError(f"{self.name}: emergency stop engaged")
+        self.arm_moved()
+        status = self.jog.start_jog(axis, direction, coord, self.speed)
+        if self.estop_engaged:
+            self.jog.stop_jog()
+            raise RuntimeError(f"{self.name}: emergency stop engaged")
+        return status
+
+    def stop_jog(self) -> int:
+        """Stop the continuous jog, if any. Returns the DLL status (0 if idle)."""
+        return self.jog.stop_jog() if self.jog is not None else 0
+
+    def set_speed(self, speed: int) -> int:
+        """Clamp speed to 0..100 and apply it to a running program."""
+        self.speed = max(0, min(100, int(speed)))
+        if self.executor is not None:
+            self.executor.vel = self.speed
+        return self.speed
+
+    # --- telemetry ---
+    def start_telemetry(self, rate_hz: float = 100.0, log_dir: str = None):
+        """
+        Start polling; with log_dir, every sample is also written to a
+        rotating log in log_dir/<robot name> (read it with TelemetryLogReader).
+        If the log cannot be opened, telemetry runs without it and the
+        error is kept in telemetry_log_error.
+        """
+        self.stop_telemetry()
+        self._telemetry_args = (rate_hz, log_dir)
+        self.telemetry_log_error = None
+        log = None
+        if log_dir:
+            try:
+                log = TelemetryLogWriter(os.path.join(log_dir, self.name), self.name)
+            except OSError as e:
+                self.telemetry_log_error = e
+            else:
+                log.start()
+        self.telemetry = TelemetryWorker(self.name, rate_hz=rate_hz, log=log)
+        self.telemetry.start()
+
+    def stop_telemetry(self):
+        if self.telemetry is not None:
+            self.telemetry.stop()
+            if self.telemetry.log is not None:
+                self.telemetry.log.close()
+            self.telemetry = None
+
+    def latest(self):
+        """Newest telemetry sample (seq, stamp, joints, cart) or None."""
+        return self.telemetry.latest() if self.telemetry is not None else None
+
+    def running_state(self):
+        """Newest telemetry running state (state, perf_counter() of the read) or None."""
+        return self.telemetry.running_state() if self.telemetry is not None else None
+
+    def current_joints(self):
+        """Newest telemetry joints if available, otherwise read the DLL."""
+        sample = self.latest()
+        if sample is not None:
+            return sample[2]
+        return functions.get_current_position(self.name, coord=0)
+
+    # --- program execution ---
+    @property
+    def program_running(self) -> bool:
+        return self.executor is not None and self.executor.is_alive()
+
+    @property
+    def current_step(self) -> int:
+        return self.executor.current_step if self.executor is not None else -1
+
+    def run_program(self, steps, pl=0, acc: int = 30, dec: int = 30, lookahead: int = 1,
+                    on_step=None, on_finished=None, on_error=None, on_paused=None,
+                    start: int = 0) -> ProgramExecutor:
+        """
+        Start a ProgramExecutor for steps at the session speed.
+        on_paused(index) is called if the run is paused (see pause_program);
+        resume_program() then continues from that step.
+        """
+        if self.program_running:
+            raise RuntimeError(f"{self.name}: program already running")
+        self.arm_moved()
+        self.paused_step = None
+        self._program_args = dict(steps=steps, pl=pl, acc=acc, dec=dec, lookahead=lookahead,
+                                  on_step=on_step, on_finished=on_finished, on_error=on_error,
+                                  on_paused=on_paused)
+
+        def paused(index):
+            self.paused_step = index
+            if on_paused:
+                on_paused(index)
+
+        self.executor = ProgramExecutor(
+            self.name, steps, vel=self.speed, acc=acc, dec=dec, pl=pl,
+            lookahead=lookahead, start=start, can_move=self.motion_allowed,
+            link_alive=self.link_alive, on_step=on_step, on_finished=on_finished,
+            on_error=on_error, on_paused=paused)
+        self.executor.start()
+        return self.executor
+
+    def stop_program(self):
+        if self.executor is not None:
+            self.executor.stop()
+
+    def pause_program(self):
+        """Stop sending steps and remember where to resume."""
+        if self.executor is not None and self.executor.is_alive():
+            self.executor.pause()
+
+    def can_resume(self, steps=None) -> bool:
+        """True if a paused program can be resumed (and, if given, it is still steps)."""
+        if self.paused_step is None or self._program_args is None:
+            return False
+        return steps is None or np.array_equal(np.asarray(steps), np.asarray(self._program_args["steps"]))
+
+    def resume_program(self) -> ProgramExecutor:
+        """Continue the paused program from the step it was paused at."""
+        if not self.can_resume():
+            raise RuntimeError(f"{self.name}: no paused program")
+        return self.run_program(start=self.paused_step, **self._program_args)
+
+    def clear_paused(self):
+        self.paused_step = None
+        self._program_args = None
+
+    # --- path recording ---
+    def start_recording(self, rate_hz: float = 250.0) -> PathRecorder:
+        if self.recorder is not None:
+            raise RuntimeError(f"{self.name}: already recording")
+        self.arm_moved()
+        self.recorder = PathRecorder(self.name, rate_hz=rate_hz)
+        self.recorder.start()
+        return self.recorder
+
+    def stop_recording(self):
+        """Stop recording; returns the finished PathRecorder or None."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.stop()
+        return recorder
+
+    def close(self):
+        """Disconnect if needed and shut the I/O worker down."""
+        if self.connected:
+            self.disconnect()
+        else:
+            self.stop_recording()
+            self.stop_program()
+            self.stop_telemetry()
+        self._worker.shutdown(wait=False)
+
+# -------------------------
+# Session manager
+# -------------------------
+class SessionManager:
+    """
+    Registry of robot sessions keyed by robot name, for driving several
+    arms from one process. Fleet-wide operations run on every session's
+    own worker at once, so they take as long as the slowest robot rather
+    than the sum of all of them.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(list(self.sessions.values()))
+
+    def __contains__(self, name):
+        return name in self.sessions
+
+    def add(self, name: str, ip: str, port: str, speed: int = 30) -> RobotSession:
+        with self._lock:
+            if name in self.sessions:
+                raise ValueError(f"robot {name!r} already has a session")
+            session = self.sessions[name] = RobotSession(name, ip, port, speed)
+            return session
+
+    def get(self, name: str) -> RobotSession:
+        return self.sessions[name]
+
+    def remove(self, name: str):
+        with self._lock:
+            session = self.sessions.pop(name, None)
+        if session is not None:
+            session.close()
+
+    def broadcast(self, fn, *args) -> dict:
+        """
+        Call fn(session, *args) on every session's worker concurrently.
+        Returns {name: Future}.
+        """
+        return {s.name: s.submit(fn, s, *args) for s in self}
+
+    def connect_all(self, telemetry_rate: float = 100.0, timeout: float = None) -> dict:
+        """Connect every disconnected session; returns {name: status}."""
+        futures = {s.name: s.submit(s.connect, telemetry_rate) for s in self if not s.connected}
+        return {name: future.result(timeout) for name, future in futures.items()}
+
+    def stop_all(self):
+        """Stop every running program (no further steps are sent)."""
+        for session in self:
+            session.stop_program()
+
+    def close(self):
+        for name in list(self.sessions):
+            self.remove(name)
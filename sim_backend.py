@@ -0,0 +1,481 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from kinematics import ArmModel
+from preflight import DEFAULT_JOINT_ACC, DEFAULT_JOINT_SPEED
+
+# -------------------------
+# Simulated controller
+# -------------------------
+# Return codes used by the simulator (0 = success like the real DLL).
+# The negative codes are the simulator's own: nrc_lib.h documents no
+# error codes, so they say nothing about what libnrc_host returns.
+SIM_OK = 0
+SIM_NOT_CONNECTED = -1
+SIM_SERVO_NOT_READY = -2
+SIM_BAD_ARGUMENT = -3
+SIM_IN_ERROR = -4
+
+# code -> (kind, description); functions.py raises the NrcError subclass
+# of kind for these codes (see functions.ERROR_KINDS)
+STATUS_CODES = {
+    SIM_NOT_CONNECTED: ("not_connected", "not connected"),
+    SIM_SERVO_NOT_READY: ("servo_not_ready", "servo not ready"),
+    SIM_BAD_ARGUMENT: ("bad_argument", "bad argument"),
+    SIM_IN_ERROR: ("controller_fault", "controller in error"),
+}
+
+# servoStatus from nrc_lib.h
+SERVO_STOP = 0
+SERVO_OK = 1
+SERVO_ERROR = 2
+SERVO_RUNNING = 3
+
+RESET_POSITION = [0.0, 0.0, 90.0, 0.0, 90.0, 0.0, 0.0]
+HOME_POSITION = [0.0] * 7
+MAX_LINEAR_SPEED = 1000.0   # mm/s
+MAX_LINEAR_ACC = 2000.0     # mm/s^2
+MAX_E_SPEED = 180.0         # 7th axis, deg/s
+
+class BackendFunction:
+    """
+    Callable standing in for a ctypes function pointer, so code that sets
+    .argtypes/.restype on nrc_lib works unchanged with the simulator.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.argtypes = None
+        self.restype = None
+        self.__name__ = fn.__name__.lstrip("_")
+
+    def __call__(self, *args):
+        return self.fn(*args)
+
+def _trapezoid(dist, v, a, d):
+    """
+    Trapezoidal profile over dist with max speed v, acceleration a and
+    deceleration d. Returns (peak speed, accel time, cruise time, decel time).
+    """
+    if dist <= 0:
+        return 0.0, 0.0, 0.0, 0.0
+    if dist >= v * v / (2 * a) + v * v / (2 * d):
+        vp = v
+    else:
+        vp = math.sqrt(2 * dist * a * d / (a + d))
+    tc = max(0.0, (dist - vp * vp / (2 * a) - vp * vp / (2 * d)) / vp)
+    return vp, vp / a, tc, vp / d
+
+class _Motion:
+    """
+    Move from start to target in joint space; all joints follow one 1-D
+    trapezoidal profile of length dist, so they start and stop together.
+    """
+
+    def __init__(self, start, target, t0, dist, v, a, d):
+        self.start = np.array(start, dtype=np.float64)
+        self.delta = np.array(target, dtype=np.float64) - self.start
+        self.t0 = t0
+        self.dist, self.a, self.d = dist, a, d
+        self.vp, self.ta, self.tc, self.td = _trapezoid(dist, v, a, d)
+        self.duration = self.ta + self.tc + self.td
+
+    @classmethod
+    def joint_move(cls, start, target, v, a, d, t0):
+        """Synchronised move timed on the slowest joint (v, a, d per joint)."""
+        dist = np.abs(np.asarray(target, dtype=np.float64) - np.asarray(start, dtype=np.float64))
+        times = [sum(_trapezoid(dist[k], v[k], a[k], d[k])[1:]) for k in range(len(dist))]
+        k = int(np.argmax(times))
+        return cls(start, target, t0, float(dist[k]), v[k], a[k], d[k])
+
+    def progress(self, now) -> float:
+        """Fraction of the move done at time now (0..1)."""
+        t = now - self.t0
+        if self.dist <= 0 or t >= self.duration:
+            return 1.0
+        if t <= 0:
+            return 0.0
+        if t < self.ta:
+            s = 0.5 * self.a * t * t
+        elif t < self.ta + self.tc:
+            s = 0.5 * self.vp * self.ta + self.vp * (t - self.ta)
+        else:
+            r = self.duration - t
+            s = self.dist - 0.5 * self.d * r * r
+        return min(1.0, s / self.dist)
+
+    def position(self, now):
+        return self.start + self.delta * self.progress(now)
+
+    def done(self, now) -> bool:
+        return now - self.t0 >= self.duration
+
+class _SimRobot:
+    """State of one simulated arm."""
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.connected = False
+        self.servo = SERVO_STOP
+        self.speed = 100
+        self.coord = 0
+        self.mode = 0
+        self.joints = np.array(RESET_POSITION, dtype=np.float64)
+        self.motion = None
+        self.jog = None  # (axis index 0..6, direction +1/-1, coord, t0, start joints)
+
+    # --- state integration ---
+    def update(self, now):
+        """Advance motion/jog to time now and return the joint position."""
+        if self.motion is not None:
+            self.joints = self.motion.position(now)
+            if self.motion.done(now):
+                self.motion = None
+        elif self.jog is not None:
+            self.joints = self._jog_position(now)
+        return self.joints
+
+    def _jog_position(self, now):
+        axis, direction, coord, t0, start = self.jog
+        speed = self.speed / 100.0
+        dt = now - t0
+        if coord == 0 or axis == 6:
+            pos = start.copy()
+            limit = MAX_E_SPEED if axis == 6 else DEFAULT_JOINT_SPEED[axis]
+            pos[axis] += direction * limit * speed * 0.2 * dt  # jog at 20 % of max
+            if axis < 6:
+                pos[axis] = min(max(pos[axis], self.model.lower[axis]), self.model.upper[axis])
+            return pos
+        # Cartesian jog: move the start pose along the axis, solve IK from the last joints
+        pose = self.model.fk_pose(start[:6])
+        if axis < 3:
+            pose[axis] += direction * MAX_LINEAR_SPEED * speed * 0.1 * dt
+        else:
+            pose[axis] += direction * 45.0 * speed * dt
+        q, ok = self.model.ik(pose, self.joints[:6])
+        if not ok:
+            return self.joints  # singular/unreachable: stay put
+        pos = self.joints.copy()
+        pos[:6] = q
+        return pos
+
+    def running(self, now) -> bool:
+        self.update(now)
+        return self.motion is not None or self.jog is not None
+
+class SimulatedNrcLib:
+    """
+    Pure-Python stand-in for libnrc_host implementing every export in
+    nrc_lib.h with the same C-style signatures (bytes robot names, ctypes
+    double arrays, int return codes). Motions follow synchronised
+    trapezoidal profiles scaled by vel/acc/dec and the set_speed override,
+    so program cycle times are realistic; Cartesian positions come from
+    kinematics.ArmModel.
+    call_latency: seconds added to every call to emulate the DLL round trip
+    time_scale: simulated seconds per wall-clock second; >1 runs motions
+                faster than real time (e.g. to benchmark long programs)
+    """
+
+    EXPORTS = [
+        "connect_robot", "disconnect_robot", "get_connection_status", "clear_error",
+        "set_servo_state", "get_servo_state", "set_servo_poweron", "set_servo_poweroff",
+        "get_current_position", "get_robot_running_state", "set_speed", "get_speed",
+        "set_current_coord", "get_current_coord", "set_current_mode", "get_current_mode",
+        "robot_start_jogging", "robot_stop_jogging", "robot_go_to_reset_position",
+        "robot_go_home", "robot_movej", "robot_movel", "job_stop",
+    ]
+    STATUS_CODES = STATUS_CODES
+    CONNECTED_STATUS = SIM_OK  # get_connection_status while connected
+
+    def __init__(self, call_latency: float = 0.0, model: ArmModel = None, time_scale: float = 1.0):
+        self.call_latency = call_latency
+        self.time_scale = time_scale
+        self.model = model if model is not None else ArmModel()
+        self.robots = {}
+        self._lock = threading.Lock()
+        for name in self.EXPORTS:
+            setattr(self, name, BackendFunction(getattr(self, "_" + name)))
+
+    # --- helpers ---
+    def _robot(self, name: bytes) -> _SimRobot:
+        with self._lock:
+            robot = self.robots.get(name)
+            if robot is None:
+                robot = self.robots[name] = _SimRobot(self.model)
+            return robot
+
+    def _clock(self) -> float:
+        return time.monotonic() * self.time_scale
+
+    def _delay(self):
+        if self.call_latency > 0:
+            time.sleep(self.call_latency)
+
+    def _start_motion(self, robot, target, v, a, d):
+        now = self._clock()
+        start = robot.update(now)
+        robot.jog = None
+        robot.motion = _Motion.joint_move(start, target, v, a, d, now)
+
+    def _check_motion(self, robot) -> int:
+        if not robot.connected:
+            return SIM_NOT_CONNECTED
+        if robot.servo == SERVO_ERROR:
+            return SIM_IN_ERROR
+        if robot.servo != SERVO_RUNNING:
+            return SIM_SERVO_NOT_READY
+        return SIM_OK
+
+    def _move_joints(self, robot, target, vel, acc, dec):
+        scale = robot.speed / 100.0
+        v = np.append(DEFAULT_JOINT_SPEED, MAX_E_SPEED) * (vel / 100.0) * scale
+        a = np.append(DEFAULT_JOINT_ACC, 2 * MAX_E_SPEED) * (acc / 100.0)
+        d = np.append(DEFAULT_JOINT_ACC, 2 * MAX_E_SPEED) * (dec / 100.0)
+        self._start_motion(robot, target, v, a, d)
+
+    def _cartesian_target(self, robot, pos):
+        q, ok = self.model.ik(list(pos)[:6], robot.joints[:6])
+        if not ok:
+            return None
+        target = robot.joints.copy()
+        target[:6] = q
+        target[6] = pos[6]
+        return target
+
+    # --- connection ---
+    def _connect_robot(self, ip, port, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            robot.connected = True
+        return SIM_OK
+
+    def _disconnect_robot(self, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            robot.connected = False
+            robot.motion = robot.jog = None
+            robot.servo = SERVO_STOP
+        return SIM_OK
+
+    def _get_connection_status(self, name):
+        self._delay()
+        return SIM_OK if self._robot(name).connected else SIM_NOT_CONNECTED
+
+    def _clear_error(self, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            if not robot.connected:
+                return SIM_NOT_CONNECTED
+            if robot.servo == SERVO_ERROR:
+                robot.servo = SERVO_STOP
+        return SIM_OK
+
+    # --- servo ---
+    def _set_servo_state(self, state, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            if not robot.connected:
+                return SIM_NOT_CONNECTED
+            if state not in (SERVO_STOP, SERVO_OK):
+                return SIM_BAD_ARGUMENT
+            if robot.servo == SERVO_ERROR:
+                return SIM_IN_ERROR
+            if state == SERVO_STOP:
+                robot.update(self._clock())
+                robot.motion = robot.jog = None
+            robot.servo = state
+        return SIM_OK
+
+    def _get_servo_state(self, name):
+        self._delay()
+        robot = self._robot(name)
+        return robot.servo if robot.connected else SIM_NOT_CONNECTED
+
+    def _set_servo_poweron(self, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            if not robot.connected:
+                return SIM_NOT_CONNECTED
+            if robot.servo != SERVO_OK:
+                return SIM_SERVO_NOT_READY
+            robot.servo = SERVO_RUNNING
+        return SIM_OK
+
+    def _set_servo_poweroff(self, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            if not robot.connected:
+                return SIM_NOT_CONNECTED
+            robot.update(self._clock())
+            robot.motion = robot.jog = None
+            if robot.servo == SERVO_RUNNING:
+                robot.servo = SERVO_OK
+        return SIM_OK
+
+    # --- state ---
+    def _get_current_position(self, pos, coord, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            if not robot.connected:
+                return SIM_NOT_CONNECTED
+            joints = robot.update(self._clock())
+            if coord == 0:
+                values = joints
+            else:
+                values = np.append(self.model.fk_pose(joints[:6]), joints[6])
+        for i in range(7):
+            pos[i] = float(values[i])
+        return SIM_OK
+
+    def _get_robot_running_state(self, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            if not robot.connected:
+                return SIM_NOT_CONNECTED
+            return 1 if robot.running(self._clock()) else 0
+
+    def _set_speed(self, speed, name):
+        self._delay()
+        robot = self._robot(name)
+        if not (0 < speed <= 100):
+            return SIM_BAD_ARGUMENT
+        with robot.lock:
+            robot.speed = speed
+        return SIM_OK
+
+    def _get_speed(self, name):
+        self._delay()
+        return self._robot(name).speed
+
+    def _set_current_coord(self, coord, name):
+        self._delay()
+        if coord not in (0, 1, 2, 3):
+            return SIM_BAD_ARGUMENT
+        self._robot(name).coord = coord
+        return SIM_OK
+
+    def _get_current_coord(self, name):
+        self._delay()
+        return self._robot(name).coord
+
+    def _set_current_mode(self, mode, name):
+        self._delay()
+        if mode not in (0, 1, 2):
+            return SIM_BAD_ARGUMENT
+        self._robot(name).mode = mode
+        return SIM_OK
+
+    def _get_current_mode(self, name):
+        self._delay()
+        return self._robot(name).mode
+
+    # --- jogging ---
+    def _robot_start_jogging(self, axis, direction, name):
+        """axis: 1..7 (joint or Cartesian axis in the current coord), direction: True = +"""
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            status = self._check_motion(robot)
+            if status != SIM_OK:
+                return status
+            if not (1 <= axis <= 7):
+                return SIM_BAD_ARGUMENT
+            now = self._clock()
+            start = robot.update(now).copy()
+            robot.motion = None
+            robot.jog = (axis - 1, 1 if direction else -1, robot.coord, now, start)
+        return SIM_OK
+
+    def _robot_stop_jogging(self, axis, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            robot.update(self._clock())
+            robot.jog = None
+        return SIM_OK
+
+    # --- motion ---
+    def _robot_go_to_reset_position(self, name):
+        return self._go_to(name, RESET_POSITION)
+
+    def _robot_go_home(self, name):
+        return self._go_to(name, HOME_POSITION)
+
+    def _go_to(self, name, target):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            status = self._check_motion(robot)
+            if status != SIM_OK:
+                return status
+            self._move_joints(robot, target, 30, 30, 30)
+        return SIM_OK
+
+    def _robot_movej(self, pos, vel, coord, acc, dec, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            status = self._check_motion(robot)
+            if status != SIM_OK:
+                return status
+            if not (0 < vel <= 100) or acc <= 0 or dec <= 0:
+                return SIM_BAD_ARGUMENT
+            target = list(pos)[:7] if coord == 0 else self._cartesian_target(robot, pos)
+            if target is None:
+                return SIM_BAD_ARGUMENT
+            self._move_joints(robot, target, vel, acc, dec)
+        return SIM_OK
+
+    def _robot_movel(self, pos, vel, coord, acc, dec, name):
+        """
+        Linear move. vel is the TCP speed in mm/s. The path is interpolated
+        in joint space; its duration is timed on the straight-line TCP
+        distance, which is close enough for cycle-time work.
+        """
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            status = self._check_motion(robot)
+            if status != SIM_OK:
+                return status
+            if vel <= 0 or acc <= 0 or dec <= 0:
+                return SIM_BAD_ARGUMENT
+            now = self._clock()
+            joints = robot.update(now)
+            target = list(pos)[:7] if coord == 0 else self._cartesian_target(robot, pos)
+            if target is None:
+                return SIM_BAD_ARGUMENT
+            p0 = self.model.fk_position(joints[:6])[0]
+            p1 = self.model.fk_position(np.asarray(target[:6]))[0]
+            length = float(np.linalg.norm(p1 - p0))
+            v = min(vel, MAX_LINEAR_SPEED) * robot.speed / 100.0
+            a = MAX_LINEAR_ACC * acc / 100.0
+            d = MAX_LINEAR_ACC * dec / 100.0
+            if length <= 0:
+                # pure reorientation: fall back to a joint move to the same target
+                self._move_joints(robot, target, 30, acc, dec)
+            else:
+                # time the move on the straight TCP path
+                robot.jog = None
+                robot.motion = _Motion(joints, target, now, length, v, a, d)
+        return SIM_OK
+
+    def _job_stop(self, name):
+        self._delay()
+        robot = self._robot(name)
+        with robot.lock:
+            robot.update(self._clock())
+            robot.motion = robot.jog = None
+        return SIM_OK
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import random
+
+from sim_backend import SimulatedNrcLib
+
+# -------------------------
+# Wire protocol
+# -------------------------
+# One JSON object per line in each direction.
+#   request:  {"id": 7, "fn": "robot_movej", "args": [[...7 floats], 30, 0, 30, 30, "MyRobot"]}
+#   response: {"id": 7, "ret": 0}
+# get_current_position takes args [coord, robot_name] and the response
+# carries the pose as "pos": [...7 floats]. Robot names are sent as text.
+
+def handle_request(lib: SimulatedNrcLib, request: dict) -> dict:
+    """Run one request against the simulator and build the response."""
+    fn = request.get("fn")
+    args = request.get("args", [])
+    if fn not in SimulatedNrcLib.EXPORTS:
+        return {"id": request.get("id"), "error": f"unknown function {fn}"}
+    args = [a.encode("utf-8") if isinstance(a, str) else a for a in args]
+    if fn == "get_current_position":
+        pos = [0.0] * 7
+        ret = lib.get_current_position(pos, *args)
+        return {"id": request.get("id"), "ret": ret, "pos": pos}
+    return {"id": request.get("id"), "ret": getattr(lib, fn)(*args)}
+
+# -------------------------
+# Stand-in controller server
+# -------------------------
+class StandInController:
+    """
+    asyncio TCP server emulating the controller on host:port, backed by
+    SimulatedNrcLib, with configurable network behaviour:
+    delay: fixed one-way delay added before each response (seconds)
+    jitter: uniform random extra delay 0..jitter (seconds)
+    loss: probability that a response is dropped (the client times out)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6001,
+                 delay: float = 0.0, jitter: float = 0.0, loss: float = 0.0,
+                 lib: SimulatedNrcLib = None, seed: int = None):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.jitter = jitter
+        self.loss = loss
+        self.lib = lib if lib is not None else SimulatedNrcLib()
+        self.random = random.Random(seed)
+        self.server = None
+        self.requests = 0
+        self.dropped = 0
+        self.clients = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        sock = self.server.sockets[0].getsockname()
+        self.port = sock[1]  # resolves port 0 to the real one
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        for writer in list(self.clients):
+            writer.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def drop_clients(self):
+        """Close every client connection, e.g. to test reconnect logic."""
+        for writer in list(self.clients):
+            writer.close()
+
+    async def _serve_client(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.requests += 1
+                try:
+                    response = handle_request(self.lib, json.loads(line))
+                except Exception as e:
+                    response = {"id": None, "error": str(e)}
+                wait = self.delay + self.random.uniform(0.0, self.jitter)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if self.loss > 0 and self.random.random() < self.loss:
+                    self.dropped += 1
+                    continue
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in controller for latency testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6001)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="fixed response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra delay, 0..jitter")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability of dropping a response")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    controller = StandInController(args.host, args.port, args.delay_ms / 1000.0,
+                                   args.jitter_ms / 1000.0, args.loss, seed=args.seed)
+    print(f"Stand-in controller on {args.host}:{args.port} "
+          f"(delay {args.delay_ms} ms, jitter {args.jitter_ms} ms, loss {args.loss:.1%})")
+    try:
+        asyncio.run(controller.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
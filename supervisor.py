@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+
+import functions  # Ctypes functions
+
+# -------------------------
+# Connection supervisor
+# -------------------------
+LINK_UP = "up"
+LINK_LOST = "lost"
+LINK_RECONNECTING = "reconnecting"
+LINK_RESTORED = "restored"
+
+class ConnectionSupervisor(threading.Thread):
+    """
+    Heartbeats one robot with get_connection_status every interval
+    seconds; a beat succeeds when it returns connected_status (default:
+    the session's, learned at connect). After misses failed heartbeats
+    in a row the link is declared
+    lost, so a drop is noticed within about misses * interval (plus the
+    backend call timeout). The session is then told to pause its program
+    and workers, and connect_robot is retried with exponential backoff
+    (backoff, doubling up to max_backoff, +-jitter) until it succeeds and
+    the session has restored its state.
+    session: the RobotSession (uses _link_lost() and _relink())
+    on_change(state, detail): called from this thread; state is one of
+        LINK_LOST (detail = last status or exception),
+        LINK_RECONNECTING (detail = (attempt, seconds until the next try)),
+        LINK_RESTORED (detail = seconds the link was down)
+    """
+
+    def __init__(self, session, interval: float = 0.2, misses: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 10.0, jitter: float = 0.1, on_change=None,
+                 connected_status: int = None):
+        super().__init__(name=f"supervisor-{session.name}", daemon=True)
+        if connected_status is None:
+            connected_status = session.connected_status
+        self.session = session
+        self.connected_status = connected_status
+        self.interval = interval
+        self.misses = misses
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.on_change = on_change
+        self.state = LINK_UP
+        self.heartbeats = 0
+        self.losses = 0
+        self.reconnects = 0
+        self.last_error = None
+        self._closing = threading.Event()
+
+    def close(self, timeout: float = 2.0):
+        self._closing.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def _notify(self, state, detail=None):
+        self.state = state
+        if self.on_change:
+            self.on_change(state, detail)
+
+    def _heartbeat(self):
+        """Returns None if the controller answered, else the status/exception."""
+        self.heartbeats += 1
+        try:
+            status = functions.get_connection_status(self.session.name)
+        except Exception as e:
+            return e
+        return None if status == self.connected_status else status
+
+    def run(self):
+        wait = self._closing.wait
+        missed = 0
+        while not wait(self.interval):
+            failure = self._heartbeat()
+            if failure is None:
+                missed = 0
+                continue
+            missed += 1
+            self.last_error = failure
+            if missed < self.misses:
+                continue
+
+            # --- Link lost ---
+            down_since = time.perf_counter()
+            self.losses += 1
+            self.session._link_lost()
+            self._notify(LINK_LOST, failure)
+            if not self._reconnect():
+                return  # closed while reconnecting
+            missed = 0
+            self._notify(LINK_RESTORED, time.perf_counter() - down_since)
+
+    def _reconnect(self) -> bool:
+        delay = self.backoff
+        attempt = 0
+        while not self._closing.is_set():
+            attempt += 1
+            try:
+                status = self.session._relink()
+            except Exception as e:
+                status = e
+            if status == 0:
+                self.reconnects += 1
+                self.state = LINK_UP
+                return True
+            self.last_error = status
+            pause = delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._notify(LINK_RECONNECTING, (attempt, pause))
+            if self._closing.wait(pause):
+                break
+            delay = min(delay * 2, self.max_backoff)
+        return False
@@ -0,0 +1,126 @@
+import json
+import os
+import socket
+import threading
+
+from sim_backend import SimulatedNrcLib, BackendFunction, STATUS_CODES as SIM_STATUS_CODES
+
+# Return codes produced by the client itself (controller codes pass through)
+TCP_NOT_CONNECTED = -1
+TCP_TIMEOUT = -5
+
+# sim_server.py runs the simulator, so its codes apply, plus the client's own
+STATUS_CODES = dict(SIM_STATUS_CODES)
+STATUS_CODES[TCP_NOT_CONNECTED] = ("not_connected", "not connected")
+STATUS_CODES[TCP_TIMEOUT] = ("timeout", "timeout")
+
+# -------------------------
+# TCP client backend
+# -------------------------
+class RemoteNrcLib:
+    """
+    nrc_lib stand-in that forwards every call over TCP to a controller
+    speaking the JSON-lines protocol of sim_server.py.
+    connect_robot(ip, port, name) opens the socket to ip:port; after a
+    socket error or timeout the connection is dropped and re-opened on the
+    next call, so reconnect logic can be exercised against the server.
+    timeout: seconds to wait for each response
+    """
+
+    STATUS_CODES = STATUS_CODES
+    CONNECTED_STATUS = 0  # get_connection_status while connected (relayed from the simulator)
+
+    def __init__(self, host: str = None, port: int = None, timeout: float = 0.5):
+        self.host = host or os.environ.get("COBOT_TCP_HOST", "127.0.0.1")
+        self.port = int(port or os.environ.get("COBOT_TCP_PORT", "6001"))
+        self.timeout = timeout
+        self.timeouts = 0   # responses not received in time
+        self.connects = 0   # sockets opened (first connect + reconnects)
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+        self._lock = threading.Lock()  # one request/response in flight at a time
+        for name in SimulatedNrcLib.EXPORTS:
+            setattr(self, name, BackendFunction(self._make_call(name)))
+
+    # --- socket handling ---
+    def _open(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._file = sock.makefile("rb")
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._file = None
+
+    def _request(self, fn: str, args: list) -> dict:
+        with self._lock:
+            if self._sock is None:
+                try:
+                    self._open()
+                    self.connects += 1
+                except OSError:
+                    return {"ret": TCP_NOT_CONNECTED}
+            self._next_id += 1
+            request_id = self._next_id
+            line = json.dumps({"id": request_id, "fn": fn, "args": args}).encode("utf-8") + b"\n"
+            try:
+                self._sock.sendall(line)
+                while True:
+                    reply = self._file.readline()
+                    if not reply:
+                        raise ConnectionError("controller closed the connection")
+                    response = json.loads(reply)
+                    # late answers to requests that already timed out are skipped
+                    if response.get("id") == request_id:
+                        break
+            except socket.timeout:
+                self.timeouts += 1
+                self._close()  # stream state is unknown after a timeout
+                return {"ret": TCP_TIMEOUT}
+            except (OSError, ValueError):
+                self._close()
+                return {"ret": TCP_NOT_CONNECTED}
+            if "error" in response:
+                raise Exception(f"{fn}: {response['error']}")
+            return response
+
+    # --- call marshalling ---
+    def _make_call(self, fn: str):
+        if fn == "connect_robot":
+            def call(ip, port, robot_name):
+                with self._lock:
+                    self._close()
+                    self.host = ip.decode("utf-8")
+                    self.port = int(port.decode("utf-8"))
+                return self._request(fn, [self.host, str(self.port), robot_name.decode("utf-8")])["ret"]
+        elif fn == "get_current_position":
+            def call(pos, coord, robot_name):
+                response = self._request(fn, [coord, robot_name.decode("utf-8")])
+                if response["ret"] == 0:
+                    for i, value in enumerate(response["pos"]):
+                        pos[i] = value
+                return response["ret"]
+        else:
+            def call(*args):
+                wire = []
+                for a in args:
+                    if isinstance(a, bytes):
+                        wire.append(a.decode("utf-8"))
+                    elif isinstance(a, (int, float, bool)):
+                        wire.append(a)
+                    else:
+                        wire.append([float(v) for v in a])  # double* argument
+                return self._request(fn, wire)["ret"]
+        call.__name__ = fn
+        return call
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import functions  # Ctypes functions
+
+# -------------------------
+# Telemetry worker
+# -------------------------
+class TelemetryWorker(threading.Thread):
+    """
+    Polls joint (coord=0) and Cartesian (coord=1) pose in the background.
+    The latest sample lives in a double-buffered slot guarded by a sequence
+    counter, so the GUI can read it at display rate without ever blocking
+    on the DLL or on the polling thread. The running state is read at
+    state_rate_hz (see running_state).
+    log: optional TelemetryLogWriter; every sample is appended to it
+         together with the running state, servo state and speed, which
+         are read at state_rate_hz (the last values are repeated between reads)
+    """
+
+    def __init__(self, robot_name: str, rate_hz: float = 100.0, log=None, state_rate_hz: float = 20.0):
+        super().__init__(name=f"telemetry-{robot_name}", daemon=True)
+        self.robot_name = robot_name
+        self.period = 1.0 / rate_hz
+        self.last_error = None
+        self.log = log
+        self.state_every = max(1, round(rate_hz / state_rate_hz))
+        self.state = (0, 0, 0)  # running state, servo state, speed (when logging)
+        self._running = None    # (running state, perf_counter() when the read was issued)
+
+        # Two preallocated joint + Cartesian snapshots, filled in place by the DLL
+        self._slots = [functions.PoseSnapshot((0, 1)), functions.PoseSnapshot((0, 1))]
+        self._front = 0
+        self._seq = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        handle = functions.get_handle(self.robot_name)
+        log = self.log
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                # Fill the back buffer, then publish it in one index swap
+                back = 1 - self._front
+                slot = self._slots[back]
+                handle.read_snapshot(slot)
+                self._front = back
+                self._seq += 1
+                self.last_error = None
+                if (self._seq - 1) % self.state_every == 0:
+                    if log is not None:
+                        self.state = self._read_state()
+                    else:
+                        self._read_running()
+                if log is not None:
+                    log.append(slot.stamp, slot.data, *self.state)
+            except Exception as e:
+                self.last_error = e
+
+            # Fixed-rate scheduling; skip ticks instead of bursting if we fall behind
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def _read_running(self) -> int:
+        issued = time.perf_counter()
+        running = functions.get_robot_running_state(self.robot_name)
+        self._running = (running, issued)
+        return running
+
+    def _read_state(self):
+        name = self.robot_name
+        return (self._read_running(), functions.get_servo_state(name), functions.get_speed(name))
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def running_state(self):
+        """
+        Returns (running state, perf_counter() time the read was issued)
+        of the newest read, or None before the first one.
+        """
+        return self._running
+
+    @property
+    def seq(self) -> int:
+        """Number of samples published so far."""
+        return self._seq
+
+    def latest(self):
+        """
+        Returns (seq, timestamp, joints, cart) for the newest sample,
+        or None if nothing has been polled yet.
+        joints, cart: lists of 7 floats
+        """
+        while True:
+            seq = self._seq
+            if seq == 0:
+                return None
+            slot = self._slots[self._front]
+            stamp = slot.stamp
+            data = slot.data.tolist()
+            # The front slot is only rewritten after the next publish;
+            # if the counter moved while copying, retry with the new front.
+            if seq == self._seq:
+                return seq, stamp, data[0:7], data[7:14]
@@ -0,0 +1,295 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# -------------------------
+# File format
+# -------------------------
+# A log file is a header followed by self-contained chunks, appended only:
+#   header: MAGIC, u32 length, JSON {"robot", "version", "columns": [[name, dtype, width], ...]}
+#   chunk:  CHUNK_MAGIC, CHUNK_HEADER (rows, payload bytes, crc32, t_first, t_last), payload
+# The payload is the zlib-compressed columns of the chunk, one after the
+# other (all t values, then all joints, ...). A reader finds a time range
+# from the chunk headers alone and only decompresses the chunks it needs;
+# a chunk cut short by a crash is ignored.
+MAGIC = b"CBTLOG1\n"
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<IIIdd")
+FILE_SUFFIX = ".cbtl"
+
+# name, dtype, values per sample
+COLUMNS = (
+    ("t", "<f8", 1),        # time.time() of the pose read
+    ("joints", "<f8", 7),   # coord 0
+    ("cart", "<f8", 7),     # coord 1
+    ("running", "<i2", 1),  # get_robot_running_state
+    ("servo", "<i2", 1),    # get_servo_state
+    ("speed", "<i2", 1),    # get_speed
+)
+
+class _Chunk:
+    """Preallocated column buffers for up to rows samples."""
+
+    __slots__ = ("columns", "rows", "count", "opened")
+
+    def __init__(self, rows: int):
+        self.columns = {name: np.zeros((rows, width), dtype=dtype) for name, dtype, width in COLUMNS}
+        self.rows = rows
+        self.count = 0
+        self.opened = 0.0
+
+    def payload(self) -> bytes:
+        n = self.count
+        return b"".join(self.columns[name][:n].tobytes() for name, _, _ in COLUMNS)
+
+# -------------------------
+# Writer
+# -------------------------
+class TelemetryLogWriter(threading.Thread):
+    """
+    Persistent telemetry log for one robot, for post-mortem analysis.
+    append() copies one sample into the current preallocated chunk and
+    returns; full chunks (or chunks older than flush_interval) are handed
+    to this thread, which compresses and writes them. Files are rotated
+    by size and age and only the newest max_files are kept.
+    directory: where <robot>-<YYYYmmdd-HHMMSS>.cbtl files are written
+    chunk_rows: samples per chunk (1000 = 4 s at 250 Hz)
+    flush_interval: a partly filled chunk is written after this many seconds
+    dropped: samples lost because the disk could not keep up
+    """
+
+    def __init__(self, directory: str, robot_name: str, chunk_rows: int = 1000,
+                 flush_interval: float = 2.0, max_bytes: int = 64_000_000,
+                 max_seconds: float = 3600.0, max_files: int = 24, compression: int = 3,
+                 buffers: int = 4):
+        super().__init__(name=f"telemetry-log-{robot_name}", daemon=True)
+        self.directory = directory
+        self.robot_name = robot_name
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_files = max_files
+        self.compression = compression
+        self.samples = 0
+        self.chunks = 0
+        self.dropped = 0
+        self.last_error = None
+        self.path = None
+        self._file = None
+        self._file_opened = 0.0
+        self._free = queue.SimpleQueue()
+        for _ in range(buffers - 1):
+            self._free.put(_Chunk(chunk_rows))
+        self._current = _Chunk(chunk_rows)
+        self._full = queue.SimpleQueue()
+        self._closing = False
+        os.makedirs(directory, exist_ok=True)
+
+    # --- producer side (telemetry thread) ---
+    def append(self, stamp: float, pose, running: int, servo: int, speed: int):
+        """
+        Add one sample. pose: the 14 floats of a joint + Cartesian
+        PoseSnapshot.data (or any sequence of joints followed by cart).
+        """
+        if self._closing:
+            return
+        chunk = self._current
+        if chunk is None:
+            chunk = self._take_free()
+            if chunk is None:
+                self.dropped += 1
+                return
+        i = chunk.count
+        if i == 0:
+            chunk.opened = time.monotonic()
+        columns = chunk.columns
+        columns["t"][i, 0] = stamp
+        columns["joints"][i] = pose[0:7]
+        columns["cart"][i] = pose[7:14]
+        columns["running"][i, 0] = running
+        columns["servo"][i, 0] = servo
+        columns["speed"][i, 0] = speed
+        chunk.count = i + 1
+        self.samples += 1
+        if chunk.count == chunk.rows or time.monotonic() - chunk.opened >= self.flush_interval:
+            self._full.put(chunk)
+            self._current = None
+            self._take_free()
+
+    def _take_free(self):
+        try:
+            chunk = self._free.get_nowait()
+        except queue.Empty:
+            return None  # writer is behind: drop samples until a buffer comes back
+        chunk.count = 0
+        self._current = chunk
+        return chunk
+
+    def close(self, timeout: float = 5.0):
+        """Write what is buffered, close the file and stop the thread."""
+        self._closing = True
+        chunk, self._current = self._current, None
+        if chunk is not None and chunk.count:
+            self._full.put(chunk)
+        self._full.put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    # --- writer thread ---
+    def run(self):
+        try:
+            while True:
+                chunk = self._full.get()
+                if chunk is None:
+                    break
+                try:
+                    self._write_chunk(chunk)
+                except OSError as e:
+                    self.last_error = e
+                    self.dropped += chunk.count
+                self._free.put(chunk)
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write_chunk(self, chunk):
+        if chunk.count == 0:
+            return
+        payload = zlib.compress(chunk.payload(), self.compression)
+        t = chunk.columns["t"]
+        header = CHUNK_HEADER.pack(chunk.count, len(payload), zlib.crc32(payload),
+                                   t[0, 0], t[chunk.count - 1, 0])
+        f = self._open_file()
+        f.write(CHUNK_MAGIC + header + payload)
+        f.flush()
+        self.chunks += 1
+
+    def _open_file(self):
+        f = self._file
+        if f is not None and (f.tell() < self.max_bytes
+                              and time.monotonic() - self._file_opened < self.max_seconds):
+            return f
+        if f is not None:
+            f.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"{self.robot_name}-{stamp}{FILE_SUFFIX}")
+        n = 1
+        while os.path.exists(path):
+            n += 1
+            path = os.path.join(self.directory, f"{self.robot_name}-{stamp}-{n}{FILE_SUFFIX}")
+        meta = json.dumps({"robot": self.robot_name, "version": 1,
+                           "columns": [list(c) for c in COLUMNS]}).encode("utf-8")
+        f = self._file = open(path, "ab")
+        f.write(MAGIC + struct.pack("<I", len(meta)) + meta)
+        self._file_opened = time.monotonic()
+        self.path = path
+        self._prune()
+        return f
+
+    def _prune(self):
+        files = log_files(self.directory, self.robot_name)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# -------------------------
+# Reader
+# -------------------------
+def log_files(directory: str, robot_name: str = None):
+    """Log files in directory (of robot_name if given), oldest first."""
+    prefix = f"{robot_name}-" if robot_name else ""
+    names = [n for n in os.listdir(directory) if n.endswith(FILE_SUFFIX) and n.startswith(prefix)]
+    paths = [os.path.join(directory, n) for n in names]
+    return sorted(paths, key=lambda p: (os.path.getmtime(p), p))
+
+class TelemetryLogReader:
+    """
+    Reads one log file or every log file in a directory.
+    Only chunk headers are read up front; read() decompresses just the
+    chunks overlapping the requested time range.
+    """
+
+    def __init__(self, path: str, robot_name: str = None):
+        paths = log_files(path, robot_name) if os.path.isdir(path) else [path]
+        self.index = []  # (t_first, t_last, rows, path, offset, length, crc)
+        for p in paths:
+            self.index.extend(self._scan(p))
+        self.index.sort(key=lambda entry: entry[0])
+
+    @staticmethod
+    def _scan(path):
+        entries = []
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: not a telemetry log")
+            (meta_len,) = struct.unpack("<I", f.read(4))
+            meta = json.loads(f.read(meta_len))
+            if [tuple(c) for c in meta["columns"]] != list(COLUMNS):
+                raise ValueError(f"{path}: unsupported column layout")
+            size = os.fstat(f.fileno()).st_size
+            while True:
+                head = f.read(len(CHUNK_MAGIC) + CHUNK_HEADER.size)
+                if len(head) < len(CHUNK_MAGIC) + CHUNK_HEADER.size or head[:4] != CHUNK_MAGIC:
+                    break
+                rows, length, crc, t_first, t_last = CHUNK_HEADER.unpack(head[4:])
+                offset = f.tell()
+                if offset + length > size:
+                    break  # last chunk cut short
+                entries.append((t_first, t_last, rows, path, offset, length, crc))
+                f.seek(length, os.SEEK_CUR)
+        return entries
+
+    def time_range(self):
+        """(first, last) sample time, or None if the log is empty."""
+        if not self.index:
+            return None
+        return self.index[0][0], max(entry[1] for entry in self.index)
+
+    def read(self, t0: float = None, t1: float = None) -> dict:
+        """
+        Samples with t0 <= t <= t1 (None = open end) as a dict of arrays:
+        t (N,), joints (N, 7), cart (N, 7), running, servo, speed (N,).
+        """
+        lo = -np.inf if t0 is None else t0
+        hi = np.inf if t1 is None else t1
+        parts = {name: [] for name, _, _ in COLUMNS}
+        for t_first, t_last, rows, path, offset, length, crc in self.index:
+            if t_last < lo or t_first > hi:
+                continue
+            with open(path, "rb") as f:
+                f.seek(offset)
+                payload = f.read(length)
+            if zlib.crc32(payload) != crc:
+                continue  # damaged chunk
+            columns = self._decode(zlib.decompress(payload), rows)
+            keep = (columns["t"] >= lo) & (columns["t"] <= hi)
+            for name in parts:
+                parts[name].append(columns[name][keep])
+        out = {}
+        for name, dtype, width in COLUMNS:
+            if parts[name]:
+                data = np.concatenate(parts[name])
+            else:
+                data = np.zeros((0, width), dtype=dtype)
+            out[name] = data if width > 1 else data.reshape(-1)
+        return out
+
+    @staticmethod
+    def _decode(raw: bytes, rows: int) -> dict:
+        columns = {}
+        pos = 0
+        for name, dtype, width in COLUMNS:
+            size = np.dtype(dtype).itemsize * width * rows
+            data = np.frombuffer(raw, dtype=dtype, count=width * rows, offset=pos)
+            columns[name] = data.reshape(rows, width) if width > 1 else data
+            pos += size
+        return columns